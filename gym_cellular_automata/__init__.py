@@ -31,10 +31,12 @@ See https://github.com/elbecerrasoto/gym-cellular-automata for documentation.
 from gymnasium.error import Error as GymError
 
 from gym_cellular_automata.ca_env import CAEnv
+from gym_cellular_automata.ca_vector_env import CAVectorEnv
 from gym_cellular_automata.grid_space import GridSpace
 from gym_cellular_automata.operator import Operator
 from gym_cellular_automata.registration import GYM_MAKE as envs
 from gym_cellular_automata.registration import _register_caenvs, prototypes
+from gym_cellular_automata.tiled_grid import TiledGrid
 from gym_cellular_automata.version import VERSION as __version__
 
 # Exports for user code
@@ -48,4 +50,12 @@ except GymError:
     pass
 
 
-__all__ = ["envs", "prototypes", "CAEnv", "GridSpace", "Operator"]
+__all__ = [
+    "envs",
+    "prototypes",
+    "CAEnv",
+    "CAVectorEnv",
+    "GridSpace",
+    "Operator",
+    "TiledGrid",
+]
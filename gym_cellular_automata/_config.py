@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import NamedTuple, Optional, Union
 
 import numpy as np
 
@@ -10,3 +11,32 @@ PROJECT_PATH = Path(__file__).parents[1]
 # For floats using the spaces Box default
 TYPE_BOX = np.float64
 TYPE_INT = np.int64
+
+
+class DtypePolicy(NamedTuple):
+    """Array types of an environment."""
+
+    grid: type  # Cell states
+    index: type  # Positions and other discrete quantities
+    real: type  # Probabilities, times and other continuous quantities
+
+
+DTYPES = {
+    "default": DtypePolicy(grid=TYPE_INT, index=TYPE_INT, real=TYPE_BOX),
+    # Grids 8x smaller, for replay buffers and vectorized environments
+    "compact": DtypePolicy(grid=np.uint8, index=np.int32, real=np.float32),
+}
+
+
+def get_dtypes(dtypes: Optional[Union[str, DtypePolicy]] = None) -> DtypePolicy:
+    """Policy by name, the "default" one if None."""
+    if dtypes is None:
+        return DTYPES["default"]
+
+    if isinstance(dtypes, str):
+        if dtypes not in DTYPES:
+            raise ValueError(f"Unknown dtypes '{dtypes}', use one of {tuple(DTYPES)}.")
+
+        return DTYPES[dtypes]
+
+    return DtypePolicy(*dtypes)
@@ -0,0 +1,25 @@
+"""
+Optional Just-In-Time compilation.
+
+When numba is installed `jit` compiles the decorated function,
+otherwise the function is returned untouched and `JIT_AVAILABLE` is False,
+callers are expected to fall back to their NumPy implementation.
+
+Compiled kernels are cached on disk, next to their source or
+at `NUMBA_CACHE_DIR` if set, thus new worker processes load them
+instead of paying the compile time again.
+"""
+
+try:
+    from numba import njit
+
+    JIT_AVAILABLE = True
+except ImportError:
+    JIT_AVAILABLE = False
+
+
+def jit(func):
+    if JIT_AVAILABLE:
+        return njit(cache=True, nogil=True)(func)
+
+    return func
@@ -1,10 +1,22 @@
 from abc import ABC, abstractmethod
+from copy import deepcopy
 from typing import Optional
 
 import gymnasium as gym
+import numpy as np
 from gymnasium import logger
 from gymnasium.utils import seeding
 
+from gym_cellular_automata._config import get_dtypes
+from gym_cellular_automata.forest_fire.utils.bitboard import BitGrid
+from gym_cellular_automata.operator import (
+    compile_operator,
+    copy_into,
+    count_cells,
+    iter_operators,
+)
+from gym_cellular_automata.records import as_tuple, record_dtype, to_record
+
 
 class CAEnv(ABC, gym.Env):
     @property
@@ -17,9 +29,37 @@ class CAEnv(ABC, gym.Env):
     def initial_state(self):
         self._resample_initial = False
 
-    def __init__(self, nrows, ncols, debug=False, **kwargs):
+    def __init__(
+        self,
+        nrows,
+        ncols,
+        debug=False,
+        dtypes=None,
+        double_buffer=False,
+        fused=False,
+        structured_context=False,
+        **kwargs
+    ):
         self.nrows, self.ncols = nrows, ncols  # nrows & ncols is API
 
+        # Array types, a `DtypePolicy` or its name, see `_config.DTYPES`
+        self.dtypes = get_dtypes(dtypes)
+
+        # Steps written on a spare state, see `_update_into`
+        self._double_buffer = double_buffer
+
+        # Steps through the fused MDP, see `operator.compile_operator`
+        if double_buffer and fused:
+            raise ValueError("Use either 'double_buffer' or 'fused', not both.")
+
+        self._fused = fused
+        self._fused_update = None
+
+        # Contexts held on a record updated in place, see `_init_record`,
+        # observed contexts are views of it, copy them to keep them
+        self._structured_context = structured_context
+        self.context_record = None
+
         self._debug = debug
         if self._debug:
             print("Perhaps you forgot to do env.reset()")
@@ -27,15 +67,31 @@ class CAEnv(ABC, gym.Env):
     def step(self, action):
         if not self.done:
             # MDP Transition
-            self.state = self.grid, self.context = self.MDP(
-                self.grid, action, self.context
-            )
+            grid = self.grid
+
+            if self._double_buffer:
+                new_state = self._update_into(action)
+            elif self._fused:
+                new_state = self._fused_update(self.grid, action, self.context)
+            elif self._structured_context:
+                new_state = self._update_record(action)
+            else:
+                new_state = self.MDP(self.grid, action, self.context)
+
+            # Fused updates return a new context, copied on the record
+            if self._structured_context and self._fused:
+                new_grid, new_context = new_state
+                new_state = new_grid, copy_into(new_context, self.context)
+
+            self.state = self.grid, self.context = new_state
+
+            self._track_counts(grid, self.MDP.delta)
 
             # Check for termination
             self._is_done()
 
             # Gym API Formatting
-            obs = self.state
+            obs = self._get_obs()
             reward = self._award()
             terminated = self.done
             truncated = False
@@ -59,7 +115,7 @@ class CAEnv(ABC, gym.Env):
             self.steps_beyond_done += 1
 
             # Graceful after termination
-            return self.state, 0.0, True, False, self._report()
+            return self._get_obs(), 0.0, True, False, self._report()
 
     def reset(self, *, seed: Optional[int] = None, options: Optional[dict] = None):
         super().reset(seed=seed)
@@ -69,9 +125,127 @@ class CAEnv(ABC, gym.Env):
         self.reward_accumulated = 0.0
         self.steps_beyond_done = 0
         self._resample_initial = True
-        obs = self.state = self.grid, self.context = self.initial_state
+        self.state = self.grid, self.context = self.initial_state
+
+        if self._structured_context:
+            self._init_record()
+
+        if self._double_buffer:
+            self._init_buffers()
+
+        # Compiled on reset, thus parameters changed in between are taken
+        if self._fused:
+            self._fused_update = compile_operator(self.MDP)
+
+        # Counted on demand
+        self.invalidate_counts()
+
+        return self._get_obs(), self._report()
+
+    def close(self):
+        """
+        Closes the operators of the MDP, suboperators included.
+        The grid is detached before, it may be held on their resources.
+        """
+        if getattr(self, "grid", None) is not None:
+            self.grid = self._detach(self.grid)
+            self.state = self.grid, self.context
+
+        for operator in iter_operators(self.MDP):
+            operator.close()
+
+    def _detach(self, grid):
+        """
+        `grid` off the resources of the operators, as shared memory blocks.
+        Grids are kept on them between steps, observations are detached.
+        """
+        for operator in iter_operators(self.MDP):
+            grid = operator.detach(grid)
+
+        return grid
+
+    def _init_record(self):
+        """
+        Record of the context, the context is a tuple of views on it.
+        Steps write the new context on the record, instead of replacing it,
+        thus observed contexts change along with the later steps.
+        """
+        self.context_record = to_record(self.context, self._context_dtype())
+        self.context = as_tuple(self.context_record)
+
+        self.state = self.grid, self.context
+
+        return self.state
+
+    def _context_dtype(self):
+        """Structured type of the context record, a field per leaf."""
+        return record_dtype(self.context)
 
-        return obs, self._report()
+    def _init_buffers(self):
+        """
+        Spare state of the double buffered steps.
+        The initial context is copied, it may share arrays with the env,
+        unless it is a view of the record, then written in place and unspared.
+        """
+        spare_context = None
+        if not self._structured_context:
+            self.context = deepcopy(self.context)
+            spare_context = deepcopy(self.context)
+
+        spare_grid = np.empty_like(self.grid) if type(self.grid) is np.ndarray else None
+        self._spare = spare_grid, spare_context
+
+        self.state = self.grid, self.context
+
+        return self.state
+
+    def _update_into(self, action):
+        """
+        MDP transition written on the spare state, the current one is the next
+        spare. Thus steps allocate no grid, yet observations are overwritten
+        two steps later, copy them to keep them longer.
+        """
+        grid, context = self.grid, self.context
+        spare_grid, spare_context = self._spare
+
+        # A structured context is written on its record, see `_update_record`
+        out_context = context if self._structured_context else spare_context
+
+        new_grid, new_context = self.MDP.update_into(
+            grid, action, context, spare_grid, out_context
+        )
+
+        # A grid changed in place keeps the spare one
+        if not self._structured_context:
+            spare_context = context
+
+        self._spare = (spare_grid if new_grid is grid else grid), spare_context
+
+        return new_grid, new_context
+
+    def _update_record(self, action):
+        """
+        MDP transition with the new context written on its record.
+        Operators read the context before writing it, thus it is its own buffer,
+        the grid is new unless changed in place, as for `MDP.update`.
+        """
+        new_grid, __ = self.MDP.update_into(
+            self.grid, action, self.context, None, self.context
+        )
+
+        return new_grid, self.context
+
+    def _get_obs(self):
+        """
+        Observation of the current state, the state itself by default.
+        Bitboards are held packed, observed unpacked.
+        """
+        grid, context = self.state
+
+        if isinstance(grid, BitGrid):
+            grid = grid.to_grid()
+
+        return self._detach(grid), context
 
     def status(self):
         return {
@@ -92,8 +266,37 @@ class CAEnv(ABC, gym.Env):
         raise NotImplementedError
 
     def count_cells(self, grid=None):
-        """Returns dict of cell counts"""
-        from collections import Counter
-
+        """
+        Returns dict of cell counts.
+        Counts of the current grid are kept along the steps,
+        after writing it in place call `invalidate_counts`.
+        """
         grid = self.grid if grid is None else grid
-        return Counter(grid.flatten().tolist())
+
+        if grid is not self.grid:
+            return count_cells(grid)
+
+        # Running counts of the current grid
+        if getattr(self, "_counted_grid", None) is not grid:
+            self._counts, self._counted_grid = count_cells(grid), grid
+
+        return self._counts.copy()
+
+    def _track_counts(self, grid, delta):
+        """
+        Applies the population change of the MDP to the running counts.
+        An unknown change, or counts of another grid, recount on demand.
+        """
+        if delta is not None and getattr(self, "_counted_grid", None) is grid:
+            self._counts.update(delta)
+            self._counted_grid = self.grid
+
+        else:
+            self.invalidate_counts()
+
+    def invalidate_counts(self):
+        """
+        Drops the running counts, the next `count_cells` recounts the grid.
+        Needed after writing the grid in place, as `env.grid[...] = x`.
+        """
+        self._counts = self._counted_grid = None
@@ -0,0 +1,166 @@
+from abc import ABC, abstractmethod
+from copy import copy, deepcopy
+
+import numpy as np
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from gym_cellular_automata.operator import copy_into, iter_operators
+from gym_cellular_automata.records import as_tuple, to_record
+
+
+class CAVectorEnv(ABC, VectorEnv):
+    """
+    Native vectorized `CAEnv`.
+
+    The `num_envs` grids live on a single `(num_envs, nrows, ncols)` array,
+    their contexts on an array of records.
+    Both are stepped at once by `MDP.update_batch`, on a copy of the MDP
+    of a template env, source of the parameters and spaces.
+    The agent acts through the `move_modify` operator of the MDP,
+    its hits are reported per environment.
+
+    Observations are views of the internal state,
+    copy them to keep them across steps.
+    """
+
+    metadata = {"autoreset_mode": AutoresetMode.NEXT_STEP}
+
+    def __init__(self, num_envs, nrows, ncols, **kwargs):
+        # Template env, source of the parameters, spaces and operators
+        self.env = self._make_env(nrows, ncols, **kwargs)
+
+        self.num_envs = num_envs
+        self.nrows, self.ncols = nrows, ncols
+        self.dtypes = self.env.dtypes
+
+        self.single_observation_space = self.env.observation_space
+        self.single_action_space = self.env.action_space
+
+        self._set_spaces()
+
+        self._initial_grid_space = self._get_initial_grid_space()
+
+        # Operators, a copy of the template MDP updates the batch,
+        # thus batched results, as hits, stay off the template env
+        self.MDP = deepcopy(self.env.MDP)
+        self.move = self.MDP.move_modify.move
+        self.modify = self.MDP.move_modify.modify
+
+        self._autoreset = np.zeros(self.num_envs, dtype=bool)
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed, options=options)
+
+        # The operators share the generator of the vectorized env
+        for operator in iter_operators(self.MDP):
+            operator.np_random = self.np_random
+
+        self._initial_grid_space.seed(int(self.np_random.integers(2**32)))
+
+        self.grids = np.empty(
+            (self.num_envs, self.nrows, self.ncols), dtype=self.dtypes.grid
+        )
+        context_dtype = self.env._context_dtype()
+
+        self.contexts = np.empty(self.num_envs, dtype=context_dtype)
+        self._initial_context = to_record(self._get_initial_context(), context_dtype)
+
+        self.hits = np.zeros(self.num_envs, dtype=bool)
+        self._autoreset[:] = False
+
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+
+        return self._get_obs(), self._report()
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+
+        # MDP Transition
+        contexts = as_tuple(self.contexts)
+
+        self.grids, contexts = self.MDP.update_batch(self.grids, actions, contexts)
+        copy_into(contexts, as_tuple(self.contexts))
+
+        self.hits = self.modify.hit
+
+        rewards = self._award()
+        terminated = self._is_done()
+        truncated = np.zeros(self.num_envs, dtype=bool)
+
+        # Next-step autoreset, envs done on the previous step start over
+        if np.any(self._autoreset):
+            self._reset_envs(self._autoreset)
+
+            rewards[self._autoreset] = 0.0
+            terminated[self._autoreset] = False
+
+        self._autoreset = terminated | truncated
+
+        return self._get_obs(), rewards, terminated, truncated, self._report()
+
+    def close_extras(self, **kwargs):
+        # Grids may be held on shared memory, see `_detach`
+        if getattr(self, "grids", None) is not None:
+            self.grids = self._detach(self.grids)
+
+        for operator in iter_operators(self.MDP):
+            operator.close()
+
+        self.env.close()
+
+    def _detach(self, grids):
+        """Grids off the resources of the operators, see `CAEnv._detach`."""
+        for operator in iter_operators(self.MDP):
+            grids = operator.detach(grids)
+
+        return grids
+
+    def _reset_envs(self, mask):
+        k = np.count_nonzero(mask)
+
+        # Drawn in place when all the envs start over
+        if k == self.num_envs:
+            self._initial_grid_space.sample(n=k, out=self.grids)
+        else:
+            self.grids[mask] = self._initial_grid_space.sample(n=k)
+
+        self.contexts[mask] = self._initial_context
+
+        self.hits[mask] = False
+
+    def _get_initial_grid_space(self):
+        """Initial grids, drawn with the generator of the vectorized env."""
+        return copy(self.env.grid_space)
+
+    def _report(self):
+        return {"hit": self.hits.copy(), "_hit": np.ones(self.num_envs, dtype=bool)}
+
+    def _get_obs(self):
+        grids = self._detach(self.grids)
+
+        return grids, as_tuple(self.contexts)
+
+    def _set_spaces(self):
+        self.observation_space = batch_space(
+            self.single_observation_space, self.num_envs
+        )
+        self.action_space = batch_space(self.single_action_space, self.num_envs)
+
+    @abstractmethod
+    def _make_env(self, nrows, ncols, **kwargs):
+        """Template env of the vectorized one."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_initial_context(self):
+        """Context every env starts from, as the template env context."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _award(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _is_done(self):
+        raise NotImplementedError
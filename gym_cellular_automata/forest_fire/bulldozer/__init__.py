@@ -1 +1,2 @@
 from .bulldozer import ForestFireBulldozerEnv
+from .vector import BulldozerVectorEnv
@@ -3,7 +3,6 @@ from typing import Optional, Tuple
 import numpy as np
 from gymnasium import spaces
 
-from gym_cellular_automata._config import TYPE_BOX, TYPE_INT
 from gym_cellular_automata.ca_env import CAEnv
 from gym_cellular_automata.forest_fire.operators import (
     Modify,
@@ -12,8 +11,14 @@ from gym_cellular_automata.forest_fire.operators import (
     RepeatCA,
     WindyForestFire,
 )
+from gym_cellular_automata.forest_fire.utils.bitboard import BitGrid
 from gym_cellular_automata.grid_space import GridSpace
-from gym_cellular_automata.operator import Operator
+from gym_cellular_automata.operator import (
+    Operator,
+    compile_operator,
+    copy_into,
+    merge_deltas,
+)
 
 from .utils.render import render
 
@@ -60,6 +65,12 @@ class ForestFireBulldozerEnv(CAEnv):
             "down": 0.12,
             "down_right": 0.48,
         },
+        backend="numpy",
+        frontier=False,
+        tile: Optional[int] = None,
+        memmap_dir: Optional[str] = None,
+        threads: Optional[int] = None,
+        processes: Optional[int] = None,
         **kwargs
     ):
         super().__init__(nrows, ncols, **kwargs)
@@ -98,6 +109,9 @@ class ForestFireBulldozerEnv(CAEnv):
         self._p_tree = p_tree  # Initial Tree probability
         self._p_empty = p_empty  # Initial Empty probality
 
+        self._tile = tile  # Tile size of a `TiledGrid`, None for an array
+        self._memmap_dir = memmap_dir  # Directory of a memory mapped grid
+
         # Env Behavior Parameters
 
         self._wind = self._parse_wind(wind)  # Fire Propagation Probabilities
@@ -159,10 +173,26 @@ class ForestFireBulldozerEnv(CAEnv):
         self._set_spaces()
         self._init_time_mappings()
 
-        self.ca = WindyForestFire(self._empty, self._tree, self._fire, **self.ca_space)
+        # Operators backend, `bitboard` only applies to the CA
+        cell_backend = "jit" if backend == "jit" else "numpy"
+
+        # The grid is held packed, unpacked only for observations
+        self._bitboard = backend == "bitboard"
+
+        # The bulldozer only removes trees, safe for the fire frontier
+        self.ca = WindyForestFire(
+            self._empty,
+            self._tree,
+            self._fire,
+            backend=backend,
+            frontier=frontier,
+            threads=threads,
+            processes=processes,
+            **self.ca_space
+        )
 
-        self.move = Move(self._action_sets, **self.move_space)
-        self.modify = Modify(self._effects, **self.modify_space)
+        self.move = Move(self._action_sets, backend=cell_backend, **self.move_space)
+        self.modify = Modify(self._effects, backend=cell_backend, **self.modify_space)
 
         # Composite Operators
         self.move_modify = MoveModify(self.move, self.modify, **self.move_modify_space)
@@ -177,6 +207,35 @@ class ForestFireBulldozerEnv(CAEnv):
     def render(self, mode="human"):
         return render(self)
 
+    def run_until_quiescent(self, max_updates=None):
+        """
+        Lets the fire run its course without the bulldozer.
+
+        Updates the CA until no fire remains or `max_updates` are done,
+        by default as many as cells, enough for any fire to burn out.
+        Returns the number of CA updates done.
+        """
+        max_updates = self.nrows * self.ncols if max_updates is None else max_updates
+
+        grid = self.grid
+        ca_params, position, time = self.context
+
+        new_grid, ca_params, updates = self.ca.run_until_quiescent(
+            grid, None, ca_params, max_updates
+        )
+
+        context = ca_params, position, time
+
+        if self._structured_context:
+            context = copy_into(context, self.context)
+
+        self.state = self.grid, self.context = new_grid, context
+
+        self._track_counts(grid, self.ca.delta)
+        self._is_done()
+
+        return updates
+
     def _award(self):
         """Reward Function
 
@@ -207,13 +266,18 @@ class ForestFireBulldozerEnv(CAEnv):
         The sparse reward is alive trees at epidose's end:
         t / (e + t + f)
         """
-        counts = self.count_cells(self.grid)
+        counts = self.count_cells()
         t = counts[self._tree]
         f = counts[self._fire]
+
+        # Without any forest left there is nothing to lose
+        if t + f == 0:
+            return 0.0
+
         return -(f / (t + f))
 
     def _is_done(self):
-        self.done = not bool(np.any(self.grid == self._fire))
+        self.done = self.count_cells()[self._fire] == 0
 
     def _report(self):
         return {"hit": self.modify.hit}
@@ -236,6 +300,9 @@ class ForestFireBulldozerEnv(CAEnv):
             values = [  self._empty,   self._tree,   self._fire],
             probs  = [self._p_empty, self._p_tree,          0.0],
             shape=(self.nrows, self.ncols),
+            dtype=self.dtypes.grid,
+            tile=self._tile,
+            memmap_dir=self._memmap_dir,
         )
         # fmt: on
 
@@ -250,6 +317,9 @@ class ForestFireBulldozerEnv(CAEnv):
         r, c = self._pos_fire
         grid[r, c] = self._fire
 
+        if self._bitboard:
+            grid = BitGrid.from_grid(grid, self._empty, self._tree, self._fire)
+
         return grid
 
     def _initial_context_distribution(self):
@@ -265,11 +335,24 @@ class ForestFireBulldozerEnv(CAEnv):
 
             self._pos_bull = r, c
 
-        init_position = np.array(self._pos_bull)
-        init_context = self._wind, init_position, np.array(init_time, dtype=TYPE_BOX)
+        init_position = np.array(self._pos_bull, dtype=self.dtypes.index)
+        init_context = (
+            self._wind,
+            init_position,
+            np.array(init_time, dtype=self.dtypes.real),
+        )
 
         return init_context
 
+    def _context_dtype(self):
+        return np.dtype(
+            [
+                ("wind", self.dtypes.real, (3, 3)),
+                ("position", self.dtypes.index, (2,)),
+                ("time", self.dtypes.real),
+            ]
+        )
+
     def _init_time_mappings(self):
         self._movement_timings = {
             move: self._t_act_move for move in self._moves.values()
@@ -301,11 +384,11 @@ class ForestFireBulldozerEnv(CAEnv):
                 [ windD["up_left"]  , windD["up"]  , windD["up_right"]   ],
                 [ windD["left"]     ,    0.0       , windD["right"]      ],
                 [ windD["down_left"], windD["down"], windD["down_right"] ],
-            ], dtype=TYPE_BOX
+            ], dtype=self.dtypes.real
         )
 
         # fmt: on
-        wind_space = spaces.Box(0.0, 1.0, shape=(3, 3), dtype=TYPE_BOX)
+        wind_space = spaces.Box(0.0, 1.0, shape=(3, 3), dtype=self.dtypes.real)
 
         assert wind_space.contains(wind), "Bad Wind Data, check ranges [0.0, 1.0]"
 
@@ -313,14 +396,20 @@ class ForestFireBulldozerEnv(CAEnv):
 
     def _set_spaces(self):
         self.grid_space = GridSpace(
-            values=[self._empty, self._tree, self._fire], shape=(self.nrows, self.ncols)
+            values=[self._empty, self._tree, self._fire],
+            shape=(self.nrows, self.ncols),
+            dtype=self.dtypes.grid,
         )
 
-        self.ca_params_space = spaces.Box(0.0, 1.0, shape=(3, 3), dtype=TYPE_BOX)
+        self.ca_params_space = spaces.Box(
+            0.0, 1.0, shape=(3, 3), dtype=self.dtypes.real
+        )
         self.position_space = spaces.MultiDiscrete(
-            [self.nrows, self.ncols], dtype=TYPE_INT
+            [self.nrows, self.ncols], dtype=self.dtypes.index
+        )
+        self.time_space = spaces.Box(
+            0.0, float("inf"), shape=tuple(), dtype=self.dtypes.real
         )
-        self.time_space = spaces.Box(0.0, float("inf"), shape=tuple(), dtype=TYPE_BOX)
 
         self.context_space = spaces.Tuple(
             (self.ca_params_space, self.position_space, self.time_space)
@@ -329,7 +418,7 @@ class ForestFireBulldozerEnv(CAEnv):
         # RL spaces
 
         m, n = len(self._moves), len(self._shoots)
-        self.action_space = spaces.MultiDiscrete([m, n], dtype=TYPE_INT)
+        self.action_space = spaces.MultiDiscrete([m, n], dtype=self.dtypes.index)
         self.observation_space = spaces.Tuple((self.grid_space, self.context_space))
 
         # Suboperators Spaces
@@ -393,4 +482,56 @@ class MDP(Operator):
         grid, (ca_params, time) = self.repeat_ca(grid, action, (ca_params, time))
         grid, position = self.move_modify(grid, action, position)
 
+        self.delta = merge_deltas(self.repeat_ca.delta, self.move_modify.delta)
+
         return grid, (ca_params, position, time)
+
+    def update_batch(self, grids, actions, contexts):
+        ca_params, positions, times = contexts
+
+        grids, (ca_params, times) = self.repeat_ca.update_batch(
+            grids, actions, (ca_params, times)
+        )
+        # Moves and shoots as a pair of arrays
+        grids, positions = self.move_modify.update_batch(
+            grids, np.asarray(actions).T, positions
+        )
+
+        self.delta = merge_deltas(self.repeat_ca.delta, self.move_modify.delta)
+
+        return grids, (ca_params, positions, times)
+
+    def update_into(self, grid, action, context, out_grid, out_context):
+        ca_params, position, time = context
+        out_params, out_position, out_time = out_context
+
+        grid, (ca_params, time) = self.repeat_ca.update_into(
+            grid, action, (ca_params, time), out_grid, (out_params, out_time)
+        )
+        grid, position = self.move_modify.update_into(
+            grid, action, position, out_grid, out_position
+        )
+
+        self.delta = merge_deltas(self.repeat_ca.delta, self.move_modify.delta)
+
+        return grid, (ca_params, position, time)
+
+
+@compile_operator.register
+def _compile_mdp(mdp: MDP):
+    repeat_ca, move_modify = mdp.repeat_ca, mdp.move_modify
+
+    update_repeat_ca = compile_operator(repeat_ca)
+    update_move_modify = compile_operator(move_modify)
+
+    def update(grid, action, context):
+        ca_params, position, time = context
+
+        grid, (ca_params, time) = update_repeat_ca(grid, action, (ca_params, time))
+        grid, position = update_move_modify(grid, action, position)
+
+        mdp.delta = merge_deltas(repeat_ca.delta, move_modify.delta)
+
+        return grid, (ca_params, position, time)
+
+    return update
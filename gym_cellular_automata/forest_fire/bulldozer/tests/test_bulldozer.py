@@ -1,8 +1,23 @@
+from copy import deepcopy
+
 import matplotlib
+import numpy as np
 import pytest
+from gymnasium.spaces import flatdim
+from gymnasium.wrappers import FlattenObservation
 
 from gym_cellular_automata.forest_fire.bulldozer import ForestFireBulldozerEnv
+from gym_cellular_automata.forest_fire.utils.bands import BAND
+from gym_cellular_automata.forest_fire.utils.bitboard import BitGrid
 from gym_cellular_automata.grid_space import GridSpace
+from gym_cellular_automata.operator import count_cells
+from gym_cellular_automata.tests import (
+    JIT,
+    assert_operator,
+    assert_twin_envs,
+    step_twin_envs,
+)
+from gym_cellular_automata.tiled_grid import TiledGrid
 
 THRESHOLD = 12
 
@@ -15,8 +30,6 @@ def env():
 
 
 def test_bulldozerMDP_is_operator(env):
-    from gym_cellular_automata.tests import assert_operator
-
     assert_operator(env.MDP, strict=True)
 
 
@@ -50,3 +63,233 @@ def test_starting_conditions_seed(env):
 
     # Single fire seed
     assert len(grid[grid == env._fire]) == 1
+
+
+@pytest.mark.parametrize("backend", ["bitboard", JIT])
+def test_backends_step(backend):
+    env = ForestFireBulldozerEnv(nrows=NROWS, ncols=NCOLS, backend=backend)
+    obs, info = env.reset()
+
+    for step in range(THRESHOLD):
+        obs, reward, terminated, truncated, info = env.step(env.action_space.sample())
+
+        assert env.observation_space.contains(obs)
+
+
+def test_bitboard_env_matches_numpy():
+    plain = ForestFireBulldozerEnv(nrows=NROWS, ncols=NCOLS)
+    packed = ForestFireBulldozerEnv(nrows=NROWS, ncols=NCOLS, backend="bitboard")
+
+    for __, ((grid_packed, __), *__) in step_twin_envs(plain, packed, THRESHOLD, 17):
+        # Held packed, observed unpacked
+        assert isinstance(packed.grid, BitGrid)
+        assert isinstance(grid_packed, np.ndarray)
+
+
+def test_frontier_matches_full_grid_env():
+    full = ForestFireBulldozerEnv(nrows=NROWS, ncols=NCOLS)
+    frontier = ForestFireBulldozerEnv(nrows=NROWS, ncols=NCOLS, frontier=True)
+
+    assert_twin_envs(full, frontier, THRESHOLD, 11)
+
+
+def test_processes_match_single_process_env():
+    # More than a band, thus updated on the workers
+    nrows = 2 * BAND + 7
+
+    # An update owed per move and per shoot
+    timings = {"t_move": 1.0, "t_shoot": 1.0}
+
+    single = ForestFireBulldozerEnv(nrows=nrows, ncols=NCOLS, **timings)
+    shared = ForestFireBulldozerEnv(nrows=nrows, ncols=NCOLS, processes=2, **timings)
+
+    __, ((grid_shared, __), *__) = assert_twin_envs(single, shared, THRESHOLD, 11)
+
+    # The grid stays on shared memory, observations are copied off it
+    assert shared.ca.detach(shared.grid) is not shared.grid
+    assert grid_shared is not shared.grid
+
+    # Workers and shared memory are released, the grid is copied off before
+    shared.close()
+    assert shared.ca._shared._pool is None
+    assert shared.ca.detach(shared.grid) is shared.grid
+    assert (grid_shared == shared.grid).all()
+
+
+@pytest.mark.parametrize("frontier", [False, True])
+def test_running_counts(frontier):
+    env = ForestFireBulldozerEnv(nrows=NROWS, ncols=NCOLS, frontier=frontier)
+    env.reset(seed=3)
+
+    for step in range(THRESHOLD):
+        (grid, __), reward, terminated, *__ = env.step(env.action_space.sample())
+
+        assert env.count_cells() == count_cells(grid)
+        assert terminated == (count_cells(grid)[env._fire] == 0)
+
+
+def test_run_until_quiescent(env):
+    env.reset(seed=5)
+
+    updates = env.run_until_quiescent()
+
+    assert updates > 0
+    assert env.done
+    assert env.count_cells()[env._fire] == 0
+    assert env.observation_space.contains(env.state)
+
+
+def test_tiled_grid():
+    HUGE = 16384
+
+    env = ForestFireBulldozerEnv(nrows=HUGE, ncols=HUGE, tile=256)
+    (grid, __), __ = env.reset(seed=0)
+
+    assert isinstance(grid, TiledGrid)
+
+    for step in range(THRESHOLD):
+        (grid, __), *__ = env.step(env.action_space.sample())
+
+    # Only the tiles around the fire and the bulldozer are dense
+    assert grid.nbytes < 2**22
+
+    # Burned out, a single value per tile
+    env.grid = TiledGrid((HUGE, HUGE), tile=256, fill=env._empty)
+    (grid, __), reward, terminated, *__ = env.step(env.action_space.sample())
+
+    assert terminated
+    assert env.count_cells() == count_cells(grid)
+
+
+def test_tiled_grid_flatten_observation():
+    env = ForestFireBulldozerEnv(nrows=64, ncols=64, tile=16)
+    flat_env = FlattenObservation(env)
+
+    obs, __ = flat_env.reset(seed=0)
+    obs, *__ = flat_env.step(env.action_space.sample())
+
+    assert obs.shape == (flatdim(env.observation_space),)
+    assert np.all(obs[: 64 * 64] == np.asarray(env.grid).ravel())
+
+
+def test_memmap_grid(tmp_path):
+    env = ForestFireBulldozerEnv(nrows=NROWS, ncols=NCOLS, memmap_dir=tmp_path)
+    (grid, __), __ = env.reset(seed=0)
+
+    assert isinstance(grid, np.memmap)
+
+    for step in range(THRESHOLD):
+        obs, *__ = env.step(env.action_space.sample())
+
+        assert isinstance(env.grid, np.memmap)
+        assert env.observation_space.contains(obs)
+        assert env.count_cells() == count_cells(env.grid)
+
+
+def test_compact_dtypes():
+    env = ForestFireBulldozerEnv(nrows=NROWS, ncols=NCOLS, dtypes="compact")
+    obs, info = env.reset(seed=0)
+
+    for step in range(THRESHOLD):
+        obs, *__ = env.step(env.action_space.sample())
+
+        grid, (wind, position, time) = obs
+
+        assert env.observation_space.contains(obs)
+        assert grid.dtype == np.uint8
+        assert wind.dtype == time.dtype == np.float32
+        assert position.dtype == np.int32
+
+
+@pytest.mark.parametrize("backend", ["numpy", JIT, "bitboard"])
+@pytest.mark.parametrize("t_move", [None, 2.5])
+def test_double_buffer_matches_env(backend, t_move):
+    single = ForestFireBulldozerEnv(
+        nrows=NROWS, ncols=NCOLS, backend=backend, t_move=t_move
+    )
+    buffered = ForestFireBulldozerEnv(
+        nrows=NROWS, ncols=NCOLS, backend=backend, t_move=t_move, double_buffer=True
+    )
+
+    grids = set()
+    for __, ((grid_buffered, __), *__) in step_twin_envs(
+        single, buffered, THRESHOLD, 13
+    ):
+        grids.add(id(grid_buffered))
+
+    # The initial grid and the spare one take turns
+    if backend != "bitboard":
+        assert len(grids) <= 2
+
+
+@pytest.mark.parametrize("backend", ["numpy", JIT])
+@pytest.mark.parametrize("t_move", [None, 2.5])
+def test_fused_matches_env(backend, t_move):
+    single = ForestFireBulldozerEnv(
+        nrows=NROWS, ncols=NCOLS, backend=backend, t_move=t_move
+    )
+    fused = ForestFireBulldozerEnv(
+        nrows=NROWS, ncols=NCOLS, backend=backend, t_move=t_move, fused=True
+    )
+
+    for __ in step_twin_envs(single, fused, 4 * THRESHOLD, 17):
+        assert fused.count_cells() == single.count_cells()
+
+
+def test_fused_or_double_buffer():
+    with pytest.raises(ValueError):
+        ForestFireBulldozerEnv(NROWS, NCOLS, fused=True, double_buffer=True)
+
+
+@pytest.mark.parametrize("double_buffer", [False, True])
+def test_structured_context_matches_env(double_buffer):
+    single = ForestFireBulldozerEnv(nrows=NROWS, ncols=NCOLS, t_move=2.5)
+    structured = ForestFireBulldozerEnv(
+        nrows=NROWS,
+        ncols=NCOLS,
+        t_move=2.5,
+        structured_context=True,
+        double_buffer=double_buffer,
+    )
+
+    steps = step_twin_envs(single, structured, THRESHOLD, 5)
+    next(steps)
+
+    record = structured.context_record
+    assert record.dtype.names == ("wind", "position", "time")
+
+    for __, ((__, context_structured), *__) in steps:
+        # The context stays a view of the same record
+        assert structured.context_record is record
+        assert all(np.shares_memory(leaf, record) for leaf in context_structured)
+
+
+@pytest.mark.parametrize("double_buffer", [False, True])
+def test_structured_context_observations_follow_record(double_buffer):
+    env = ForestFireBulldozerEnv(
+        nrows=NROWS,
+        ncols=NCOLS,
+        t_move=2.5,
+        structured_context=True,
+        double_buffer=double_buffer,
+    )
+    env.reset(seed=2)
+
+    # Down and to the right, without shooting
+    action = np.array([8, 0])
+
+    (__, observed), *__ = env.step(action)
+    kept = deepcopy(observed)
+
+    for step in range(5):
+        env.step(action)
+
+    # Observed contexts are views of the record, later steps change them
+    assert all(np.shares_memory(leaf, env.context_record) for leaf in observed)
+    assert all((a == b).all() for a, b in zip(observed, env.context))
+
+    __, position, time = observed
+    __, kept_position, kept_time = kept
+
+    assert (position != kept_position).any()
+    assert time != kept_time
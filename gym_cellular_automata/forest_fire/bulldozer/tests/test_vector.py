@@ -0,0 +1,120 @@
+import gymnasium as gym
+import numpy as np
+import pytest
+
+from gym_cellular_automata.forest_fire.bulldozer import (
+    BulldozerVectorEnv,
+    ForestFireBulldozerEnv,
+)
+from gym_cellular_automata.registration import GYM_MAKE
+
+NUM_ENVS = 4
+STEPS = 24
+
+NROWS, NCOLS = 16, 16
+
+# Each direction either always or never propagates
+DETERMINISTIC_WINDS = np.ones((3, 3)), np.zeros((3, 3)), np.tri(3), np.eye(3)
+
+
+@pytest.fixture
+def envs():
+    return BulldozerVectorEnv(NUM_ENVS, NROWS, NCOLS)
+
+
+def test_vector_env_api(envs):
+    obs, info = envs.reset(seed=42)
+    assert envs.observation_space.contains(obs)
+
+    for step in range(STEPS):
+        actions = envs.action_space.sample()
+        obs, rewards, terminated, truncated, info = envs.step(actions)
+
+        assert envs.observation_space.contains(obs)
+
+        assert rewards.shape == (NUM_ENVS,)
+        assert terminated.shape == truncated.shape == (NUM_ENVS,)
+        assert info["hit"].shape == (NUM_ENVS,)
+
+
+def test_template_env_keeps_its_operators(envs):
+    envs.reset(seed=3)
+
+    for step in range(STEPS):
+        envs.step(envs.action_space.sample())
+
+    assert envs.modify is not envs.env.modify
+
+    # Hits of the batch stay on the operators of the vectorized env
+    assert envs.modify.hit.shape == (NUM_ENVS,)
+    assert not isinstance(envs.env._report()["hit"], np.ndarray)
+
+
+def test_vector_env_matches_single_envs(envs):
+    envs.reset(seed=0)
+
+    singles = []
+    for i in range(NUM_ENVS):
+        envs.winds[i] = DETERMINISTIC_WINDS[i % len(DETERMINISTIC_WINDS)]
+
+        env = ForestFireBulldozerEnv(NROWS, NCOLS)
+        env.reset()
+
+        env.grid = envs.grids[i].copy()
+        env.context = envs.winds[i].copy(), envs.positions[i].copy(), np.array(0.0)
+
+        singles.append(env)
+
+    done = np.zeros(NUM_ENVS, dtype=bool)
+    for step in range(STEPS):
+        actions = envs.action_space.sample()
+        (grids, (__, positions, times)), rewards, terminated, *__, info = envs.step(
+            actions
+        )
+
+        for i, env in enumerate(singles):
+            if done[i]:
+                continue
+
+            (grid, (__, pos, time)), reward, single_done, *__, single_info = env.step(
+                actions[i]
+            )
+
+            assert np.all(grids[i] == grid)
+            assert np.all(positions[i] == pos)
+            assert times[i] == time
+            assert rewards[i] == pytest.approx(reward)
+            assert terminated[i] == single_done
+            assert info["hit"][i] == single_info["hit"]
+
+        done |= terminated
+
+
+def test_vector_env_autoreset(envs):
+    envs.reset(seed=3)
+
+    # Without fire the envs terminate right away
+    envs.grids[envs.grids == envs.env._fire] = envs.env._empty
+
+    obs, rewards, terminated, truncated, info = envs.step(envs.action_space.sample())
+    assert np.all(terminated)
+
+    # Next step starts over
+    (grids, (__, __, times)), rewards, terminated, *__ = envs.step(
+        envs.action_space.sample()
+    )
+    assert not np.any(terminated)
+    assert np.all(rewards == 0.0)
+    assert np.all(np.any(grids == envs.env._fire, axis=(1, 2)))
+
+
+def test_make_vec():
+    bulldozer = next(env_id for env_id in GYM_MAKE if "Bulldozer" in env_id)
+    envs = gym.make_vec(bulldozer, num_envs=NUM_ENVS)
+
+    assert isinstance(envs.unwrapped, BulldozerVectorEnv)
+
+    obs, info = envs.reset(seed=1)
+    obs, *__ = envs.step(envs.action_space.sample())
+
+    assert envs.observation_space.contains(obs)
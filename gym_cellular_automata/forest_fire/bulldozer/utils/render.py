@@ -25,6 +25,7 @@ from gym_cellular_automata.forest_fire.utils.render import (
     parse_svg_into_mpl,
     plot_grid,
 )
+from gym_cellular_automata.tiled_grid import TiledGrid
 
 from . import svg_paths
 
@@ -77,8 +78,7 @@ def render(env):
     CELLS = [EMPTY, TREE, FIRE]
     NORM, CMAP = get_norm_cmap(CELLS, COLORS)
 
-    grid = env.grid
-    ca_params, pos, time = env.context
+    grid, (ca_params, pos, time) = env._get_obs()
 
     local_grid = moore_n(N_LOCAL, pos, grid, EMPTY)
     pos_fseed = env._pos_fire
@@ -130,6 +130,11 @@ def render(env):
         )
 
     def plot_global(ax, grid, pos, pos_fseed):
+        # Huge grids are shown by a subsample
+        if isinstance(grid, TiledGrid):
+            grid, step = grid.overview()
+            pos, pos_fseed = np.divide(pos, step), np.divide(pos_fseed, step)
+
         ax.imshow(grid, interpolation="none", cmap=CMAP, norm=NORM)
 
         # Fire Seed
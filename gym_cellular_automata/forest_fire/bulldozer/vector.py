@@ -0,0 +1,84 @@
+import numpy as np
+
+from gym_cellular_automata.ca_vector_env import CAVectorEnv
+from gym_cellular_automata.grid_space import GridSpace
+
+from .bulldozer import ForestFireBulldozerEnv
+
+
+class BulldozerVectorEnv(CAVectorEnv):
+    """
+    Native vectorized `ForestFireBulldozerEnv`.
+
+    Winds, positions and accumulated times are views of the fields
+    of the context records. The CA updates owed by each env are computed in bulk,
+    then `WindyForestFire` runs only on the envs that still owe an update,
+    each with its own failure mask. See `CAVectorEnv`.
+
+        Example::
+
+            >>> envs = BulldozerVectorEnv(64, nrows=256, ncols=256)
+            >>> obs, info = envs.reset(seed=42)
+            >>> obs, rewards, terminated, truncated, info = envs.step(envs.action_space.sample())
+
+    """
+
+    def __init__(self, num_envs, nrows, ncols, **kwargs):
+        super().__init__(num_envs, nrows, ncols, **kwargs)
+
+        self.ca = self.MDP.repeat_ca.ca
+
+    @property
+    def winds(self):
+        return self.contexts["wind"]
+
+    @property
+    def positions(self):
+        return self.contexts["position"]
+
+    @property
+    def times(self):
+        return self.contexts["time"]
+
+    def reset(self, *, seed=None, options=None):
+        # Fixes the initial positions of fire and bulldozer
+        self.env.reset(seed=seed)
+
+        return super().reset(seed=seed, options=options)
+
+    def _make_env(self, nrows, ncols, **kwargs):
+        return ForestFireBulldozerEnv(nrows, ncols, **kwargs)
+
+    def _get_initial_grid_space(self):
+        """Initial grids, without fire but at its starting cell."""
+        env = self.env
+
+        return GridSpace(
+            values=[env._empty, env._tree, env._fire],
+            probs=[env._p_empty, env._p_tree, 0.0],
+            shape=(self.nrows, self.ncols),
+            dtype=self.dtypes.grid,
+        )
+
+    def _get_initial_context(self):
+        return self.env.context
+
+    def _reset_envs(self, mask):
+        super()._reset_envs(mask)
+
+        row, col = self.env._pos_fire
+        self.grids[mask, row, col] = self.env._fire
+
+    def _award(self):
+        """Same as `ForestFireBulldozerEnv._award`, per environment."""
+        t = np.count_nonzero(self.grids == self.env._tree, axis=(1, 2))
+        f = np.count_nonzero(self.grids == self.env._fire, axis=(1, 2))
+
+        # Without any forest left there is nothing to lose
+        flammable = t + f
+        return -np.divide(
+            f, flammable, out=np.zeros(self.num_envs), where=flammable > 0
+        )
+
+    def _is_done(self):
+        return ~np.any(self.grids == self.env._fire, axis=(1, 2))
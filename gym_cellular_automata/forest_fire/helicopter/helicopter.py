@@ -1,9 +1,9 @@
+from collections import Counter
 from typing import Optional
 
 import numpy as np
 from gymnasium import logger, spaces
 
-from gym_cellular_automata._config import TYPE_BOX, TYPE_INT
 from gym_cellular_automata.ca_env import CAEnv
 from gym_cellular_automata.forest_fire.operators import (
     ForestFire,
@@ -11,8 +11,14 @@ from gym_cellular_automata.forest_fire.operators import (
     Move,
     MoveModify,
 )
+from gym_cellular_automata.forest_fire.utils.bitboard import BitGrid
 from gym_cellular_automata.grid_space import GridSpace
-from gym_cellular_automata.operator import Operator
+from gym_cellular_automata.operator import (
+    Operator,
+    compile_operator,
+    copy_into,
+    merge_deltas,
+)
 
 from .utils.render import render
 
@@ -29,9 +35,14 @@ class ForestFireHelicopterEnv(CAEnv):
         if self._resample_initial:
             self.grid = self.grid_space.sample()
 
-            ca_params = np.array([self._p_fire, self._p_tree], dtype=TYPE_BOX)
-            pos = np.array([self.nrows // 2, self.ncols // 2])
-            freeze = np.array(self._max_freeze)
+            if self._bitboard:
+                self.grid = BitGrid.from_grid(
+                    self.grid, self._empty, self._tree, self._fire
+                )
+
+            ca_params = np.array([self._p_fire, self._p_tree], dtype=self.dtypes.real)
+            pos = np.array([self.nrows // 2, self.ncols // 2], dtype=self.dtypes.index)
+            freeze = np.array(self._max_freeze, dtype=self.dtypes.index)
             self.context = ca_params, pos, freeze
 
             self._initial_state = self.grid, self.context
@@ -41,7 +52,16 @@ class ForestFireHelicopterEnv(CAEnv):
         return self._initial_state
 
     def __init__(
-        self, nrows, ncols, speed: float = 0.5, freeze: Optional[int] = None, **kwargs
+        self,
+        nrows,
+        ncols,
+        speed: float = 0.5,
+        freeze: Optional[int] = None,
+        backend: str = "numpy",
+        threads: Optional[int] = None,
+        processes: Optional[int] = None,
+        sampling: str = "dense",
+        **kwargs
     ):
         # Sets defaults and runs seed method
         super().__init__(nrows, ncols, **kwargs)
@@ -94,12 +114,25 @@ class ForestFireHelicopterEnv(CAEnv):
 
         self._set_spaces()
 
+        # Operators backend, `bitboard` only applies to the CA
+        cell_backend = "jit" if backend == "jit" else "numpy"
+
+        # The grid is held packed, unpacked only for observations
+        self._bitboard = backend == "bitboard"
+
         self.cellular_automaton = ForestFire(
-            self._empty, self._tree, self._fire, **self.ca_space
+            self._empty,
+            self._tree,
+            self._fire,
+            backend=backend,
+            threads=threads,
+            processes=processes,
+            sampling=sampling,
+            **self.ca_space,
         )
 
-        self.move = Move(self._action_sets, **self.move_space)
-        self.modify = Modify(self._effects, **self.modify_space)
+        self.move = Move(self._action_sets, backend=cell_backend, **self.move_space)
+        self.modify = Modify(self._effects, backend=cell_backend, **self.modify_space)
 
         self.move_modify = MoveModify(self.move, self.modify, **self.move_modify_space)
 
@@ -120,7 +153,7 @@ class ForestFireHelicopterEnv(CAEnv):
     def _award(self):
         ncells = self.nrows * self.ncols
 
-        dict_counts = self.count_cells(self.grid)
+        dict_counts = self.count_cells()
 
         cell_counts = np.array(
             [dict_counts[self._empty], dict_counts[self._tree], dict_counts[self._fire]]
@@ -140,10 +173,19 @@ class ForestFireHelicopterEnv(CAEnv):
     def _report(self):
         return {"hit": self.modify.hit}
 
+    def _context_dtype(self):
+        return np.dtype(
+            [
+                ("ca_params", self.dtypes.real, (2,)),
+                ("position", self.dtypes.index, (2,)),
+                ("freeze", self.dtypes.index),
+            ]
+        )
+
     def _set_spaces(self):
-        self.ca_params_space = spaces.Box(0.0, 1.0, shape=(2,), dtype=TYPE_BOX)
+        self.ca_params_space = spaces.Box(0.0, 1.0, shape=(2,), dtype=self.dtypes.real)
         self.position_space = spaces.MultiDiscrete(
-            [self.nrows, self.ncols], dtype=TYPE_INT
+            [self.nrows, self.ncols], dtype=self.dtypes.index
         )
         self.freeze_space = spaces.Discrete(self._max_freeze + 1)
 
@@ -154,7 +196,7 @@ class ForestFireHelicopterEnv(CAEnv):
         self.grid_space = GridSpace(
             values=[self._empty, self._tree, self._fire],
             shape=(self.nrows, self.ncols),
-            dtype=TYPE_INT,
+            dtype=self.dtypes.grid,
         )
 
         # RL spaces
@@ -219,18 +261,108 @@ class MDP(Operator):
 
     def update(self, grid, action, context):
         ca_params, position, freeze = context
+        dtype = np.asarray(freeze).dtype
 
         if freeze == 0:
             grid, ca_params = self.ca(grid, None, ca_params)
             grid, position = self.move_modify(grid, (action, True), position)
 
-            freeze = np.array(self.max_freeze)
+            self.delta = merge_deltas(self.ca.delta, self.move_modify.delta)
+
+            freeze = np.array(self.max_freeze, dtype=dtype)
 
         else:
             grid, position = self.move_modify(grid, (action, True), position)
 
-            freeze = np.array(freeze - 1)
+            self.delta = self.move_modify.delta
+
+            freeze = np.array(freeze - 1, dtype=dtype)
 
         context = ca_params, position, freeze
 
         return grid, context
+
+    def update_batch(self, grids, actions, contexts):
+        """CA updates on the grids whose freeze is over, in place on `grids`."""
+        ca_params, positions, freezes = contexts
+
+        ca_delta = Counter()
+
+        update = freezes == 0
+        if np.any(update):
+            grids[update], __ = self.ca.update_batch(
+                grids[update], None, ca_params[update]
+            )
+            ca_delta = self.ca.delta
+
+        freezes = np.where(update, self.max_freeze, freezes - 1)
+
+        # The helicopter always acts
+        acting = np.ones(len(grids), dtype=bool)
+        grids, positions = self.move_modify.update_batch(
+            grids, (actions, acting), positions
+        )
+
+        self.delta = merge_deltas(ca_delta, self.move_modify.delta)
+
+        return grids, (ca_params, positions, freezes)
+
+    def update_into(self, grid, action, context, out_grid, out_context):
+        ca_params, position, freeze = context
+        out_params, out_position, out_freeze = out_context
+
+        if freeze == 0:
+            grid, ca_params = self.ca.update_into(
+                grid, None, ca_params, out_grid, out_params
+            )
+            grid, position = self.move_modify.update_into(
+                grid, (action, True), position, out_grid, out_position
+            )
+
+            self.delta = merge_deltas(self.ca.delta, self.move_modify.delta)
+
+            freeze = self.max_freeze
+
+        else:
+            ca_params = copy_into(ca_params, out_params)
+            grid, position = self.move_modify.update_into(
+                grid, (action, True), position, out_grid, out_position
+            )
+
+            self.delta = self.move_modify.delta
+
+            freeze = freeze - 1
+
+        return grid, (ca_params, position, copy_into(freeze, out_freeze))
+
+
+@compile_operator.register
+def _compile_mdp(mdp: MDP):
+    ca, move_modify = mdp.ca, mdp.move_modify
+    max_freeze = mdp.max_freeze
+
+    update_ca = compile_operator(ca)
+    update_move_modify = compile_operator(move_modify)
+
+    def update(grid, action, context):
+        ca_params, position, freeze = context
+        dtype = np.asarray(freeze).dtype
+
+        if freeze == 0:
+            grid, ca_params = update_ca(grid, None, ca_params)
+            grid, position = update_move_modify(grid, (action, True), position)
+
+            mdp.delta = merge_deltas(ca.delta, move_modify.delta)
+
+            freeze = np.array(max_freeze, dtype=dtype)
+
+        else:
+            grid, position = update_move_modify(grid, (action, True), position)
+
+            mdp.delta = move_modify.delta
+
+            freeze = np.array(freeze - 1, dtype=dtype)
+
+        return grid, (ca_params, position, freeze)
+
+    return update
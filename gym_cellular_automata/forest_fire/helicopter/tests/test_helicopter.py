@@ -6,7 +6,10 @@ from gymnasium import spaces
 
 from gym_cellular_automata._config import TYPE_BOX
 from gym_cellular_automata.forest_fire.helicopter import ForestFireHelicopterEnv
+from gym_cellular_automata.forest_fire.utils.bitboard import BitGrid
 from gym_cellular_automata.grid_space import GridSpace
+from gym_cellular_automata.operator import count_cells
+from gym_cellular_automata.tests import JIT, assert_twin_envs, step_twin_envs
 
 RANDOM_POLICY_ITERATIONS = 12
 TEST_GRID_ROWS = 3
@@ -209,3 +212,128 @@ def manual_assesment(verbose=False):
 
         sleep(0.2)
         print(".", end="")
+
+
+@pytest.mark.parametrize("backend", ["bitboard", JIT])
+def test_backends_with_random_policy(backend, reward_space):
+    env = ForestFireHelicopterEnv(ROW, COL, backend=backend)
+    env.reset()
+
+    for step in range(RANDOM_POLICY_ITERATIONS):
+        action = env.action_space.sample()
+        obs, reward, terminated, truncated, info = env.step(action)
+
+        assert_observation_and_reward_spaces(env, obs, reward, reward_space)
+
+        # Bitboards are held packed, observed unpacked
+        assert isinstance(env.grid, BitGrid) == (backend == "bitboard")
+        assert env.count_cells() == count_cells(obs[0])
+
+
+@pytest.mark.parametrize("sampling", ["dense", "sparse"])
+def test_sampling_with_random_policy(sampling, reward_space):
+    env = ForestFireHelicopterEnv(ROW, COL, sampling=sampling)
+    env.reset()
+
+    assert env.cellular_automaton.sampling == sampling
+
+    for step in range(RANDOM_POLICY_ITERATIONS):
+        action = env.action_space.sample()
+        obs, reward, terminated, truncated, info = env.step(action)
+
+        assert_observation_and_reward_spaces(env, obs, reward, reward_space)
+        assert env.count_cells() == count_cells(obs[0])
+
+
+def test_running_counts(env):
+    env.reset()
+
+    for i in range(RANDOM_POLICY_ITERATIONS):
+        (grid, __), *__ = env.step(env.action_space.sample())
+
+        assert env.count_cells() == count_cells(grid)
+
+    # A grid set from outside is counted again
+    env.grid = np.full_like(grid, env._tree)
+    assert env.count_cells() == count_cells(env.grid)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "bitboard", JIT])
+def test_compact_dtypes(backend, reward_space):
+    env = ForestFireHelicopterEnv(ROW, COL, backend=backend, dtypes="compact")
+    obs, info = env.reset()
+
+    assert obs[0].dtype == np.uint8
+
+    for step in range(RANDOM_POLICY_ITERATIONS):
+        action = env.action_space.sample()
+        obs, reward, terminated, truncated, info = env.step(action)
+
+        assert_observation_and_reward_spaces(env, obs, reward, reward_space)
+
+        grid, (ca_params, pos, freeze) = obs
+
+        assert grid.dtype == np.uint8
+        assert ca_params.dtype == np.float32
+        assert pos.dtype == np.int32
+
+
+@pytest.mark.parametrize("fused", [False, True])
+def test_compact_dtypes_past_freeze_resets(fused):
+    env = ForestFireHelicopterEnv(ROW, COL, freeze=1, dtypes="compact", fused=fused)
+    env.reset()
+
+    # Int32, as the compact index type
+    ca_params, pos, freeze = env.context
+    env.context = ca_params, pos, np.array(0, dtype=np.int32)
+
+    for step in range(RANDOM_POLICY_ITERATIONS):
+        obs, *__ = env.step(env.action_space.sample())
+
+        grid, (ca_params, pos, freeze) = obs
+
+        assert ca_params.dtype == np.float32
+        assert pos.dtype == np.int32
+        assert freeze.dtype == np.int32
+
+
+def test_unknown_dtypes():
+    with pytest.raises(ValueError):
+        ForestFireHelicopterEnv(ROW, COL, dtypes="tiny")
+
+
+@pytest.mark.parametrize("backend", ["numpy", "bitboard", JIT])
+def test_double_buffer_matches_env(backend):
+    single = ForestFireHelicopterEnv(ROW, COL, backend=backend)
+    buffered = ForestFireHelicopterEnv(ROW, COL, backend=backend, double_buffer=True)
+
+    for __, ((grid_buffered, __), *__) in step_twin_envs(
+        single, buffered, RANDOM_POLICY_ITERATIONS, 7
+    ):
+        assert buffered.count_cells() == count_cells(grid_buffered)
+
+
+@pytest.mark.parametrize("backend", ["numpy", JIT])
+def test_fused_matches_env(backend):
+    single = ForestFireHelicopterEnv(ROW, COL, backend=backend)
+    fused = ForestFireHelicopterEnv(ROW, COL, backend=backend, fused=True)
+
+    assert_twin_envs(single, fused, RANDOM_POLICY_ITERATIONS, 9)
+
+
+@pytest.mark.parametrize("double_buffer", [False, True])
+def test_structured_context_matches_env(double_buffer):
+    single = ForestFireHelicopterEnv(ROW, COL)
+    structured = ForestFireHelicopterEnv(
+        ROW, COL, structured_context=True, double_buffer=double_buffer
+    )
+
+    steps = step_twin_envs(single, structured, RANDOM_POLICY_ITERATIONS, 3)
+    next(steps)
+
+    record = structured.context_record
+    assert record.dtype.names == ("ca_params", "position", "freeze")
+
+    for __, (obs_structured, *__) in steps:
+        assert structured.context_record is record
+        assert structured.observation_space.contains(obs_structured)
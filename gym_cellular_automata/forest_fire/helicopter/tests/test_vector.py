@@ -0,0 +1,105 @@
+import gymnasium as gym
+import numpy as np
+import pytest
+
+from gym_cellular_automata.forest_fire.helicopter import (
+    ForestFireHelicopterEnv,
+    HelicopterVectorEnv,
+)
+from gym_cellular_automata.registration import GYM_MAKE
+
+NUM_ENVS = 8
+STEPS = 16
+
+ROW, COL = 5, 5
+
+
+@pytest.fixture
+def envs():
+    return HelicopterVectorEnv(NUM_ENVS, ROW, COL)
+
+
+def test_vector_env_api(envs):
+    obs, info = envs.reset(seed=42)
+    assert envs.observation_space.contains(obs)
+
+    for step in range(STEPS):
+        actions = envs.action_space.sample()
+        obs, rewards, terminated, truncated, info = envs.step(actions)
+
+        assert envs.observation_space.contains(obs)
+
+        assert rewards.shape == (NUM_ENVS,)
+        assert terminated.shape == truncated.shape == (NUM_ENVS,)
+        assert info["hit"].shape == (NUM_ENVS,)
+
+
+def test_template_env_keeps_its_operators(envs):
+    envs.reset(seed=3)
+
+    for step in range(STEPS):
+        envs.step(envs.action_space.sample())
+
+    assert envs.modify is not envs.env.modify
+
+    # Hits of the batch stay on the operators of the vectorized env
+    assert envs.modify.hit.shape == (NUM_ENVS,)
+    assert not isinstance(envs.env._report()["hit"], np.ndarray)
+
+
+def test_vector_env_seed():
+    envs1 = HelicopterVectorEnv(NUM_ENVS, ROW, COL)
+    envs2 = HelicopterVectorEnv(NUM_ENVS, ROW, COL)
+
+    (grids1, __), __ = envs1.reset(seed=7)
+    (grids2, __), __ = envs2.reset(seed=7)
+
+    assert np.all(grids1 == grids2)
+
+    actions = envs1.action_space.sample()
+    (grids1, __), *__ = envs1.step(actions)
+    (grids2, __), *__ = envs2.step(actions)
+
+    assert np.all(grids1 == grids2)
+
+
+def test_vector_env_matches_single_envs(envs):
+    """Deterministic CA (no lightning, no growth), thus comparable step by step."""
+    envs.reset(seed=0)
+    envs.ca_params[:] = 0.0
+
+    singles = []
+    for i in range(NUM_ENVS):
+        env = ForestFireHelicopterEnv(ROW, COL)
+        env.reset()
+
+        ca_params, pos, freeze = env.context
+        env.grid = envs.grids[i].copy()
+        env.context = np.zeros_like(ca_params), pos, np.array(envs.freezes[i])
+
+        singles.append(env)
+
+    for step in range(STEPS):
+        actions = envs.action_space.sample()
+        (grids, (__, positions, freezes)), rewards, *__, info = envs.step(actions)
+
+        for i, env in enumerate(singles):
+            (grid, (__, pos, freeze)), reward, *__, single_info = env.step(actions[i])
+
+            assert np.all(grids[i] == grid)
+            assert np.all(positions[i] == pos)
+            assert freezes[i] == freeze
+            assert rewards[i] == pytest.approx(reward)
+            assert info["hit"][i] == single_info["hit"]
+
+
+def test_make_vec():
+    helicopter = next(env_id for env_id in GYM_MAKE if "Helicopter" in env_id)
+    envs = gym.make_vec(helicopter, num_envs=NUM_ENVS)
+
+    assert isinstance(envs.unwrapped, HelicopterVectorEnv)
+
+    obs, info = envs.reset(seed=1)
+    obs, *__ = envs.step(envs.action_space.sample())
+
+    assert envs.observation_space.contains(obs)
@@ -21,8 +21,7 @@ HELICOPTER_COLOR = "#FFFFFF"  # White
 
 
 def render(env):
-    grid = env.grid
-    __, pos, __ = env.context
+    grid, (__, pos, __) = env._get_obs()
     row, col = pos
 
     plt.style.use("seaborn-v0_8-whitegrid")
@@ -0,0 +1,74 @@
+import numpy as np
+
+from gym_cellular_automata.ca_vector_env import CAVectorEnv
+
+from .helicopter import ForestFireHelicopterEnv
+
+
+class HelicopterVectorEnv(CAVectorEnv):
+    """
+    Native vectorized `ForestFireHelicopterEnv`.
+
+    The CA update, the freeze counters, `Move` and `Modify` are computed
+    for all the environments at once by `MDP.update_batch`, as the reward.
+    See `CAVectorEnv`.
+
+        Example::
+
+            >>> envs = HelicopterVectorEnv(512, nrows=5, ncols=5)
+            >>> obs, info = envs.reset(seed=42)
+            >>> obs, rewards, terminated, truncated, info = envs.step(envs.action_space.sample())
+
+    """
+
+    def __init__(self, num_envs, nrows, ncols, **kwargs):
+        super().__init__(num_envs, nrows, ncols, **kwargs)
+
+        self.ca = self.MDP.ca
+
+    @property
+    def ca_params(self):
+        return self.contexts["ca_params"]
+
+    @property
+    def positions(self):
+        return self.contexts["position"]
+
+    @property
+    def freezes(self):
+        return self.contexts["freeze"]
+
+    def _make_env(self, nrows, ncols, **kwargs):
+        return ForestFireHelicopterEnv(nrows, ncols, **kwargs)
+
+    def _get_initial_context(self):
+        return (
+            (self.env._p_fire, self.env._p_tree),
+            (self.nrows // 2, self.ncols // 2),
+            self.env._max_freeze,
+        )
+
+    def _award(self):
+        ncells = self.nrows * self.ncols
+
+        cell_counts = np.stack(
+            [
+                np.count_nonzero(self.grids == cell, axis=(1, 2))
+                for cell in (self.env._empty, self.env._tree, self.env._fire)
+            ],
+            axis=-1,
+        )
+
+        reward_weights = np.array(
+            [
+                self.env._reward_per_empty,
+                self.env._reward_per_tree,
+                self.env._reward_per_fire,
+            ]
+        )
+
+        return (cell_counts / ncells) @ reward_weights
+
+    def _is_done(self):
+        # As `ForestFireHelicopterEnv`, it never ends
+        return np.zeros(self.num_envs, dtype=bool)
@@ -1,15 +1,15 @@
+from collections import Counter
+
 import numpy as np
 from gymnasium import spaces
 
+from gym_cellular_automata import out_of_core
 from gym_cellular_automata._config import TYPE_BOX
-from gym_cellular_automata.forest_fire.utils.neighbors import neighborhood_at
-from gym_cellular_automata.operator import Operator
-
-
-def normalize_p(p):
-    p = np.asarray(p).astype("float64")
-    p = p / np.sum(p)
-    return p
+from gym_cellular_automata.forest_fire.utils import bands, bitboard, kernels
+from gym_cellular_automata.forest_fire.utils.bitboard import BitGrid
+from gym_cellular_automata.forest_fire.utils.neighbors import moore_any
+from gym_cellular_automata.forest_fire.utils.shared_bands import SharedBands
+from gym_cellular_automata.operator import Operator, copy_into, count_cells
 
 
 class ForestFire(Operator):
@@ -19,48 +19,410 @@ class ForestFire(Operator):
 
     deterministic = False
 
-    def __init__(self, empty, tree, fire, *args, **kwargs):
+    backends = ("numpy", "bitboard", "jit")
+
+    # How lightning strikes and growths are drawn, see `_sample_events`
+    samplings = ("dense", "sparse")
+
+    def __init__(
+        self,
+        empty,
+        tree,
+        fire,
+        *args,
+        backend="numpy",
+        sampling="dense",
+        threads=None,
+        processes=None,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
 
         self.empty = empty
         self.tree = tree
         self.fire = fire
 
+        self._set_backend(backend)
+
+        if threads is not None and processes is not None:
+            raise ValueError("Use either 'threads' or 'processes', not both.")
+
+        # Row bands updated on a thread pool, see `_update_bands`
+        self.threads = threads
+        self._executor = bands.thread_pool(threads)
+
+        # Row bands updated on worker processes, see `_run_shared`
+        self.processes = processes
+        self._shared = None if processes is None else SharedBands(processes)
+
+        if sampling not in self.samplings:
+            raise ValueError(
+                f"Unknown sampling '{sampling}', use one of {self.samplings}."
+            )
+
+        if sampling == "sparse" and self.backend == "jit":
+            raise ValueError("The 'jit' backend only supports 'dense' sampling.")
+
+        self.sampling = sampling
+
+        # Uniform roll of the compiled updates, see `_update_jit`
+        self._roll = None
+
         if self.context_space is None:
             self.context_space = spaces.Box(0.0, 1.0, shape=(2,), dtype=TYPE_BOX)
 
     def update(self, grid, action, context):
-        # A copy is needed for the sequential update of a CA
-        new_grid = grid.copy()
-        p_fire, p_tree = context
+        # Only known on memory mapped grids
+        self.delta = None
+
+        if out_of_core.is_memmap(grid):
+            return self._update_chunks(grid, context), context
+
+        if self.backend == "bitboard" or isinstance(grid, BitGrid):
+            return self._update_bitboard(grid, context), context
+
+        if self.threads and grid.shape[-2] > bands.BAND:
+            return self._update_bands(grid, context), context
+
+        if self._shared is not None and grid.shape[-2] > bands.BAND:
+            return self._run_shared(grid, context), context
+
+        if self.backend == "jit" and grid.ndim == 2:
+            return self._update_jit(grid, context), context
+
+        p_fire, p_tree = self._get_probabilities(context)
+
+        strike, growth = self._sample_events(grid.shape, p_fire, p_tree)
+
+        return self._next_cells(grid, strike, growth), context
+
+    def update_batch(self, grids, actions, contexts):
+        """Batches are native, a context per grid, see `update`."""
+        return self.update(grids, actions, contexts)
+
+    def update_into(self, grid, action, context, out_grid, out_context):
+        """Same update, written on `out_grid` for plain arrays."""
+        if not self._writes_into(grid, out_grid):
+            return super().update_into(grid, action, context, out_grid, out_context)
+
+        self.delta = None
+
+        if self.threads and grid.shape[-2] > bands.BAND:
+            new_grid = self._update_bands(grid, context, out=out_grid)
+
+        elif self.backend == "jit" and grid.ndim == 2:
+            new_grid = self._update_jit(grid, context, out=out_grid)
+
+        else:
+            p_fire, p_tree = self._get_probabilities(context)
+            strike, growth = self._sample_events(grid.shape, p_fire, p_tree)
+
+            new_grid = self._next_cells(grid, strike, growth, out=out_grid)
+
+        return new_grid, copy_into(context, out_context)
+
+    def _writes_into(self, grid, out_grid):
+        """Whether the update of `grid` is written on `out_grid`."""
+        return (
+            type(grid) is np.ndarray
+            and type(out_grid) is np.ndarray
+            and out_grid.shape == grid.shape
+            and out_grid.dtype == grid.dtype
+            and self.backend != "bitboard"
+            and (self._shared is None or grid.shape[-2] <= bands.BAND)
+        )
+
+    def _next_cells(self, grid, strike, growth, rows=slice(None), out=None):
+        """
+        New cells of the `rows` of `grid`, other rows are only neighbors.
+        Written on `out` if given.
+        """
+        # All the rules are evaluated on the old grid,
+        # that is the sequential update of a CA
+        is_fire = grid == self.fire
+
+        # Cells beyond the boundary are `empty`, thus never on fire
+        fire_nearby = moore_any(is_fire, invariant=False)[..., rows, :]
+
+        grid, is_fire = grid[..., rows, :], is_fire[..., rows, :]
+
+        is_tree = grid == self.tree
+        is_empty = grid == self.empty
+
+        # Burn tree to the ground or lightning strike
+        burn = is_tree & (fire_nearby | strike)
+
+        # Grow a tree
+        growth = is_empty & growth
+
+        if out is None:
+            new_grid = grid.copy()
+        else:
+            new_grid = out
+            np.copyto(new_grid, grid)
+
+        new_grid[burn] = self.fire
+        new_grid[growth] = self.tree
+
+        # Consume fire
+        new_grid[is_fire] = self.empty
+
+        return new_grid
+
+    def _update_bands(self, grid, context, out=None):
+        """
+        Update by row bands on the thread pool, written on `out` if given.
+        Each band draws from its own substream, thus the new grid
+        is the same for any number of threads.
+        """
+        p_fire, p_tree = self._get_probabilities(context)
+
+        nrows = grid.shape[-2]
+        rngs = bands.band_rngs(self.np_random, len(bands.bands(nrows)))
+
+        new_grid = np.empty_like(grid) if out is None else out
+
+        def update_band(k, start, stop):
+            self._update_band(grid, new_grid, start, stop, p_fire, p_tree, rngs[k])
+
+        bands.map_bands(self._executor, update_band, nrows)
+
+        return new_grid
 
-        for row, cells in enumerate(grid):
-            for col, cell in enumerate(cells):
-                neighbors = neighborhood_at(grid, (row, col), invariant=self.empty)
+    def _run_shared(self, grid, context):
+        """
+        Update by row bands on the worker processes.
+        Same substreams per band as `_update_bands`, thus same result.
+        """
+        p_fire, p_tree = self._get_probabilities(context)
 
-                if cell == self.tree and self.fire in neighbors:
-                    # Burn tree to the ground
-                    new_grid[row][col] = self.fire
+        nbands = len(bands.bands(grid.shape[-2]))
+        rngs = bands.band_rngs(self.np_random, nbands)
 
-                elif cell == self.tree:
-                    # Sample for lightning strike
+        updates = [[(p_fire, p_tree, rng) for rng in rngs]]
 
-                    strike = self.np_random.choice(
-                        [True, False], p=normalize_p([p_fire, 1 - p_fire])
-                    )
+        return self._shared.run(self, "_update_band", grid, updates)
 
-                    new_grid[row][col] = self.fire if strike else cell
+    def _update_chunks(self, grid, context):
+        """
+        Update of a memory mapped grid by chunks of rows, on a new mapped grid.
+        Population changes are counted per chunk.
+        """
+        p_fire, p_tree = self._get_probabilities(context)
+
+        ranges = bands.bands(grid.shape[-2], out_of_core.chunk_rows(grid.shape))
+
+        new_grid = out_of_core.empty_like(grid)
+
+        # Plain views of the maps, as the compiled kernels take
+        old_cells, new_cells = np.asarray(grid), np.asarray(new_grid)
+
+        self.delta = Counter()
+
+        for start, stop in ranges:
+            self._update_band(
+                old_cells, new_cells, start, stop, p_fire, p_tree, self.np_random
+            )
+
+            self.delta.subtract(count_cells(old_cells[..., start:stop, :]))
+            self.delta.update(count_cells(new_cells[..., start:stop, :]))
+
+        return new_grid
+
+    def _update_band(self, grid, out, start, stop, p_fire, p_tree, rng):
+        """
+        New cells of the rows `start:stop` of `grid`, written on those of `out`.
+        Lightning and growth are drawn from `rng`.
+        """
+        low, high = bands.halo(start, stop, grid.shape[-2])
+        window = grid[..., low:high, :]
+        inner = slice(start - low, stop - low)
+
+        shape = grid.shape[:-2] + (stop - start, grid.shape[-1])
+
+        if self.backend == "jit" and grid.ndim == 2:
+            # Halo rows are not updated, their rolls are irrelevant
+            roll = np.ones(window.shape)
+            roll[inner] = rng.random(shape)
+
+            new_window = kernels.drossel_schwabl(
+                window,
+                roll,
+                p_fire.item(),
+                p_tree.item(),
+                np.ones((3, 3), dtype=bool),
+                self.empty,
+                self.tree,
+                self.fire,
+                np.empty_like(window),
+            )
+            out[start:stop] = new_window[inner]
+
+        else:
+            strike, growth = self._sample_events(shape, p_fire, p_tree, rng)
+            out[..., start:stop, :] = self._next_cells(window, strike, growth, inner)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.close()
+
+        if self._shared is not None:
+            self._shared.close()
+
+    def detach(self, grid):
+        if self._shared is not None:
+            return self._shared.detach(grid)
+
+        return grid
+
+    def is_quiescent(self, grid, context):
+        """
+        Without FIRE, lightning and growth are the only changes.
+        Each is ruled out by a null probability or by lack of cells to act on.
+        """
+        if isinstance(grid, BitGrid):
+            # On the bit planes, empty cells are the valid bits of neither plane
+            planes = dict(axis=(-2, -1), keepdims=True)
+
+            has_fire = np.any(grid.fire, **planes)
+            has_tree = np.any(grid.tree, **planes)
+            has_empty = np.any(~(grid.tree | grid.fire) & grid.valid, **planes)
+
+        else:
+            has_fire = out_of_core.any_equal(grid, self.fire)
+            has_tree = out_of_core.any_equal(grid, self.tree)
+            has_empty = out_of_core.any_equal(grid, self.empty)
+
+        p_fire, p_tree = self._get_probabilities(context)
+
+        no_fire = ~has_fire
+        no_strikes = (p_fire == 0) | ~has_tree
+        no_growths = (p_tree == 0) | ~has_empty
+
+        return bool(np.all(no_fire & no_strikes & no_growths))
+
+    def _get_probabilities(self, context):
+        """
+        Params are on the last axis of the context.
+        A batch of contexts, shape `(B, 2)`, broadcasts over its `(B, nrows, ncols)` grids.
+        """
+        return np.moveaxis(np.asarray(context), -1, 0)[..., None, None]
+
+    def _sample_events(self, shape, p_fire, p_tree, rng=None):
+        """
+        Masks of lightning strikes and growths over all the cells,
+        only those on trees and on empty cells take effect.
+
+        "dense" rolls once per cell, as a cell is either a tree or empty.
+        "sparse" draws how many cells are hit, then which ones,
+        its cost scales with the number of events instead of the grid area.
+        Draws from `rng`, by default the generator of the operator.
+        """
+        rng = self.np_random if rng is None else rng
+
+        if self.sampling == "dense":
+            roll = rng.random(shape)
+            return roll < p_fire, roll < p_tree
+
+        return (
+            self._sample_sparse(shape, p_fire, rng),
+            self._sample_sparse(shape, p_tree, rng),
+        )
+
+    def _sample_sparse(self, shape, p, rng):
+        """
+        Each cell is hit with probability `p`, one `p` per grid of a batch.
+        A binomial number of hits at distinct cells, chosen uniformly.
+        """
+        nrows, ncols = shape[-2:]
+        ncells = nrows * ncols
+
+        hits = np.zeros(shape, dtype=bool)
+        flat_hits = hits.reshape(-1, ncells)
+
+        p = np.broadcast_to(p, shape[:-2] + (1, 1)).reshape(-1)
+
+        for flat, prob in zip(flat_hits, p):
+            flat[self._sparse_hits(ncells, prob, rng)] = True
+
+        return hits
+
+    def _sparse_hits(self, ncells, p, rng):
+        """Flat indices of the cells hit, a binomial number of distinct cells."""
+        nhits = rng.binomial(ncells, p)
+        return rng.choice(ncells, nhits, replace=False)
+
+    def _sample_bits(self, shape, p):
+        """
+        Packed masks of events of probability `p`, one `p` per grid of a batch.
+        Drawn straight as bits, no roll of the grid size is held.
+        "sparse" sets the same cells as `_sample_sparse`.
+        """
+        nrows, ncols = shape[-2:]
+        p = np.broadcast_to(p, shape[:-2] + (1, 1)).reshape(-1)
+
+        if self.sampling == "sparse":
+            words = [
+                bitboard.pack_indices(
+                    self._sparse_hits(nrows * ncols, prob, self.np_random),
+                    (nrows, ncols),
+                )
+                for prob in p
+            ]
+        else:
+            words = [
+                bitboard.random_bits(self.np_random, prob, (nrows, ncols)) for prob in p
+            ]
+
+        return np.stack(words).reshape(shape[:-1] + words[0].shape[-1:])
+
+    def _update_bitboard(self, grid, context):
+        """
+        Same rules over packed bit planes.
+        A `BitGrid` input stays packed, a plain grid is packed and unpacked.
+        """
+        p_fire, p_tree = self._get_probabilities(context)
+
+        board = grid
+        if not isinstance(grid, BitGrid):
+            board = BitGrid.from_grid(grid, self.empty, self.tree, self.fire)
+
+        tree, fire, empty = board.tree, board.fire, board.empty
+
+        fire_nearby = bitboard.moore_any(fire, board.valid)
+
+        # Same draws as the numpy backend on "sparse" sampling,
+        # "dense" bits follow the same distribution on their own stream
+        strike = self._sample_bits(board.shape, p_fire)
+        growth = self._sample_bits(board.shape, p_tree)
+
+        burn = tree & (fire_nearby | strike)
+
+        # Fire is consumed by omission
+        new_board = board.replace(tree=(tree & ~burn) | (empty & growth), fire=burn)
+
+        return new_board if isinstance(grid, BitGrid) else new_board.to_grid()
+
+    def _update_jit(self, grid, context, out=None):
+        p_fire, p_tree = context
 
-                elif cell == self.empty:
-                    # Sample to grow a tree
-                    growth = self.np_random.choice(
-                        [True, False], p=normalize_p([p_tree, 1 - p_tree])
-                    )
+        # Same draws as the numpy backend, on a roll kept across updates
+        if self._roll is None or self._roll.shape != grid.shape:
+            self._roll = np.empty(grid.shape)
 
-                    new_grid[row][col] = self.tree if growth else cell
+        roll = self.np_random.random(out=self._roll)
 
-                elif cell == self.fire:
-                    # Consume fire
-                    new_grid[row][col] = self.empty
+        # The whole Moore's neighborhood propagates fire
+        propagates = np.ones((3, 3), dtype=bool)
 
-        return new_grid, context
+        return kernels.drossel_schwabl(
+            grid,
+            roll,
+            p_fire,
+            p_tree,
+            propagates,
+            self.empty,
+            self.tree,
+            self.fire,
+            np.empty_like(grid) if out is None else out,
+        )
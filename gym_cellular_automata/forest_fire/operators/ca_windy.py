@@ -1,11 +1,18 @@
-from collections import namedtuple
+from collections import Counter, namedtuple
 
 import numpy as np
 from gymnasium import spaces
-from scipy.signal import convolve2d
 
-from gym_cellular_automata._config import TYPE_BOX
-from gym_cellular_automata.operator import Operator
+from gym_cellular_automata import out_of_core
+from gym_cellular_automata._config import TYPE_BOX, TYPE_INT
+from gym_cellular_automata.forest_fire.utils import bands, bitboard, kernels
+from gym_cellular_automata.forest_fire.utils.bitboard import BitGrid
+from gym_cellular_automata.forest_fire.utils.shared_bands import SharedBands
+from gym_cellular_automata.operator import Operator, copy_into, count_cells
+from gym_cellular_automata.tiled_grid import TiledGrid
+
+# Signal breaks between the rules, see `_get_breaks`
+Breaks = namedtuple("Breaks", ["keep", "propagate", "consume"])
 
 
 class WindyForestFire(Operator):
@@ -23,9 +30,39 @@ class WindyForestFire(Operator):
     _row_k = 3
     _col_k = 3
 
-    def __init__(self, empty=0, tree=3, fire=25, *args, **kwargs):
+    backends = ("numpy", "bitboard", "jit")
+
+    def __init__(
+        self,
+        empty=0,
+        tree=3,
+        fire=25,
+        *args,
+        backend="numpy",
+        frontier=False,
+        threads=None,
+        processes=None,
+        **kwargs
+    ):
         super().__init__(*args, **kwargs)
 
+        self._set_backend(backend)
+
+        if threads is not None and processes is not None:
+            raise ValueError("Use either 'threads' or 'processes', not both.")
+
+        # Row bands updated on a thread pool, see `_step_bands`
+        self.threads = threads
+        self._executor = bands.thread_pool(threads)
+
+        # Row bands updated on worker processes, see `_run_shared`
+        self.processes = processes
+        self._shared = None if processes is None else SharedBands(processes)
+
+        # Restrict the updates to the fire surroundings, see `_update_frontier`
+        self.frontier = frontier
+        self._frontier = None
+
         # Cell Values
         self._empty = empty
         self._tree = tree
@@ -34,6 +71,15 @@ class WindyForestFire(Operator):
         self._assert_correctness()
 
         self.breaks = self._get_breaks()
+        self.lookup_table = self._get_lookup_table(self.breaks)
+        self._typed_tables = {}
+
+        # Stencil buffers, allocated on demand by `_get_stencil_buffers`
+        self._signal_dtype = self._get_signal_dtype()
+        self._stencil_buffers = {}
+
+        # Turns of the bursts written on caller buffers, see `update_burst_into`
+        self._burst_buffer = None
 
         if self.context_space is None:
             self.context_space = spaces.Box(0.0, 1.0, shape=(3, 3), dtype=TYPE_BOX)
@@ -42,45 +88,508 @@ class WindyForestFire(Operator):
         # Sample which FIREs fail to propagate this update
         fail_to_propagate = self._get_failed_propagations_mask(wind)
 
-        kernel = self._get_kernel(fail_to_propagate)
+        # Only known on the frontier
+        self.delta = None
 
-        grid_signal = self._convolve(grid, kernel)
+        if isinstance(grid, TiledGrid):
+            return self._update_frontier(grid, fail_to_propagate[None]), wind
+
+        if out_of_core.is_memmap(grid):
+            return self._update_chunks(grid, fail_to_propagate[None]), wind
 
-        new_grid = self._translate_analogic_to_discrete(grid_signal, self.breaks)
+        if self.backend == "bitboard" or isinstance(grid, BitGrid):
+            return self._update_bitboard(grid, fail_to_propagate), wind
+
+        if self.frontier:
+            return self._update_frontier(grid, fail_to_propagate[None]), wind
+
+        if self._shared is not None and grid.shape[-2] > bands.BAND:
+            return self._run_shared(grid, fail_to_propagate[None]), wind
+
+        new_grid = self._step(
+            grid, fail_to_propagate, np.empty(grid.shape, dtype=grid.dtype)
+        )
 
         return new_grid, wind
 
-    def _get_failed_propagations_mask(self, wind):
+    def update_batch(self, grids, actions, winds):
+        """Batches are native, a wind per grid, see `update`."""
+        return self.update(grids, actions, winds)
+
+    def update_into(self, grid, action, wind, out_grid, out_wind):
+        """Same update, written on `out_grid` for plain arrays."""
+        if not self._writes_into(grid, out_grid):
+            return super().update_into(grid, action, wind, out_grid, out_wind)
+
+        fail_to_propagate = self._get_failed_propagations_mask(wind)
+
+        self.delta = None
+
+        new_grid = self._step(grid, fail_to_propagate, out_grid)
+
+        return new_grid, copy_into(wind, out_wind)
+
+    def update_burst(self, grid, action, wind, repeats):
         """
-        Here goes the only sampling of the step.
+        `repeats` updates from masks sampled at once, same stream as a loop.
+        The halo buffer of the stencil and the output grid take turns
+        as the current grid, thus no grid is allocated per update.
         """
-        uniform_space = spaces.Box(
-            low=0.0, high=1.0, shape=(self._row_k, self._col_k), dtype=TYPE_BOX
+        if repeats == 0:
+            self.delta = Counter()
+            return grid, wind
+
+        fail_to_propagate = self._get_failed_propagations_mask(wind, repeats)
+
+        self.delta = None
+
+        if isinstance(grid, TiledGrid):
+            return self._update_frontier(grid, fail_to_propagate), wind
+
+        if out_of_core.is_memmap(grid):
+            return self._update_chunks(grid, fail_to_propagate), wind
+
+        if self.backend == "bitboard" or isinstance(grid, BitGrid):
+            for failed in fail_to_propagate:
+                grid = self._update_bitboard(grid, failed)
+
+            return grid, wind
+
+        if self.frontier:
+            return self._update_frontier(grid, fail_to_propagate), wind
+
+        if self._shared is not None and grid.shape[-2] > bands.BAND:
+            return self._run_shared(grid, fail_to_propagate), wind
+
+        if (self.backend == "jit" and grid.ndim == 2) or self.threads:
+            # Ping-pong between two grids
+            current, new_grid = grid.copy(), np.empty_like(grid)
+
+            for failed in fail_to_propagate:
+                self._step(current, failed, new_grid)
+                current, new_grid = new_grid, current
+
+            return current, wind
+
+        new_grid = np.empty(grid.shape, dtype=grid.dtype)
+
+        for failed in fail_to_propagate:
+            # Copied into the halo buffer, thus `new_grid` is free to be written
+            grid = self._step(grid, failed, new_grid)
+
+        return new_grid, wind
+
+    def update_burst_into(self, grid, action, wind, repeats, out_grid, out_wind):
+        """
+        Same updates, the last one written on `out_grid` for plain arrays.
+        Updates that cannot be written in place take turns with a buffer
+        kept by the operator, ordered so that the last lands on `out_grid`.
+        """
+        if repeats == 0 or not self._writes_into(grid, out_grid):
+            return super().update_burst_into(
+                grid, action, wind, repeats, out_grid, out_wind
+            )
+
+        fail_to_propagate = self._get_failed_propagations_mask(wind, repeats)
+
+        self.delta = None
+
+        if (self.backend == "jit" and grid.ndim == 2) or self.threads:
+            spare = self._get_burst_buffer(grid)
+
+            current = grid
+            for k, failed in enumerate(fail_to_propagate):
+                new_grid = out_grid if (repeats - k) % 2 == 1 else spare
+                current = self._step(current, failed, new_grid)
+
+        else:
+            current = grid
+            for failed in fail_to_propagate:
+                # Copied into the halo buffer, thus `out_grid` is free to be written
+                current = self._step(current, failed, out_grid)
+
+        return current, copy_into(wind, out_wind)
+
+    def is_quiescent(self, grid, wind):
+        """Without FIRE nothing changes, on every grid of a batch."""
+        if isinstance(grid, BitGrid):
+            return not np.any(grid.fire)
+
+        if isinstance(grid, TiledGrid):
+            return grid.box(self._fire) is None
+
+        if self._frontier is not None and grid is self._frontier[0]:
+            return self._frontier[1] is None
+
+        return not np.any(out_of_core.any_equal(grid, self._fire))
+
+    def _writes_into(self, grid, out_grid):
+        """Whether the updates of `grid` are written on `out_grid`, see `_step`."""
+        return (
+            type(grid) is np.ndarray
+            and type(out_grid) is np.ndarray
+            and out_grid.shape == grid.shape
+            and out_grid.dtype == grid.dtype
+            and self.backend != "bitboard"
+            and not self.frontier
+            and (self._shared is None or grid.shape[-2] <= bands.BAND)
         )
-        uniform_roll = uniform_space.sample()
 
-        failed_propagations = np.repeat(False, self._row_k * self._col_k).reshape(
-            self._row_k, self._col_k
+    def _get_burst_buffer(self, grid):
+        """A grid like `grid`, kept for the bursts of grids like it."""
+        buffer = self._burst_buffer
+
+        if buffer is None or buffer.shape != grid.shape or buffer.dtype != grid.dtype:
+            buffer = self._burst_buffer = np.empty_like(grid)
+
+        return buffer
+
+    def _step(self, grid, failed_propagations, out):
+        """
+        Full update of `grid` written on `out`.
+        Only the unthreaded numpy path allows `out` to be `grid`.
+        """
+        if self.threads and grid.shape[-2] > bands.BAND:
+            return self._step_bands(grid, failed_propagations, out)
+
+        if self.backend == "jit" and grid.ndim == 2:
+            return kernels.windy(
+                grid,
+                ~failed_propagations,
+                self._empty,
+                self._tree,
+                self._fire,
+                out,
+            )
+
+        kernel = self._get_kernel(failed_propagations)
+
+        grid_signal = self._convolve(grid, kernel)
+
+        return self._translate_analogic_to_discrete(grid_signal, self.breaks, out=out)
+
+    def _step_bands(self, grid, failed_propagations, out):
+        """
+        `_step` by row bands on the thread pool, each band written on `out`.
+        A single mask per update, thus same result as the unthreaded update.
+        """
+
+        def step_band(k, start, stop):
+            self._step_band(grid, out, start, stop, failed_propagations, key=k)
+
+        bands.map_bands(self._executor, step_band, grid.shape[-2])
+
+        return out
+
+    def _run_shared(self, grid, failed_propagations):
+        """
+        Updates, one per mask, by row bands on the worker processes.
+        Same masks as the unthreaded updates, thus same result.
+        """
+        nbands = len(bands.bands(grid.shape[-2]))
+        updates = ([(failed,)] * nbands for failed in failed_propagations)
+
+        return self._shared.run(self, "_step_band", grid, updates)
+
+    def _update_chunks(self, grid, failed_propagations):
+        """
+        Updates, one per mask, of a memory mapped grid by chunks of rows.
+        At most two new grids are mapped, they take turns as the current grid.
+        Population changes are counted per chunk.
+        """
+        ranges = bands.bands(grid.shape[-2], out_of_core.chunk_rows(grid.shape))
+
+        self.delta = Counter()
+
+        current, spare = grid, None
+        for failed in failed_propagations:
+            new_grid = out_of_core.empty_like(grid) if spare is None else spare
+
+            # Plain views of the maps, as the compiled kernels take
+            old_cells, new_cells = np.asarray(current), np.asarray(new_grid)
+
+            for start, stop in ranges:
+                self._step_band(old_cells, new_cells, start, stop, failed)
+
+                self.delta.subtract(count_cells(old_cells[..., start:stop, :]))
+                self.delta.update(count_cells(new_cells[..., start:stop, :]))
+
+            spare = None if current is grid else current
+            current = new_grid
+
+        return current
+
+    def _step_band(self, grid, out, start, stop, failed_propagations, key=None):
+        """
+        New cells of the rows `start:stop` of `grid`, written on those of `out`.
+        `key` names the stencil buffers of the band.
+        """
+        low, high = bands.halo(start, stop, grid.shape[-2])
+        window = grid[..., low:high, :]
+        inner = slice(start - low, stop - low)
+
+        if self.backend == "jit" and grid.ndim == 2:
+            new_window = kernels.windy(
+                window,
+                ~failed_propagations,
+                self._empty,
+                self._tree,
+                self._fire,
+                np.empty_like(window),
+            )
+            out[..., start:stop, :] = new_window[..., inner, :]
+
+        else:
+            kernel = self._get_kernel(failed_propagations)
+            signal = self._convolve(window, kernel, key=key)
+
+            self._translate_analogic_to_discrete(
+                signal[..., inner, :], self.breaks, out=out[..., start:stop, :]
+            )
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.close()
+
+        if self._shared is not None:
+            self._shared.close()
+
+    def detach(self, grid):
+        if self._shared is not None:
+            return self._shared.detach(grid)
+
+        return grid
+
+    def _update_frontier(self, grid, failed_propagations):
+        """
+        Updates, one per mask, restricted to the fire bounding box.
+        Written in place on `grid`, as `Modify` does, thus the cost
+        follows the fire front instead of the grid area.
+
+        Outside the box dilated by one cell no cell can change,
+        a TREE needs a FIRE neighbor to burn.
+        The box of a grid returned by the last call is known,
+        any other grid is scanned for FIRE. Thus in place edits
+        of a returned grid may remove FIRE but never add it.
+
+        The only update of a `TiledGrid`, tiles far from the fire stay unread.
+        """
+        if self._frontier is not None and grid is self._frontier[0]:
+            box = self._frontier[1]
+        else:
+            box = self._get_fire_box(grid)
+
+        # Population changes are counted on the updated cells
+        self.delta = Counter()
+
+        for failed in failed_propagations:
+            box = self._advance_frontier(grid, failed, box)
+
+        self._frontier = grid, box
+
+        return grid
+
+    def _advance_frontier(self, grid, failed_propagations, box):
+        """
+        In place update of the cells around the fire.
+        Returns the new fire bounding box, None without fire.
+        """
+        if box is None:
+            # Nothing burns, nothing changes
+            return None
+
+        nrows, ncols = grid.shape[-2:]
+        row_min, row_max, col_min, col_max = box
+
+        def dilate(cells):
+            return (
+                max(row_min - cells, 0),
+                min(row_max + cells, nrows),
+                max(col_min - cells, 0),
+                min(col_max + cells, ncols),
+            )
+
+        # Cells that may change and the neighbors they read
+        r0, r1, c0, c1 = dilate(1)
+        rr0, rr1, cc0, cc1 = dilate(2)
+
+        window = grid[..., rr0:rr1, cc0:cc1]
+        new_window = self._step(
+            window, failed_propagations, np.empty(window.shape, dtype=grid.dtype)
         )
+
+        updated = new_window[..., r0 - rr0 : r1 - rr0, c0 - cc0 : c1 - cc0]
+
+        self.delta.subtract(count_cells(grid[..., r0:r1, c0:c1]))
+        self.delta.update(count_cells(updated))
+
+        grid[..., r0:r1, c0:c1] = updated
+
+        # New FIREs are within the updated cells
+        return self._get_fire_box(grid[..., r0:r1, c0:c1], offset=(r0, c0))
+
+    def _get_fire_box(self, grid, offset=(0, 0)):
+        """
+        Half-open bounding box of the FIRE cells, over all grids of a batch.
+        """
+        if isinstance(grid, TiledGrid):
+            return grid.box(self._fire)
+
+        is_fire = grid == self._fire
+        is_fire = is_fire.reshape((-1,) + grid.shape[-2:]).any(axis=0)
+
+        rows = np.flatnonzero(is_fire.any(axis=1))
+
+        if rows.size == 0:
+            return None
+
+        cols = np.flatnonzero(is_fire.any(axis=0))
+
+        row, col = offset
+
+        return row + rows[0], row + rows[-1] + 1, col + cols[0], col + cols[-1] + 1
+
+    def _update_bitboard(self, grid, failed_propagations):
+        """
+        Same rules over packed bit planes.
+        A `BitGrid` input stays packed, a plain grid is packed and unpacked.
+        """
+        board = grid
+        if not isinstance(grid, BitGrid):
+            board = BitGrid.from_grid(grid, self._empty, self._tree, self._fire)
+
+        tree, fire = board.tree, board.fire
+
+        # Kernel entry (i, j) weights the neighbor at offset (1 - i, 1 - j),
+        # as `convolve2d` flips the kernel
+        spread = np.zeros_like(fire)
+        for i, j in np.ndindex(self._row_k, self._col_k):
+            if (i, j) != (1, 1):
+                # All or nothing words, one per grid of the batch
+                propagates = ~failed_propagations[..., i, j, None, None]
+                words = np.where(propagates, ~np.uint64(0), np.uint64(0))
+
+                spread |= bitboard.shift(fire, 1 - i, 1 - j, board.valid) & words
+
+        # Fire is consumed by omission
+        new_board = board.replace(tree=tree & ~spread, fire=tree & spread)
+
+        return new_board if isinstance(grid, BitGrid) else new_board.to_grid()
+
+    def _get_failed_propagations_mask(self, wind, repeats=None):
+        """
+        Here goes the only sampling of the step.
+        A batch of winds, shape `(B, 3, 3)`, samples a mask per grid.
+        With `repeats` the masks of as many updates are stacked on a new axis.
+        """
+        shape = np.shape(wind) if repeats is None else (repeats,) + np.shape(wind)
+        uniform_roll = self.np_random.random(shape)
+
         failed_propagations = wind <= uniform_roll
 
         return failed_propagations
 
     def _get_kernel(self, failed_propagations):
-        kernel = np.repeat(self._propagation, self._row_k * self._col_k).reshape(
-            self._row_k, self._col_k
-        )
+        kernel = np.full(failed_propagations.shape, self._propagation)
 
         kernel[failed_propagations] = self._empty
-        kernel[1, 1] = self._identity
+        kernel[..., 1, 1] = self._identity
 
         return kernel
 
-    def _convolve(self, grid, kernel):
-        return convolve2d(
-            grid, kernel, mode="same", boundary="fill", fillvalue=self._empty
+    def _convolve(self, grid, kernel, key=None):
+        """
+        Shift-and-add stencil, same result as a zero padded `convolve2d`.
+        As `convolve2d` flips the kernel, entry (i, j) weights
+        the neighbor at offset (1 - i, 1 - j).
+
+        Directions of null weight, those that failed to propagate, are skipped.
+        The returned signal is a buffer reused by the next call with the same `key`.
+        """
+        padded, signal, scratch = self._get_stencil_buffers(grid.shape, key)
+
+        # The halo keeps the `empty` fill from the allocation
+        padded[..., 1:-1, 1:-1] = grid
+
+        nrows, ncols = grid.shape[-2:]
+
+        def neighbors(i, j):
+            return padded[..., 2 - i : 2 - i + nrows, 2 - j : 2 - j + ncols]
+
+        signal[...] = 0
+
+        if kernel.ndim == 2:
+            # Directions sharing a weight are summed before the product
+            for weight in np.unique(kernel):
+                if weight == 0:
+                    continue
+
+                directions = list(zip(*np.nonzero(kernel == weight)))
+
+                np.copyto(scratch, neighbors(*directions[0]))
+                for i, j in directions[1:]:
+                    np.add(scratch, neighbors(i, j), out=scratch)
+
+                np.multiply(scratch, int(weight), out=scratch)
+                np.add(signal, scratch, out=signal)
+
+        else:
+            # A batch of grids, each with its own kernel
+            weights = kernel.astype(self._signal_dtype)
+
+            for i, j in np.ndindex(self._row_k, self._col_k):
+                if not np.any(weights[:, i, j]):
+                    continue
+
+                np.multiply(neighbors(i, j), weights[:, i, j, None, None], out=scratch)
+                np.add(signal, scratch, out=signal)
+
+        return signal
+
+    def _get_stencil_buffers(self, shape, key=None):
+        """
+        Halo padded grid, signal and scratch buffers for grids of `shape`.
+        Each `key`, the band on threaded updates, keeps its own buffers
+        of the last seen shape.
+        """
+        padded_shape = shape[:-2] + (shape[-2] + 2, shape[-1] + 2)
+
+        buffers = self._stencil_buffers.get(key)
+
+        if buffers is None or buffers[0].shape != padded_shape:
+            padded = np.full(padded_shape, self._empty, dtype=self._signal_dtype)
+            signal = np.empty(shape, dtype=self._signal_dtype)
+            scratch = np.empty(shape, dtype=self._signal_dtype)
+
+            buffers = self._stencil_buffers[key] = padded, signal, scratch
+
+        return buffers
+
+    def _get_signal_dtype(self):
+        """
+        Narrowest integer type that holds any signal value.
+        """
+        low, high = self._get_signal_bounds()
+
+        return np.promote_types(
+            np.min_scalar_type(int(low)), np.min_scalar_type(int(high))
         )
 
+    def _get_signal_bounds(self):
+        """
+        Cells are within [EMPTY, FIRE], failed directions weight EMPTY.
+        """
+        cells = np.array([self._empty, self._fire])
+
+        # Worst cases of the center and of each of the 8 neighbors
+        center = self._identity * cells
+        neighbor = np.concatenate([self._propagation * cells, self._empty * cells])
+
+        low = center.min() + 8 * neighbor.min()
+        high = center.max() + 8 * neighbor.max()
+
+        return int(low), int(high)
+
     def _get_breaks(self):
         """
         3 breaks needed for 4 rules.
@@ -95,48 +604,47 @@ class WindyForestFire(Operator):
         # "Propagate / Consume"
         consume_break = self._identity * self._fire
 
-        Breaks = namedtuple("Breaks", ["keep", "propagate", "consume"])
-
         return Breaks(keep_break, propagate_break, consume_break)
 
-    def _translate_analogic_to_discrete(self, grid, breaks):
-        row, col = grid.shape
-
-        # Init on empty by default
-        empty = np.array(self._empty)
-        new_grid = np.repeat(empty, row * col).reshape(row, col)
-
-        # Preallocation of comparisons
-        moreq_keep = grid >= breaks.keep
+    def _get_lookup_table(self, breaks):
+        """
+        Discrete cell of each signal value, bucketized by the breaks.
+        Entry `k` holds the cell of signal `self._signal_low + k`.
+        """
+        low, high = self._get_signal_bounds()
+        signals = np.arange(low, high + 1)
 
-        less_propagate = grid < breaks.propagate
-        moreq_propagate = np.logical_not(less_propagate)
+        # 4 Rules, one per interval between breaks:
+        # Dead, EMPTY -> EMPTY
+        # Keep, TREE -> TREE
+        # Propagate, TREE -> FIRE
+        # Consume, FIRE -> EMPTY
+        cells = np.array([self._empty, self._tree, self._fire, self._empty])
 
-        less_consume = grid < breaks.consume
-        moreq_consume = np.logical_not(less_consume)
+        rules = np.searchsorted(breaks, signals, side="right")
 
-        # 4 Rules to carry out:
+        self._signal_low = low
 
-        # 1. Dead
-        # EMPTY -> EMPTY
-        # Implicitly defined by default values
+        return cells[rules]
 
-        # 2. Keep
-        # TREE -> TREE
-        keep_mask = np.logical_and(moreq_keep, less_propagate)
-        new_grid[keep_mask] = self._tree
+    def _translate_analogic_to_discrete(self, grid, breaks, out=None):
+        """
+        A single lookup per cell, written on `out` if given.
+        """
+        if out is None:
+            out = np.empty(grid.shape, dtype=TYPE_INT)
 
-        # 3. Propagate
-        # TREE -> FIRE
-        propagate_mask = np.logical_and(moreq_propagate, less_consume)
-        new_grid[propagate_mask] = self._fire
+        # Table indices, the signal is only shifted when it can be negative
+        indices = grid if self._signal_low == 0 else grid - self._signal_low
 
-        # 4. Consume
-        # FIRE -> EMPTY
-        propagate_mask = moreq_consume
-        new_grid[propagate_mask] = self._empty
+        # A table of the grid type, thus `take` does not cast
+        table = self._typed_tables.get(out.dtype)
+        if table is None:
+            table = self._typed_tables[out.dtype] = self.lookup_table.astype(out.dtype)
 
-        return new_grid
+        # Indices are within the table by construction,
+        # "clip" spares the bounds check
+        return np.take(table, indices, out=out, mode="clip")
 
     def _assert_correctness(self):
         assert self._row_k == 3, "Only Moore's neighborhood"
@@ -1,9 +1,11 @@
+from collections import Counter
 from typing import Dict, Set
 
 import numpy as np
 from gymnasium import logger, spaces
 
-from gym_cellular_automata.operator import Operator
+from gym_cellular_automata.forest_fire.utils import kernels
+from gym_cellular_automata.operator import Operator, compile_operator, merge_deltas
 
 
 class Move(Operator):
@@ -15,7 +17,11 @@ class Move(Operator):
 
     deterministic = True
 
-    def __init__(self, directions_sets: Dict[str, Set], *args, **kwargs):
+    backends = ("numpy", "jit")
+
+    def __init__(
+        self, directions_sets: Dict[str, Set], *args, backend="numpy", **kwargs
+    ):
         super().__init__(*args, **kwargs)
 
         # fmt: off
@@ -34,37 +40,128 @@ class Move(Operator):
             | self.not_move_set
         )
 
+        self._set_backend(backend)
+
+        # Lookup tables of the compiled kernel and of batches
+        self._direction_tables = self._get_direction_tables()
+
     def update(self, grid, action, context):
+        # Positions keep their type
+        position = np.empty(2, dtype=np.asarray(context).dtype)
+
+        return self.update_into(grid, action, context, None, position)
+
+    def update_batch(self, grids, actions, positions):
+        """
+        All the moves at once, positions of shape `(B, 2)`.
+        Actions are looked up on tables, those off the tables stay put.
+        """
+        nrows, ncols = grids.shape[-2:]
+        rows, cols = np.asarray(positions).T
+
+        actions = np.asarray(actions)
+        on_tables = (actions >= 0) & (actions < len(self._direction_tables[0]))
+        actions = np.where(on_tables, actions, 0)
+
+        up, down, left, right = (
+            table[actions] & on_tables for table in self._direction_tables
+        )
+
+        # Same boundary checks as `update`, on the starting position
+        new_rows = rows - (up & (rows > 0)) + (down & (rows < nrows - 1))
+        new_cols = cols - (left & (cols > 0)) + (right & (cols < ncols - 1))
+
+        self.delta = Counter()
+
+        # Positions keep their type
+        new_positions = np.stack([new_rows, new_cols], axis=-1)
+
+        return grids, new_positions.astype(np.asarray(positions).dtype, copy=False)
+
+    def update_into(self, grid, action, context, out_grid, out_context):
+        """New position written on `out_context`, the grid is left as it is."""
         # A common input is a scalar of type ndarray
         action = int(action)
 
-        def get_new_position(position: tuple) -> np.array:
-            row, col = position
+        # Moving leaves the cells untouched
+        self.delta = Counter()
+
+        if self.backend == "jit":
+            row, col = self._update_jit(grid, action, context)
+
+        else:
+            row, col = self._get_new_position(grid, action, context)
+
+        out_context[0], out_context[1] = row, col
+
+        return grid, out_context
+
+    def _get_new_position(self, grid, action, position):
+        row, col = position
+
+        nrows, ncols = grid.shape
 
-            nrows, ncols = grid.shape
+        # fmt: off
+        valid_up    = row > 0
+        valid_down  = row < (nrows - 1)
+        valid_left  = col > 0
+        valid_right = col < (ncols - 1)
+
+        if (action in self.up_set)    and valid_up:
+            row -= 1
+
+        if (action in self.down_set)  and valid_down:
+            row += 1
+
+        if (action in self.left_set)  and valid_left:
+            col -= 1
+
+        if (action in self.right_set) and valid_right:
+            col += 1
+        # fmt: on
+
+        return row, col
+
+    def _get_shift_table(self):
+        """
+        Row and column shift of each action, as lists.
+        None if an action moves both ways along an axis,
+        then the order of the boundary checks matters.
+        """
+        up, down, left, right = self._get_direction_tables()
 
-            # fmt: off
-            valid_up    = row > 0
-            valid_down  = row < (nrows - 1)
-            valid_left  = col > 0
-            valid_right = col < (ncols - 1)
+        if np.any(up & down) or np.any(left & right):
+            return None
 
-            if (action in self.up_set)    and valid_up:
-                row -= 1
+        rows = down.astype(int) - up
+        cols = right.astype(int) - left
 
-            if (action in self.down_set)  and valid_down:
-                row += 1
+        return rows.tolist(), cols.tolist()
 
-            if (action in self.left_set)  and valid_left:
-                col -= 1
+    def _get_direction_tables(self):
+        """Lookup tables from action to direction, for the compiled kernel."""
+        actions = np.arange(max(self.movement_set) + 1)
+
+        return tuple(
+            np.isin(actions, list(direction_set))
+            for direction_set in (
+                self.up_set,
+                self.down_set,
+                self.left_set,
+                self.right_set,
+            )
+        )
 
-            if (action in self.right_set) and valid_right:
-                col += 1
-            # fmt: on
+    def _update_jit(self, grid, action, position):
+        row, col = position
+        nrows, ncols = grid.shape
 
-            return np.array([row, col])
+        if 0 <= action < len(self._direction_tables[0]):
+            row, col = kernels.move(
+                int(row), int(col), nrows, ncols, action, *self._direction_tables
+            )
 
-        return grid, get_new_position(context)
+        return row, col
 
 
 class Modify(Operator):
@@ -76,23 +173,74 @@ class Modify(Operator):
 
     deterministic = True
 
-    def __init__(self, effects: dict, *args, **kwargs):
+    backends = ("numpy", "jit")
+
+    def __init__(self, effects: dict, *args, backend="numpy", **kwargs):
         super().__init__(*args, **kwargs)
 
         self.effects = effects
 
+        self._set_backend(backend)
+
+        if self.backend == "jit":
+            # Lookup tables for the compiled kernel
+            self._causes = np.array(list(self.effects.keys()))
+            self._effects = np.array(list(self.effects.values()))
+
     def update(self, grid, action, context):
         self.hit = False
 
         row, col = context
+        cause = grid[row, col]
 
-        if action:
+        # The compiled kernel needs an array, as opposed to a `TiledGrid`
+        if action and self.backend == "jit" and isinstance(grid, np.ndarray):
+            self.hit = kernels.modify(grid, row, col, self._causes, self._effects)
+
+        elif action:
             if grid[row, col] in self.effects:
                 grid[row, col] = self.effects[grid[row, col]]
                 self.hit = True
 
+        # A hit swaps a single cell
+        self.delta = Counter()
+        if self.hit:
+            self.delta[int(cause)] -= 1
+            self.delta[int(grid[row, col])] += 1
+
         return grid, context
 
+    def update_batch(self, grids, actions, positions):
+        """
+        All the modifications at once, in place on `grids`.
+        `hit` is an array, whether each grid was hit.
+        """
+        instances = np.arange(len(grids))
+        rows, cols = np.asarray(positions).T
+
+        cells = grids[instances, rows, cols]
+        new_cells = cells.copy()
+
+        acting = np.asarray(actions).astype(bool)
+
+        self.hit = np.zeros(len(grids), dtype=bool)
+        self.delta = Counter()
+
+        for cause, effect in self.effects.items():
+            hit = acting & (cells == cause)
+            nhits = np.count_nonzero(hit)
+
+            if nhits > 0:
+                new_cells[hit] = effect
+                self.hit |= hit
+
+                self.delta[int(cause)] -= nhits
+                self.delta[int(effect)] += nhits
+
+        grids[instances, rows, cols] = new_cells
+
+        return grids, positions
+
 
 class MoveModify(Operator):
     grid_dependant = True
@@ -131,4 +279,86 @@ class MoveModify(Operator):
         grid, position = self.move(grid, move_action, position)
         grid, position = self.modify(grid, modify_action, position)
 
+        self.delta = merge_deltas(self.move.delta, self.modify.delta)
+
         return grid, position
+
+    def update_batch(self, grids, subactions, positions):
+        """`subactions` is a pair of arrays, the moves and the modifications."""
+        move_actions, modify_actions = subactions
+
+        grids, positions = self.move.update_batch(grids, move_actions, positions)
+        grids, positions = self.modify.update_batch(grids, modify_actions, positions)
+
+        self.delta = merge_deltas(self.move.delta, self.modify.delta)
+
+        return grids, positions
+
+    def update_into(self, grid, subactions, position, out_grid, out_position):
+        move_action, modify_action = subactions
+
+        # The grid is only changed in place, `out_grid` is never written
+        grid, position = self.move.update_into(
+            grid, move_action, position, out_grid, out_position
+        )
+        grid, position = self.modify.update_into(
+            grid, modify_action, position, out_grid, out_position
+        )
+
+        self.delta = merge_deltas(self.move.delta, self.modify.delta)
+
+        return grid, position
+
+
+@compile_operator.register
+def _compile_move_modify(operator: MoveModify):
+    """
+    Shifts of the moves and effects of the hits are looked up on tables.
+    Each move is a shift clipped to the grid, same as the boundary checks of `Move`.
+    Actions off the table are in no direction set, thus do not move, as for `Move`.
+    """
+    move, modify = operator.move, operator.modify
+    effects = modify.effects
+
+    shifts = move._get_shift_table()
+
+    if shifts is None:
+        return operator.update
+
+    row_shifts, col_shifts = shifts
+
+    def update(grid, subactions, position):
+        move_action, modify_action = subactions
+
+        nrows, ncols = grid.shape[-2:]
+
+        row, col = position
+
+        # A common input is a scalar of type ndarray
+        move_action = int(move_action)
+
+        if 0 <= move_action < len(row_shifts):
+            row = min(max(row + row_shifts[move_action], 0), nrows - 1)
+            col = min(max(col + col_shifts[move_action], 0), ncols - 1)
+
+        delta = Counter()
+
+        hit = False
+        if modify_action:
+            cause = grid[row, col]
+            effect = effects.get(cause)
+
+            if effect is not None:
+                grid[row, col] = effect
+                hit = True
+
+                delta[int(cause)] -= 1
+                delta[int(grid[row, col])] += 1
+
+        modify.hit = hit
+        operator.delta = delta
+
+        # Positions keep their type
+        return grid, np.array([row, col], dtype=np.asarray(position).dtype)
+
+    return update
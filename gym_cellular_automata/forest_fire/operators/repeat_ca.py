@@ -1,10 +1,19 @@
 import math
+from collections import Counter
+from functools import cached_property
 from typing import Callable
 
 import numpy as np
+from gymnasium.spaces import MultiDiscrete
 
-from gym_cellular_automata._config import TYPE_BOX
-from gym_cellular_automata.operator import Operator
+from gym_cellular_automata.operator import (
+    Operator,
+    action_table,
+    compile_operator,
+    copy_into,
+    iter_contexts,
+    merge_deltas,
+)
 
 
 class RepeatCA(Operator):
@@ -29,17 +38,156 @@ class RepeatCA(Operator):
         self.suboperators = (self.ca,)
         self.deterministic = self.ca.deterministic
 
+    def is_quiescent(self, grid, context):
+        ca_params, accu_time = context
+
+        return self.ca.is_quiescent(grid, ca_params)
+
     def update(self, grid, action, context):
         ca_params, accu_time = context
 
+        # Time keeps its type
+        dtype = np.asarray(accu_time).dtype
+
+        accu_time, repeats = self._tick(grid, action, context)
+
+        self.delta = Counter()
+
+        # Owed updates of a quiescent CA are skipped
+        if repeats > 0 and not self.ca.is_quiescent(grid, ca_params):
+            grid, ca_params = self.ca.update_burst(grid, action, ca_params, repeats)
+            self.delta = self.ca.delta
+
+        return grid, (ca_params, np.array(accu_time, dtype=dtype))
+
+    def update_batch(self, grids, actions, contexts):
+        """
+        Times of all the instances at once, then CA updates on the grids
+        that still owe some, in place on `grids`. The CA is not skipped
+        on quiescent grids, it leaves them as they are.
+        """
+        ca_params, accu_times = contexts
+
+        accu_times = np.asarray(accu_times)
+
+        times_taken = self._batch_times(grids, actions, contexts)
+
+        # As `update`, the sum is of the type of the time
+        accu_times, repeats = np.modf(accu_times + times_taken.astype(accu_times.dtype))
+
+        deltas = []
+
+        actions = None if actions is None else np.asarray(actions)
+
+        owed = repeats > 0
+        while np.any(owed):
+            owed_actions = None if actions is None else actions[owed]
+
+            grids[owed], ca_params[owed] = self.ca.update_batch(
+                grids[owed], owed_actions, ca_params[owed]
+            )
+            deltas.append(self.ca.delta)
+
+            repeats -= owed
+            owed = repeats > 0
+
+        self.delta = merge_deltas(*deltas)
+
+        return grids, (ca_params, accu_times)
+
+    def _batch_times(self, grids, actions, contexts):
+        """Time taken by each instance, actions are looked up on a table if possible."""
+        times = self._action_times
+
+        if times is None:
+            time_actions = np.array([self.t_acting(action) for action in actions])
+
+        elif isinstance(self.action_space, MultiDiscrete):
+            time_actions = times[tuple(np.asarray(actions).T)]
+
+        else:
+            time_actions = times[actions]
+
+        time_states = np.array(
+            [self.t_perception(state) for state in zip(grids, iter_contexts(contexts))]
+        )
+
+        return time_actions + time_states
+
+    @cached_property
+    def _action_times(self):
+        """Table of `t_acting`, built on the first batch."""
+        return action_table(self.t_acting, self.action_space)
+
+    def update_into(self, grid, action, context, out_grid, out_context):
+        ca_params, __ = context
+        out_params, out_time = out_context
+
+        accu_time, repeats = self._tick(grid, action, context)
+
+        self.delta = Counter()
+
+        if repeats > 0 and not self.ca.is_quiescent(grid, ca_params):
+            grid, ca_params = self.ca.update_burst_into(
+                grid, action, ca_params, repeats, out_grid, out_params
+            )
+            self.delta = self.ca.delta
+
+        else:
+            ca_params = copy_into(ca_params, out_params)
+
+        return grid, (ca_params, copy_into(accu_time, out_time))
+
+    def _tick(self, grid, action, context):
+        """
+        Accumulated time after the action, as its fractional part,
+        and the number of CA updates owed, its integer part.
+        """
+        ca_params, accu_time = context
+
         time_action = self.t_acting(action)
         time_state = self.t_perception((grid, context))
         time_taken = time_action + time_state
 
-        accu_time += time_taken
-        accu_time, repeats = math.modf(accu_time)
+        accu_time, repeats = math.modf(accu_time + time_taken)
+
+        return accu_time, int(repeats)
+
+
+@compile_operator.register
+def _compile_repeat_ca(operator: RepeatCA):
+    """Times of the actions are looked up on a table, when the space allows it."""
+    ca = operator.ca
+    t_perception = operator.t_perception
+
+    times = action_table(operator.t_acting, operator.action_space)
+
+    if times is None:
+        t_acting = operator.t_acting
+
+    elif isinstance(operator.action_space, MultiDiscrete):
+
+        def t_acting(action):
+            return times.item(*action)
+
+    else:
+        t_acting = times.item
+
+    def update(grid, action, context):
+        ca_params, accu_time = context
+
+        # Time keeps its type
+        dtype = np.asarray(accu_time).dtype
+
+        time_taken = t_acting(action) + t_perception((grid, context))
+        accu_time, repeats = math.modf(accu_time + time_taken)
+
+        operator.delta = Counter()
+
+        if repeats > 0 and not ca.is_quiescent(grid, ca_params):
+            grid, ca_params = ca.update_burst(grid, action, ca_params, int(repeats))
+            operator.delta = ca.delta
 
-        for repeat in range(int(repeats)):
-            grid, ca_params = self.ca(grid, action, ca_params)
+        return grid, (ca_params, np.array(accu_time, dtype=dtype))
 
-        return grid, (ca_params, np.array(accu_time, dtype=TYPE_BOX))
+    return update
@@ -1,10 +1,16 @@
+import numpy as np
 import pytest
 from gymnasium import spaces
 
+from gym_cellular_automata import out_of_core
 from gym_cellular_automata._config import TYPE_BOX, TYPE_INT
 from gym_cellular_automata.forest_fire.operators.ca_DrosselSchwabl import ForestFire
+from gym_cellular_automata.forest_fire.utils.bands import BAND
+from gym_cellular_automata.forest_fire.utils.bitboard import BitGrid
 from gym_cellular_automata.forest_fire.utils.neighbors import neighborhood_at
 from gym_cellular_automata.grid_space import GridSpace
+from gym_cellular_automata.operator import count_cells
+from gym_cellular_automata.tests import JIT
 
 # Number of random grids to test
 TESTS = 16
@@ -104,3 +110,230 @@ def assert_forest_fire_update_at_positionrows_col(grid, new_grid, row, col):
     # EMPTY -> EMPTY | TREE
     if old_cell_value == EMPTY:
         assert new_cell_value != FIRE, "EMPTY -> EMPTY | TREE (failed)" + log_error
+
+
+@pytest.mark.repeat(TESTS)
+def test_bitboard_backend_matches_numpy(grid_space, ca_params_space):
+    SEED = 42
+
+    # Bitboards draw "dense" events as bits, the same cells only on "sparse"
+    numpy_ca = ForestFire(EMPTY, TREE, FIRE, sampling="sparse")
+    bitboard_ca = ForestFire(EMPTY, TREE, FIRE, backend="bitboard", sampling="sparse")
+
+    numpy_ca.seed(SEED)
+    bitboard_ca.seed(SEED)
+
+    grid = grid_space.sample()
+    board = BitGrid.from_grid(grid, EMPTY, TREE, FIRE)
+    ca_params = ca_params_space.sample()
+
+    for step in range(STEPS):
+        grid, __ = numpy_ca(grid, None, ca_params)
+        board, __ = bitboard_ca(board, None, ca_params)
+
+        assert isinstance(board, BitGrid)
+        assert np.all(board.to_grid() == grid)
+
+
+@pytest.mark.repeat(TESTS)
+def test_jit_backend_matches_numpy(grid_space, ca_params_space):
+    pytest.importorskip("numba")
+
+    SEED = 42
+
+    numpy_ca = ForestFire(EMPTY, TREE, FIRE)
+    jit_ca = ForestFire(EMPTY, TREE, FIRE, backend="jit")
+
+    numpy_ca.seed(SEED)
+    jit_ca.seed(SEED)
+
+    grid = jit_grid = grid_space.sample()
+    ca_params = ca_params_space.sample()
+
+    for step in range(STEPS):
+        grid, __ = numpy_ca(grid, None, ca_params)
+        jit_grid, __ = jit_ca(jit_grid, None, ca_params)
+
+        assert np.all(jit_grid == grid)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        ForestFire(EMPTY, TREE, FIRE, backend="fortran")
+
+
+def test_sparse_sampling():
+    NROWS, NCOLS = 256, 256
+    P_FIRE, P_TREE = 0.001, 0.01
+
+    ca = ForestFire(EMPTY, TREE, FIRE, sampling="sparse")
+    ca.seed(7)
+
+    # Half trees, half empty, without fire
+    grid = np.full((NROWS, NCOLS), TREE)
+    grid[:, : NCOLS // 2] = EMPTY
+
+    new_grid, __ = ca(grid, None, np.array([P_FIRE, P_TREE]))
+
+    strikes = np.count_nonzero(new_grid[:, NCOLS // 2 :] == FIRE)
+    growths = np.count_nonzero(new_grid[:, : NCOLS // 2] == TREE)
+
+    # Expected counts with a wide margin, 4+ standard deviations
+    half = NROWS * NCOLS // 2
+    assert abs(strikes - half * P_FIRE) < 4 * np.sqrt(half * P_FIRE) + 1
+    assert abs(growths - half * P_TREE) < 4 * np.sqrt(half * P_TREE) + 1
+
+    # Only growths on empty, only strikes on trees
+    assert np.all(new_grid[:, : NCOLS // 2] != FIRE)
+    assert np.all(new_grid[:, NCOLS // 2 :] != EMPTY)
+
+
+def test_sparse_sampling_batch_and_bitboard(grid_space, ca_params_space):
+    BATCH = 4
+
+    numpy_ca = ForestFire(EMPTY, TREE, FIRE, sampling="sparse")
+    bitboard_ca = ForestFire(EMPTY, TREE, FIRE, backend="bitboard", sampling="sparse")
+
+    numpy_ca.seed(3)
+    bitboard_ca.seed(3)
+
+    grids = np.stack([grid_space.sample() for __ in range(BATCH)])
+    ca_params = np.stack([ca_params_space.sample() for __ in range(BATCH)])
+
+    expected, __ = numpy_ca(grids, None, ca_params)
+    observed, __ = bitboard_ca(grids, None, ca_params)
+
+    assert expected.shape == grids.shape
+    assert np.all(observed == expected)
+
+
+def test_unknown_sampling():
+    with pytest.raises(ValueError):
+        ForestFire(EMPTY, TREE, FIRE, sampling="poisson")
+
+
+def test_jit_sparse_sampling():
+    pytest.importorskip("numba")
+
+    with pytest.raises(ValueError):
+        ForestFire(EMPTY, TREE, FIRE, backend="jit", sampling="sparse")
+
+
+def test_is_quiescent():
+    ca = ForestFire(EMPTY, TREE, FIRE)
+
+    forest = np.full((ROW, COL), TREE)
+    no_params = np.array([0.0, 0.0])
+
+    assert ca.is_quiescent(forest, no_params)
+
+    # Lightning strikes on trees, growths on empty cells
+    assert not ca.is_quiescent(forest, np.array([0.1, 0.0]))
+    assert ca.is_quiescent(forest, np.array([0.0, 0.1]))
+
+    forest[0, 0] = FIRE
+    assert not ca.is_quiescent(forest, no_params)
+
+
+def test_is_quiescent_on_bitboards(monkeypatch):
+    ca = ForestFire(EMPTY, TREE, FIRE, backend="bitboard")
+
+    # Columns beyond a word, the padding bits are not empty cells
+    forest = np.full((ROW, 70), TREE)
+    board = BitGrid.from_grid(forest, EMPTY, TREE, FIRE)
+
+    # Checked on the bit planes, without unpacking the board
+    monkeypatch.setattr(BitGrid, "to_grid", None)
+
+    assert ca.is_quiescent(board, np.array([0.0, 0.1]))
+    assert not ca.is_quiescent(board, np.array([0.1, 0.0]))
+
+    board[0, 69] = EMPTY
+    assert not ca.is_quiescent(board, np.array([0.0, 0.1]))
+
+    board[0, 69] = FIRE
+    assert not ca.is_quiescent(board, np.array([0.0, 0.0]))
+
+
+@pytest.mark.parametrize("sampling", ForestFire.samplings)
+def test_threads_are_deterministic(sampling):
+    grid_space = GridSpace(values=[EMPTY, TREE, FIRE], shape=(2 * BAND + 7, 16))
+
+    grid = grid_space.sample()
+    ca_params = np.array([0.1, 0.3])
+
+    new_grids = []
+    for threads in (1, 2, 5):
+        ca = ForestFire(EMPTY, TREE, FIRE, sampling=sampling, threads=threads)
+        ca.seed(6)
+
+        new_grid, __ = ca(grid, None, ca_params)
+        new_grids.append(new_grid)
+
+    # Same substreams regardless of the number of threads
+    for new_grid in new_grids:
+        assert np.all(new_grid == new_grids[0])
+
+
+@pytest.mark.parametrize("backend", ["numpy", JIT])
+def test_threads_follow_the_rules(backend):
+    grid_space = GridSpace(values=[EMPTY, TREE, FIRE], shape=(2 * BAND + 7, 16))
+    grid = grid_space.sample()
+
+    # Without lightning nor growth the update is deterministic
+    ca_params = np.array([0.0, 0.0])
+
+    expected, __ = ForestFire(EMPTY, TREE, FIRE)(grid, None, ca_params)
+    observed, __ = ForestFire(EMPTY, TREE, FIRE, backend=backend, threads=3)(
+        grid, None, ca_params
+    )
+
+    assert np.all(observed == expected)
+
+
+@pytest.mark.parametrize("backend", ["numpy", JIT])
+def test_processes_match_threads(backend):
+    grid_space = GridSpace(values=[EMPTY, TREE, FIRE], shape=(2 * BAND + 7, 16))
+
+    grid = grid_space.sample()
+    ca_params = np.array([0.1, 0.3])
+
+    threaded = ForestFire(EMPTY, TREE, FIRE, backend=backend, threads=2)
+    shared = ForestFire(EMPTY, TREE, FIRE, backend=backend, processes=2)
+
+    threaded.seed(6)
+    shared.seed(6)
+
+    try:
+        expected, __ = threaded(grid, None, ca_params)
+        observed, __ = shared(grid, None, ca_params)
+
+        # Same substreams per band
+        assert np.all(observed == expected)
+
+    finally:
+        shared.close()
+
+
+def test_memmap_follows_the_rules(tmp_path, monkeypatch):
+    monkeypatch.setattr(out_of_core, "CHUNK_CELLS", 256)
+
+    grid_space = GridSpace(
+        values=[EMPTY, TREE, FIRE], shape=(64, 32), memmap_dir=tmp_path
+    )
+    grid = grid_space.sample()
+
+    assert isinstance(grid, np.memmap)
+    assert grid_space.contains(grid)
+
+    # Without lightning nor growth the update is deterministic
+    ca_params = np.array([0.0, 0.0])
+
+    ca = ForestFire(EMPTY, TREE, FIRE)
+
+    expected, __ = ca(np.array(grid), None, ca_params)
+    observed, __ = ca(grid, None, ca_params)
+
+    assert isinstance(observed, np.memmap)
+    assert np.all(observed == expected)
+    assert count_cells(grid) + ca.delta == count_cells(observed)
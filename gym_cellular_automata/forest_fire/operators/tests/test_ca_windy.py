@@ -1,10 +1,22 @@
+import pickle
+from copy import deepcopy
+
+import numpy as np
 import pytest
 from gymnasium import spaces
 
+from gym_cellular_automata import out_of_core
 from gym_cellular_automata._config import TYPE_INT
 from gym_cellular_automata.forest_fire.operators.ca_windy import WindyForestFire
+from gym_cellular_automata.forest_fire.utils.bands import BAND
+from gym_cellular_automata.forest_fire.utils.bitboard import BitGrid
 from gym_cellular_automata.forest_fire.utils.neighbors import neighborhood_at
 from gym_cellular_automata.grid_space import GridSpace
+from gym_cellular_automata.operator import count_cells
+from gym_cellular_automata.tests import JIT
+
+# Reference of the stencil, a test dependency
+scipy = pytest.importorskip("scipy")
 
 # Number of random grids to test
 TESTS = 16
@@ -100,3 +112,394 @@ def assert_forest_fire_update_at_positionrows_col(grid, new_grid, row, col):
     # EMPTY -> EMPTY
     if old_cell_value == EMPTY:
         assert new_cell_value == EMPTY, "EMPTY is EMPTY forever (failed)" + log_error
+
+
+@pytest.mark.repeat(TESTS)
+def test_bitboard_backend_matches_numpy(ca, grid_space):
+    bitboard_ca = WindyForestFire(EMPTY, TREE, FIRE, backend="bitboard")
+
+    # Deterministic winds, each direction either always or never propagates
+    winds = np.ones((3, 3)), np.zeros((3, 3)), np.tri(3)
+
+    for wind in winds:
+        grid = grid_space.sample()
+        board = BitGrid.from_grid(grid, EMPTY, TREE, FIRE)
+
+        for step in range(STEPS):
+            grid, __ = ca(grid, None, wind)
+            board, __ = bitboard_ca(board, None, wind)
+
+            assert np.all(board.to_grid() == grid)
+
+
+@pytest.mark.repeat(TESTS)
+def test_jit_backend_matches_numpy(ca, grid_space):
+    pytest.importorskip("numba")
+
+    jit_ca = WindyForestFire(EMPTY, TREE, FIRE, backend="jit")
+
+    winds = np.ones((3, 3)), np.zeros((3, 3)), np.tri(3)
+
+    for wind in winds:
+        grid = jit_grid = grid_space.sample()
+
+        for step in range(STEPS):
+            grid, __ = ca(grid, None, wind)
+            jit_grid, __ = jit_ca(jit_grid, None, wind)
+
+            assert np.all(jit_grid == grid)
+
+
+@pytest.mark.repeat(TESTS)
+def test_stencil_matches_convolve2d(ca, grid_space):
+    wind = np.random.random((3, 3))
+
+    grid = grid_space.sample()
+    kernel = ca._get_kernel(ca._get_failed_propagations_mask(wind))
+
+    expected = scipy.signal.convolve2d(
+        grid, kernel, mode="same", boundary="fill", fillvalue=EMPTY
+    )
+    observed = ca._convolve(grid, kernel)
+
+    assert np.all(observed == expected)
+
+    # A batch of grids, each with its own kernel
+    BATCH = 3
+
+    grids = np.stack([grid_space.sample() for __ in range(BATCH)])
+    kernels = ca._get_kernel(ca._get_failed_propagations_mask(np.stack([wind] * BATCH)))
+
+    observed = ca._convolve(grids, kernels)
+
+    for grid, kernel, signal in zip(grids, kernels, observed):
+        expected = scipy.signal.convolve2d(
+            grid, kernel, mode="same", boundary="fill", fillvalue=EMPTY
+        )
+        assert np.all(signal == expected)
+
+
+def test_stencil_signal_dtype(ca):
+    # Narrow, yet wide enough for the worst case signal
+    worst = ca._identity * FIRE + 8 * ca._propagation * FIRE
+
+    assert ca._signal_dtype.itemsize < np.dtype(np.int64).itemsize
+    assert np.iinfo(ca._signal_dtype).max >= worst
+
+
+@pytest.mark.parametrize("cells", [(EMPTY, TREE, FIRE), (-5, 3, 25)])
+def test_lookup_table_follows_breaks(cells):
+    ca = WindyForestFire(*cells)
+    empty, tree, fire = cells
+    breaks = ca.breaks
+
+    signal = np.arange(ca._signal_low, ca._signal_low + len(ca.lookup_table))
+
+    expected = np.full(signal.shape, empty)
+    expected[(signal >= breaks.keep) & (signal < breaks.propagate)] = tree
+    expected[(signal >= breaks.propagate) & (signal < breaks.consume)] = fire
+
+    out = np.empty(signal.shape, dtype=TYPE_INT)
+    observed = ca._translate_analogic_to_discrete(signal, breaks, out=out)
+
+    assert observed is out
+    assert np.all(observed == expected)
+
+
+@pytest.mark.parametrize("backend", WindyForestFire.backends)
+def test_burst_matches_update_loop(backend, grid_space):
+    BURST = 5
+
+    ca_burst = WindyForestFire(EMPTY, TREE, FIRE, backend=backend)
+    ca_loop = WindyForestFire(EMPTY, TREE, FIRE, backend=backend)
+
+    ca_burst.seed(3)
+    ca_loop.seed(3)
+
+    grid = grid_space.sample()
+    grid_copy = grid.copy()
+    wind = np.full((3, 3), 0.5)
+
+    observed, __ = ca_burst.update_burst(grid, None, wind, BURST)
+
+    expected = grid
+    for __ in range(BURST):
+        expected, __ = ca_loop(expected, None, wind)
+
+    assert np.all(observed == expected)
+    assert np.all(grid == grid_copy), "Input grid must be left untouched"
+
+
+@pytest.mark.parametrize("backend", ["numpy", JIT])
+@pytest.mark.parametrize("threads", [None, 2])
+@pytest.mark.parametrize("repeats", [1, 2, 5])
+def test_burst_into_matches_burst(backend, threads, repeats):
+    # More than a band, thus threaded updates are split
+    grid_space = GridSpace(values=[EMPTY, TREE, FIRE], shape=(BAND + 7, 16))
+
+    ca = WindyForestFire(EMPTY, TREE, FIRE, backend=backend)
+    ca_into = WindyForestFire(EMPTY, TREE, FIRE, backend=backend, threads=threads)
+
+    ca.seed(4)
+    ca_into.seed(4)
+
+    grid = grid_space.sample()
+    grid_copy = grid.copy()
+    wind = np.full((3, 3), 0.5)
+
+    out_grid, out_wind = np.empty_like(grid), np.empty_like(wind)
+
+    expected, __ = ca.update_burst(grid, None, wind, repeats)
+    observed, observed_wind = ca_into.update_burst_into(
+        grid, None, wind, repeats, out_grid, out_wind
+    )
+
+    assert observed is out_grid and observed_wind is out_wind
+    assert np.all(observed == expected)
+    assert np.all(observed_wind == wind)
+    assert np.all(grid == grid_copy), "Input grid must be left untouched"
+
+    expected, __ = ca(expected, None, wind)
+    observed, __ = ca_into.update_into(observed, None, wind, grid, out_wind)
+
+    assert observed is grid
+    assert np.all(observed == expected)
+
+
+@pytest.mark.parametrize("backend", ["numpy", JIT])
+def test_frontier_matches_full_update(backend):
+    UPDATES = 6
+
+    full = WindyForestFire(EMPTY, TREE, FIRE, backend=backend)
+    frontier = WindyForestFire(EMPTY, TREE, FIRE, backend=backend, frontier=True)
+
+    full.seed(5)
+    frontier.seed(5)
+
+    # A small fire on a large forest
+    grid = np.full((32, 48), TREE, dtype=TYPE_INT)
+    grid[np.random.random(grid.shape) < 0.2] = EMPTY
+    grid[20:22, 3:5] = FIRE
+
+    wind = np.random.random((3, 3))
+
+    expected = observed = grid
+    for __ in range(UPDATES):
+        expected, __ = full(expected, None, wind)
+        observed, __ = frontier(observed, None, wind)
+
+        assert np.all(observed == expected)
+
+    expected, __ = full.update_burst(expected, None, wind, UPDATES)
+
+    counts = count_cells(observed)
+    observed, __ = frontier.update_burst(observed, None, wind, UPDATES)
+    counts.update(frontier.delta)
+
+    assert np.all(observed == expected)
+    assert counts == count_cells(observed)
+
+
+def test_frontier_batch_and_fireless(grid_space):
+    full = WindyForestFire(EMPTY, TREE, FIRE)
+    frontier = WindyForestFire(EMPTY, TREE, FIRE, frontier=True)
+
+    full.seed(2)
+    frontier.seed(2)
+
+    grids = np.stack([grid_space.sample() for __ in range(3)])
+    grids[0] = TREE
+
+    winds = np.random.random((3, 3, 3))
+
+    expected, __ = full(grids, None, winds)
+    observed, __ = frontier(grids, None, winds)
+
+    assert np.all(observed == expected)
+
+    fireless = np.full((ROW, COL), TREE)
+    observed, __ = frontier(fireless, None, winds[0])
+
+    assert np.all(observed == TREE)
+    assert observed is fireless
+
+
+def test_frontier_writes_in_place():
+    frontier = WindyForestFire(EMPTY, TREE, FIRE, frontier=True)
+    frontier.seed(4)
+
+    grid = np.full((64, 64), TREE, dtype=TYPE_INT)
+    grid[30, 30] = FIRE
+
+    wind = np.full((3, 3), 0.5)
+
+    # Cells far from the fire are neither copied nor written
+    far = grid[:, 48:]
+    far.flags.writeable = False
+
+    observed, __ = frontier(grid, None, wind)
+
+    assert observed is grid
+    assert grid[30, 30] == EMPTY
+
+
+@pytest.mark.parametrize("frontier", [False, True])
+def test_run_until_quiescent(frontier):
+    MAX_UPDATES = 1000
+
+    ca = WindyForestFire(EMPTY, TREE, FIRE, frontier=frontier)
+    ca.seed(1)
+
+    grid = np.full((16, 16), TREE, dtype=TYPE_INT)
+    grid[8, 8] = FIRE
+    wind = np.full((3, 3), 0.7)
+
+    assert not ca.is_quiescent(grid, wind)
+
+    # Frontier updates are written in place
+    new_grid, __, updates = ca.run_until_quiescent(grid.copy(), None, wind, MAX_UPDATES)
+
+    assert 0 < updates < MAX_UPDATES
+    assert ca.is_quiescent(new_grid, wind)
+    assert not np.any(new_grid == FIRE)
+
+    # Capped runs stop early
+    __, __, updates = ca.run_until_quiescent(grid, None, wind, 1)
+    assert updates == 1
+
+
+@pytest.mark.parametrize("backend", ["numpy", JIT])
+def test_threads_match_unthreaded(backend):
+    # More than two bands, the last one shorter
+    grid_space = GridSpace(values=[EMPTY, TREE, FIRE], shape=(2 * BAND + 7, 16))
+
+    unthreaded = WindyForestFire(EMPTY, TREE, FIRE, backend=backend)
+    threaded = WindyForestFire(EMPTY, TREE, FIRE, backend=backend, threads=3)
+
+    unthreaded.seed(8)
+    threaded.seed(8)
+
+    grid = grid_space.sample()
+    wind = np.random.random((3, 3))
+
+    expected, __ = unthreaded(grid, None, wind)
+    observed, __ = threaded(grid, None, wind)
+
+    assert np.all(observed == expected)
+
+    expected, __ = unthreaded.update_burst(expected, None, wind, 3)
+    observed, __ = threaded.update_burst(observed, None, wind, 3)
+
+    assert np.all(observed == expected)
+
+    # A batch of grids
+    grids = np.stack([grid_space.sample() for __ in range(2)])
+    winds = np.random.random((2, 3, 3))
+
+    expected, __ = unthreaded(grids, None, winds)
+    observed, __ = threaded(grids, None, winds)
+
+    assert np.all(observed == expected)
+
+
+def test_threads_copy_and_close():
+    grid_space = GridSpace(values=[EMPTY, TREE, FIRE], shape=(2 * BAND + 7, 16))
+
+    grid = grid_space.sample()
+    wind = np.random.random((3, 3))
+
+    threaded = WindyForestFire(EMPTY, TREE, FIRE, threads=2)
+    threaded(grid, None, wind)
+
+    # Copies start without threads, as the pool holds locks and queues
+    for copied in (deepcopy(threaded), pickle.loads(pickle.dumps(threaded))):
+        threaded.seed(8)
+        copied.seed(8)
+
+        expected, __ = threaded(grid, None, wind)
+        observed, __ = copied(grid, None, wind)
+
+        assert np.all(observed == expected)
+
+        copied.close()
+
+    threaded.close()
+    assert threaded._executor._executor is None
+
+    # Started again on the next update
+    threaded(grid, None, wind)
+    threaded.close()
+
+
+@pytest.mark.parametrize("backend", ["numpy", JIT])
+def test_processes_match_unthreaded(backend):
+    grid_space = GridSpace(values=[EMPTY, TREE, FIRE], shape=(2 * BAND + 7, 16))
+
+    unthreaded = WindyForestFire(EMPTY, TREE, FIRE, backend=backend)
+    shared = WindyForestFire(EMPTY, TREE, FIRE, backend=backend, processes=2)
+
+    unthreaded.seed(8)
+    shared.seed(8)
+
+    grid = grid_space.sample()
+    wind = np.random.random((3, 3))
+
+    try:
+        expected, __ = unthreaded(grid, None, wind)
+        observed, __ = shared(grid, None, wind)
+
+        assert np.all(observed == expected)
+
+        # Updated from the shared grid where it is
+        expected, __ = unthreaded.update_burst(expected, None, wind, 3)
+        observed, __ = shared.update_burst(observed, None, wind, 3)
+
+        assert np.all(observed == expected)
+
+        detached = shared.detach(observed)
+
+        assert detached is not observed
+        assert np.all(detached == expected)
+        assert unthreaded.detach(expected) is expected
+
+    finally:
+        shared.close()
+
+
+def test_threads_or_processes():
+    with pytest.raises(ValueError):
+        WindyForestFire(EMPTY, TREE, FIRE, threads=2, processes=2)
+
+
+@pytest.mark.parametrize("backend", ["numpy", JIT])
+def test_memmap_matches_array(backend, tmp_path, monkeypatch):
+    # Several chunks of rows
+    monkeypatch.setattr(out_of_core, "CHUNK_CELLS", 256)
+
+    grid_space = GridSpace(values=[EMPTY, TREE, FIRE], shape=(64, 32))
+    grid = grid_space.sample()
+
+    mapped = out_of_core.empty(grid.shape, grid.dtype, tmp_path)
+    mapped[...] = grid
+
+    in_memory = WindyForestFire(EMPTY, TREE, FIRE)
+    out_of_memory = WindyForestFire(EMPTY, TREE, FIRE, backend=backend)
+
+    in_memory.seed(3)
+    out_of_memory.seed(3)
+
+    wind = np.random.random((3, 3))
+
+    expected, __ = in_memory.update_burst(grid, None, wind, 5)
+    observed, __ = out_of_memory.update_burst(mapped, None, wind, 5)
+
+    assert isinstance(observed, np.memmap)
+    assert np.all(observed == expected)
+
+    # New grids are mapped next to the grid, and counted chunk by chunk
+    assert observed.filename.startswith(str(tmp_path))
+    assert count_cells(grid) + out_of_memory.delta == count_cells(observed)
+
+    assert out_of_memory.is_quiescent(mapped, wind) == in_memory.is_quiescent(
+        grid, wind
+    )
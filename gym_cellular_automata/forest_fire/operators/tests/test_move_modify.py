@@ -3,8 +3,9 @@ import pytest
 from gymnasium import spaces
 
 from gym_cellular_automata._config import TYPE_INT
-from gym_cellular_automata.forest_fire.operators import Modify, Move
+from gym_cellular_automata.forest_fire.operators import Modify, Move, MoveModify
 from gym_cellular_automata.grid_space import GridSpace
+from gym_cellular_automata.operator import compile_operator, count_cells
 from gym_cellular_automata.tests import assert_operator
 
 TEST_REPETITIONS = 16
@@ -56,6 +57,22 @@ def test_move_is_operator(move):
     assert_operator(move)
 
 
+@pytest.mark.repeat(TEST_REPETITIONS)
+def test_move_jit_backend(move, directions_sets, grid_space, position_space):
+    pytest.importorskip("numba")
+
+    jit_move = Move(directions_sets, backend="jit")
+
+    grid = grid_space.sample()
+    position = position_space.sample()
+
+    for action in range(ACTIONS):
+        __, expected = move(grid, action, position)
+        __, observed = jit_move(grid, action, position)
+
+        assert np.all(observed == expected)
+
+
 @pytest.mark.repeat(TEST_REPETITIONS)
 def test_move(move, grid_space, action_space, position_space, directions_sets):
     up_set = directions_sets["up"]
@@ -125,6 +142,119 @@ def test_modify_cell_at_position(modify, effects, grid_space, position_space):
         assert np.all(random_position == position)
 
 
+@pytest.mark.repeat(TEST_REPETITIONS)
+def test_modify_jit_backend(modify, effects, grid_space, position_space):
+    pytest.importorskip("numba")
+
+    jit_modify = Modify(effects, backend="jit")
+
+    for action in {True, False}:
+        grid = grid_space.sample()
+        jit_grid = grid.copy()
+        position = position_space.sample()
+
+        grid, __ = modify(grid, action, position)
+        jit_grid, __ = jit_modify(jit_grid, action, position)
+
+        assert np.all(jit_grid == grid)
+        assert jit_modify.hit == modify.hit
+
+
+@pytest.mark.repeat(TEST_REPETITIONS)
+def test_modify_delta(modify, grid_space, position_space):
+    for action in {True, False}:
+        grid = grid_space.sample()
+        position = position_space.sample()
+
+        expected = count_cells(grid)
+        grid, __ = modify(grid, action, position)
+        expected.update(modify.delta)
+
+        assert expected == count_cells(grid)
+
+
+def test_batch_matches_updates(move, modify, grid_space, position_space):
+    BATCH = 32
+
+    grids = np.stack([grid_space.sample() for __ in range(BATCH)])
+    positions = np.stack([position_space.sample() for __ in range(BATCH)])
+    moves = np.random.randint(ACTIONS, size=BATCH)
+    shoots = np.random.randint(2, size=BATCH)
+
+    expected_grids = grids.copy()
+    expected_positions, expected_hits = [], []
+
+    for grid, move_action, shoot, position in zip(
+        expected_grids, moves, shoots, positions
+    ):
+        __, position = move(grid, move_action, position)
+        __, position = modify(grid, shoot, position)
+
+        expected_positions.append(position)
+        expected_hits.append(modify.hit)
+
+    counts = count_cells(grids)
+
+    __, new_positions = move.update_batch(grids, moves, positions)
+    new_grids, new_positions = modify.update_batch(grids, shoots, new_positions)
+
+    assert np.all(new_grids == expected_grids)
+    assert np.all(new_positions == np.stack(expected_positions))
+    assert new_positions.dtype == positions.dtype
+    assert np.all(modify.hit == expected_hits)
+
+    counts.update(modify.delta)
+    assert counts == count_cells(new_grids)
+
+
+def test_batch_matches_updates_on_edges_and_off_the_actions():
+    # Overlapping direction sets, the action 0 moves both up and down
+    move = Move(
+        {
+            "up": {0, UP},
+            "down": {0, DOWN},
+            "left": {0, LEFT},
+            "right": {RIGHT},
+            "not_move": {NOT_MOVE},
+        }
+    )
+
+    grids = np.zeros((1, ROW, COL), dtype=TYPE_INT)
+
+    # Every cell, thus every edge and corner
+    cells = np.stack(np.indices((ROW, COL)), axis=-1).reshape(-1, 2)
+    moves = np.arange(-2, ACTIONS + 2)
+
+    positions = np.repeat(cells, len(moves), axis=0).astype(TYPE_INT)
+    moves = np.tile(moves, len(cells))
+
+    expected = np.stack(
+        [
+            move(grids[0], action, position)[1]
+            for action, position in zip(moves, positions)
+        ]
+    )
+    __, observed = move.update_batch(grids, moves, positions)
+
+    assert np.all(observed == expected)
+
+
+@pytest.mark.parametrize("move_action", [-1, -ACTIONS, ACTIONS, ACTIONS + 1])
+def test_compiled_move_modify_off_the_actions(move, modify, move_action):
+    move_modify = MoveModify(move, modify)
+    update = compile_operator(move_modify)
+
+    grid = np.zeros((ROW, COL), dtype=TYPE_INT)
+    position = np.array([1, 1], dtype=TYPE_INT)
+
+    __, expected_position = move_modify(grid.copy(), (move_action, False), position)
+    __, new_position = update(grid.copy(), (move_action, False), position)
+
+    # Actions in no direction set stay put
+    assert np.all(expected_position == position)
+    assert np.all(new_position == expected_position)
+
+
 ### Orthogonal new position test
 ### Orthogonal: different from the method used on library implementation
 
@@ -88,3 +88,17 @@ def test_repeat_ca(ca, repeat_ca):
 
     assert np.all(observed == expected)
     assert observedc == 0.0
+
+
+def test_repeat_ca_skips_quiescent_ca(ca, repeat_ca):
+    # Without fire the windy CA is a fixed point
+    grid = np.full((ROW, COL), TREE, dtype=TYPE_INT)
+    context = ca.context_space.high, 0.0
+
+    assert repeat_ca.is_quiescent(grid, context)
+
+    state = ca.np_random.bit_generator.state
+    new_grid, __ = repeat_ca(grid, None, context)
+
+    assert np.all(new_grid == grid)
+    assert ca.np_random.bit_generator.state == state, "No updates, no draws"
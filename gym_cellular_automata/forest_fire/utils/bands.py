@@ -0,0 +1,82 @@
+"""
+Row band decomposition of grid updates.
+
+The rows of a grid are split into bands of `BAND` rows.
+A band is updated from its rows plus a one-row halo above and below,
+Moore's neighborhood reaches no further.
+
+Bands do not depend on the number of workers,
+thus randomness drawn per band is the same for any number of them.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BAND = 256
+
+
+def bands(nrows, band=BAND):
+    """Half-open row ranges of the bands."""
+    return [(start, min(start + band, nrows)) for start in range(0, nrows, band)]
+
+
+def halo(start, stop, nrows):
+    """Rows needed to update the band, its own and one more per side."""
+    return max(start - 1, 0), min(stop + 1, nrows)
+
+
+def band_rngs(np_random, nbands):
+    """
+    A generator per band, spawned from a single draw of `np_random`.
+    Band `k` gets the same substream for any number of workers.
+    """
+    seed = np_random.integers(2**63)
+
+    return [np.random.default_rng([seed, k]) for k in range(nbands)]
+
+
+def map_bands(executor, func, nrows, band=BAND):
+    """
+    Calls `func(k, start, stop)` for each band `k`, on the `executor` threads.
+    Exceptions of any band are raised on the caller.
+    """
+    futures = [
+        executor.submit(func, k, start, stop)
+        for k, (start, stop) in enumerate(bands(nrows, band))
+    ]
+
+    return [future.result() for future in futures]
+
+
+def thread_pool(threads):
+    """Pool for band updates, None for updates on the caller's thread."""
+    return None if threads is None else ThreadPool(threads)
+
+
+class ThreadPool:
+    """
+    Pool of `threads`, started on the first band and stopped by `close`.
+    Copies and pickles start without threads, as `SharedBands` does.
+    """
+
+    def __init__(self, threads):
+        assert threads > 0, "'threads' must be a positive integer."
+
+        self.threads = threads
+        self._executor = None
+
+    def __reduce__(self):
+        return ThreadPool, (self.threads,)
+
+    def submit(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.threads)
+
+        return self._executor.submit(func, *args)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+        self._executor = None
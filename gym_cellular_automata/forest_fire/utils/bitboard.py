@@ -0,0 +1,288 @@
+"""
+Bit-packed boards for forest fire grids.
+
+Each grid row is packed into `uint64` words,
+bit `j` of word `w` holds the cell at column `64 * w + j`.
+A single word-wide shift/and/or touches 64 cells at once.
+
+Only two planes are stored, `tree` and `fire`.
+The `empty` plane is their complement, thus derived on demand.
+"""
+
+from collections import Counter
+
+import numpy as np
+
+WORD = 64
+
+# Packed words are little-endian by construction
+_PACKED = np.dtype("<u8")
+
+
+def pack(mask: np.ndarray) -> np.ndarray:
+    """Packs a boolean mask over its last axis into `uint64` words."""
+    ncols = mask.shape[-1]
+    nwords = -(-ncols // WORD)
+
+    padded = np.zeros(mask.shape[:-1] + (nwords * WORD,), dtype=bool)
+    padded[..., :ncols] = mask
+
+    packed = np.packbits(padded, axis=-1, bitorder="little")
+
+    return packed.view(_PACKED).astype(np.uint64, copy=False)
+
+
+def unpack(words: np.ndarray, ncols: int) -> np.ndarray:
+    """Inverse of `pack`, returns a boolean mask with `ncols` columns."""
+    packed = np.ascontiguousarray(words.astype(_PACKED, copy=False)).view(np.uint8)
+
+    bits = np.unpackbits(packed, axis=-1, count=ncols, bitorder="little")
+
+    return bits.view(bool)
+
+
+def tail_mask(ncols: int) -> np.ndarray:
+    """Per word mask of the bits that map to actual columns."""
+    nwords = -(-ncols // WORD)
+
+    mask = np.full(nwords, np.iinfo(np.uint64).max, dtype=np.uint64)
+
+    if ncols % WORD:
+        mask[-1] = np.uint64((1 << (ncols % WORD)) - 1)
+
+    return mask
+
+
+def shift(words: np.ndarray, drow: int, dcol: int, valid: np.ndarray) -> np.ndarray:
+    """
+    Brings the cell at offset `(drow, dcol)` into every position,
+    `out[r, c] = board[r + drow, c + dcol]`.
+
+    Offsets are in {-1, 0, 1}, cells beyond the boundary are 0 (`empty`).
+    Works over the last two axes, leading axes are treated as a batch.
+    """
+    out = np.zeros_like(words)
+
+    # Rows
+    if drow == 1:
+        out[..., :-1, :] = words[..., 1:, :]
+    elif drow == -1:
+        out[..., 1:, :] = words[..., :-1, :]
+    else:
+        out[...] = words
+
+    # Columns, carrying the bits between adjacent words
+    if dcol == 1:
+        carry = np.zeros_like(out)
+        carry[..., :-1] = out[..., 1:] << 63
+
+        out >>= 1
+        out |= carry
+
+    elif dcol == -1:
+        carry = np.zeros_like(out)
+        carry[..., 1:] = out[..., :-1] >> 63
+
+        out <<= 1
+        out |= carry
+        out &= valid
+
+    return out
+
+
+def random_bits(rng, p, shape):
+    """
+    Packed words of a grid of `shape`, each bit set with probability `p`.
+
+    A uniform roll per cell is compared with `p` bit by bit,
+    from the most significant one. Each round draws a word for every word
+    with undecided bits and decides about half of those, thus rounds end
+    after about the log2 of the number of cells.
+    """
+    nwords = -(-shape[-1] // WORD)
+
+    words = np.zeros(shape[:-1] + (nwords,), dtype=np.uint64)
+    flat = words.reshape(-1)
+
+    # Words with undecided bits and those bits
+    index = np.arange(flat.size)
+    undecided = np.full(flat.size, ~np.uint64(0))
+
+    # Remaining bits of `p`, doubling and subtracting are exact
+    p = float(p)
+
+    while index.size and p > 0:
+        p *= 2
+        bit = p >= 1
+        p -= bit
+
+        roll = rng.integers(
+            np.iinfo(np.uint64).max, size=index.size, dtype=np.uint64, endpoint=True
+        )
+
+        # A 0 roll bit against a 1 bit of `p` is below, 1 against 0 is above
+        if bit:
+            flat[index] |= undecided & ~roll
+            undecided &= roll
+        else:
+            undecided &= ~roll
+
+        held = undecided != 0
+        index, undecided = index[held], undecided[held]
+
+    # Bits left undecided once `p` runs out are above it
+    return words & tail_mask(shape[-1])
+
+
+def pack_indices(indices, shape):
+    """Packed words of a grid of `shape` with the bits at the flat `indices` set."""
+    nrows, ncols = shape[-2:]
+    nwords = -(-ncols // WORD)
+
+    words = np.zeros((nrows, nwords), dtype=np.uint64)
+
+    rows, cols = np.divmod(np.asarray(indices, dtype=np.int64), ncols)
+    bits = np.left_shift(np.uint64(1), (cols % WORD).astype(np.uint64))
+
+    # Distinct cells may share a word
+    np.bitwise_or.at(words.reshape(-1), rows * nwords + cols // WORD, bits)
+
+    return words
+
+
+def popcount(words: np.ndarray) -> int:
+    """Number of set bits."""
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum(dtype=np.int64))
+
+    return int(np.unpackbits(np.ascontiguousarray(words).view(np.uint8)).sum())
+
+
+def moore_any(words: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Bitboard version of `neighbors.moore_any`."""
+    rows = words | shift(words, 1, 0, valid) | shift(words, -1, 0, valid)
+    return rows | shift(rows, 0, 1, valid) | shift(rows, 0, -1, valid)
+
+
+class BitGrid:
+    """
+    A forest fire grid stored as packed `tree` and `fire` bit planes.
+
+    Cells that are neither `tree` nor `fire` are considered `empty`.
+    Conversion to the public grid only happens on `to_grid`,
+    single cells are read and written in place, as `Modify` does.
+
+        Example::
+
+            >>> board = BitGrid.from_grid(grid, empty=0, tree=3, fire=25)
+            >>> grid = board.to_grid()
+
+    """
+
+    def __init__(self, tree, fire, ncols, empty, tree_value, fire_value, dtype):
+        self.tree = tree
+        self.fire = fire
+
+        self.ncols = ncols
+        self.valid = tail_mask(ncols)
+
+        self.cell_values = empty, tree_value, fire_value
+        self.dtype = np.dtype(dtype)
+
+    @classmethod
+    def from_grid(cls, grid, empty, tree, fire):
+        return cls(
+            pack(grid == tree),
+            pack(grid == fire),
+            grid.shape[-1],
+            empty,
+            tree,
+            fire,
+            grid.dtype,
+        )
+
+    def to_grid(self) -> np.ndarray:
+        empty, tree, fire = self.cell_values
+
+        grid = np.full(self.shape, empty, dtype=self.dtype)
+
+        grid[unpack(self.tree, self.ncols)] = tree
+        grid[unpack(self.fire, self.ncols)] = fire
+
+        return grid
+
+    def replace(self, tree, fire):
+        """New board sharing the metadata of this one."""
+        return BitGrid(tree, fire, self.ncols, *self.cell_values, self.dtype)
+
+    def copy(self):
+        return self.replace(self.tree.copy(), self.fire.copy())
+
+    def count_cells(self):
+        """Cell counts from the set bits, as `operator.count_cells`."""
+        empty, tree, fire = self.cell_values
+
+        ntree, nfire = popcount(self.tree), popcount(self.fire)
+        ncells = int(np.prod(self.shape))
+
+        counts = Counter({empty: ncells - ntree - nfire})
+        counts.update({tree: ntree, fire: nfire})
+
+        return +counts
+
+    def __getitem__(self, key):
+        word, bit = self._locate(key)
+        empty, tree, fire = self.cell_values
+
+        if self.fire[word] & bit:
+            value = fire
+        elif self.tree[word] & bit:
+            value = tree
+        else:
+            value = empty
+
+        return self.dtype.type(value)
+
+    def __setitem__(self, key, value):
+        word, bit = self._locate(key)
+        empty, tree, fire = self.cell_values
+
+        assert value in self.cell_values, f"Only cells of {self.cell_values}."
+
+        self.tree[word] &= ~bit
+        self.fire[word] &= ~bit
+
+        if value == tree:
+            self.tree[word] |= bit
+        elif value == fire:
+            self.fire[word] |= bit
+
+    def __array__(self, dtype=None, copy=None):
+        grid = self.to_grid()
+        return grid if dtype is None else grid.astype(dtype)
+
+    def _locate(self, key):
+        """Word index and bit of a single cell, `(..., row, col)`."""
+        *index, col = key
+        col = int(col) % self.ncols
+
+        return tuple(index) + (col // WORD,), np.uint64(1) << np.uint64(col % WORD)
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def empty(self):
+        return ~(self.tree | self.fire) & self.valid
+
+    @property
+    def shape(self):
+        return self.tree.shape[:-1] + (self.ncols,)
+
+    @property
+    def nbytes(self):
+        return self.tree.nbytes + self.fire.nbytes
+
+    def __repr__(self):
+        return f"BitGrid(shape={self.shape}, values={self.cell_values})"
@@ -0,0 +1,103 @@
+"""
+Per-cell forest fire rules as tight loops.
+
+Compiled by `gym_cellular_automata._jit.jit` when numba is installed.
+All the randomness is drawn by the callers, so the kernels are pure.
+"""
+
+from gym_cellular_automata._jit import jit
+
+
+@jit
+def _fire_nearby(grid, row, col, fire, propagates):
+    nrows, ncols = grid.shape
+
+    for i in range(3):
+        for j in range(3):
+            # Kernel entry (i, j) weights the neighbor at offset (1 - i, 1 - j)
+            r, c = row + 1 - i, col + 1 - j
+
+            if propagates[i, j] and 0 <= r < nrows and 0 <= c < ncols:
+                if grid[r, c] == fire:
+                    return True
+
+    return False
+
+
+@jit
+def drossel_schwabl(grid, roll, p_fire, p_tree, propagates, empty, tree, fire, out):
+    nrows, ncols = grid.shape
+
+    for row in range(nrows):
+        for col in range(ncols):
+            cell = grid[row, col]
+
+            if cell == tree:
+                burn = roll[row, col] < p_fire or _fire_nearby(
+                    grid, row, col, fire, propagates
+                )
+                out[row, col] = fire if burn else tree
+
+            elif cell == empty:
+                out[row, col] = tree if roll[row, col] < p_tree else empty
+
+            elif cell == fire:
+                out[row, col] = empty
+
+            else:
+                out[row, col] = cell
+
+    return out
+
+
+@jit
+def windy(grid, propagates, empty, tree, fire, out):
+    nrows, ncols = grid.shape
+
+    for row in range(nrows):
+        for col in range(ncols):
+            cell = grid[row, col]
+
+            if cell == tree:
+                burn = _fire_nearby(grid, row, col, fire, propagates)
+                out[row, col] = fire if burn else tree
+
+            else:
+                out[row, col] = empty
+
+    return out
+
+
+@jit
+def move(row, col, nrows, ncols, action, up, down, left, right):
+    # Validity is evaluated on the starting position
+    valid_up = row > 0
+    valid_down = row < (nrows - 1)
+    valid_left = col > 0
+    valid_right = col < (ncols - 1)
+
+    new_row, new_col = row, col
+
+    if up[action] and valid_up:
+        new_row -= 1
+
+    if down[action] and valid_down:
+        new_row += 1
+
+    if left[action] and valid_left:
+        new_col -= 1
+
+    if right[action] and valid_right:
+        new_col += 1
+
+    return new_row, new_col
+
+
+@jit
+def modify(grid, row, col, causes, effects):
+    for k in range(causes.shape[0]):
+        if grid[row, col] == causes[k]:
+            grid[row, col] = effects[k]
+            return True
+
+    return False
@@ -147,7 +147,24 @@ def moore_n(
         return egrid
 
 
-# Depracated: Still used as interface for CAs.
+def moore_any(mask: np.ndarray, invariant: bool = False) -> np.ndarray:
+    """
+    Whole-grid Moore's neighborhood test.
+    True at the cells whose Moore's neighborhood (itself included)
+    holds at least one True value of `mask`.
+
+    Works over the last two axes, leading axes are treated as a batch.
+    Cells beyond the boundary take the `invariant` value.
+    """
+    pad = [(0, 0)] * (mask.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mask, pad, constant_values=invariant)
+
+    # The 3x3 neighborhood is separable: first rows, then columns
+    rows = padded[..., :-2, :] | padded[..., 1:-1, :] | padded[..., 2:, :]
+    return rows[..., :-2] | rows[..., 1:-1] | rows[..., 2:]
+
+
+# Depracated: Still used as interface for CAs tests.
 # Superseded by Moore N function.
 def neighborhood_at(grid, pos, invariant=0):
     """
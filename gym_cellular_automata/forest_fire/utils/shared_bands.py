@@ -0,0 +1,192 @@
+"""
+Row bands updated on worker processes, over grids in shared memory.
+
+The current and the new grid are two shared memory blocks mapped by every worker.
+An update calls an operator method per band, reading the band and its halo rows
+from the current grid and writing the band on the new grid.
+Then the blocks swap roles, thus the halos written by neighbor workers
+are read from shared memory, and waiting for all the bands of an update
+is the barrier before the next one.
+
+The new grid stays on its block, a later update from it copies nothing in.
+Thus grids returned by `SharedBands.run` are views on shared memory,
+valid until the blocks are released, `SharedBands.detach` copies them off.
+
+Workers hold their own copy of the operator, taken when the pool starts.
+Parameters changed afterwards are taken once the pool restarts, after `close`.
+Randomness is drawn by the caller and passed as band arguments.
+"""
+
+import weakref
+from multiprocessing import get_context, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from gym_cellular_automata.forest_fire.utils import bands
+
+# Worker state, see `_init_worker`
+_operator = None
+_attached: dict[str, SharedMemory] = {}
+
+
+class SharedBands:
+    """
+    Pool of `processes` workers, started on the first update
+    and stopped by `close`, or once garbage collected.
+    """
+
+    def __init__(self, processes):
+        assert processes > 0, "'processes' must be a positive integer."
+
+        self.processes = processes
+
+        self._pool = None
+        self._blocks = []
+        self._blocks_key = None
+
+        # Block of the last returned grid, see `run`
+        self._resident = None
+
+        self._pool_finalizer = None
+        self._blocks_finalizer = None
+
+    def __reduce__(self):
+        # Copies, as those of the operator on the workers, start without a pool
+        return SharedBands, (self.processes,)
+
+    def run(self, operator, method, grid, updates):
+        """
+        Successive updates of `grid`, returned as a view on a shared block.
+
+        Each update calls, on the workers, per band:
+
+            operator.method(grid, out, start, stop, *args)
+
+        `updates` yields, per update, the `args` of each band.
+        A `grid` returned by the previous run is updated where it is,
+        other grids are copied in.
+        """
+        self._start(operator)
+
+        nrows = grid.shape[-2]
+        ranges = bands.bands(nrows)
+
+        blocks = self._get_grids(grid.shape, grid.dtype)
+
+        if self._resident is not None and grid is blocks[self._resident][1]:
+            current, new = blocks[self._resident], blocks[1 - self._resident]
+        else:
+            current, new = blocks
+            current[1][...] = grid
+
+        for band_args in updates:
+            names = current[0].name, new[0].name
+
+            tasks = [
+                (method, names, grid.shape, grid.dtype.str, start, stop, args)
+                for (start, stop), args in zip(ranges, band_args)
+            ]
+            self._pool.map(_update_band, tasks)
+
+            current, new = new, current
+
+        self._resident = 0 if current is blocks[0] else 1
+
+        return current[1]
+
+    def detach(self, grid):
+        """`grid` copied off the shared blocks if it is on them, as it is if not."""
+        on_blocks = any(grid is array for __, array in self._blocks)
+
+        return grid.copy() if on_blocks else grid
+
+    def close(self):
+        """
+        Stops the workers and releases the shared memory,
+        grids returned by `run` must be detached before.
+        """
+        self._release_blocks()
+        self._blocks_finalizer = None
+
+        if self._pool_finalizer is not None:
+            self._pool_finalizer()
+
+        self._pool = self._pool_finalizer = None
+
+    def _start(self, operator):
+        if self._pool is not None:
+            return
+
+        # Workers share the tracker of the blocks, instead of starting their own
+        # that would report the blocks as leaked on exit
+        resource_tracker.ensure_running()
+
+        self._pool = get_context().Pool(
+            self.processes, initializer=_init_worker, initargs=(operator,)
+        )
+        self._pool_finalizer = weakref.finalize(self, _stop_pool, self._pool)
+
+    def _get_grids(self, shape, dtype):
+        """
+        The two shared grids, `(block, array)` pairs.
+        Blocks are kept while grids keep their shape and type.
+        """
+        dtype = np.dtype(dtype)
+        nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+
+        if self._blocks_key != (shape, dtype):
+            self._release_blocks()
+
+            blocks = [SharedMemory(create=True, size=nbytes) for __ in range(2)]
+
+            self._blocks_finalizer = weakref.finalize(self, _unlink, blocks)
+            self._blocks = [
+                (block, np.ndarray(shape, dtype, buffer=block.buf)) for block in blocks
+            ]
+            self._blocks_key = shape, dtype
+
+        return self._blocks
+
+    def _release_blocks(self):
+        # Views on the blocks are dropped before closing them
+        self._blocks, self._blocks_key = [], None
+        self._resident = None
+
+        if self._blocks_finalizer is not None:
+            self._blocks_finalizer()
+
+
+def _stop_pool(pool):
+    pool.terminate()
+    pool.join()
+
+
+def _unlink(blocks):
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+def _init_worker(operator):
+    global _operator
+    _operator = operator
+
+
+def _update_band(task):
+    method, names, shape, dtype, start, stop, args = task
+
+    # Blocks of previous grid shapes are no longer used
+    for name in set(_attached) - set(names):
+        _attached.pop(name).close()
+
+    grid, out = (np.ndarray(shape, dtype, buffer=_attach(name).buf) for name in names)
+
+    getattr(_operator, method)(grid, out, start, stop, *args)
+
+
+def _attach(name):
+    if name not in _attached:
+        _attached[name] = SharedMemory(name)
+
+    return _attached[name]
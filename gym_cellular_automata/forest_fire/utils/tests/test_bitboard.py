@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from gym_cellular_automata.forest_fire.utils import bitboard
+from gym_cellular_automata.forest_fire.utils.bitboard import BitGrid
+from gym_cellular_automata.forest_fire.utils.neighbors import moore_any
+from gym_cellular_automata.operator import count_cells
+
+REPEATS = 8
+
+# Across word boundaries
+SHAPES = [(1, 1), (4, 3), (3, 64), (5, 130)]
+
+EMPTY, TREE, FIRE = 0, 3, 25
+
+
+@pytest.mark.repeat(REPEATS)
+@pytest.mark.parametrize("shape", SHAPES)
+def test_pack_unpack(shape):
+    mask = np.random.choice([True, False], size=shape)
+    words = bitboard.pack(mask)
+
+    assert words.dtype == np.uint64
+    assert words.shape == (shape[0], -(-shape[1] // bitboard.WORD))
+    assert np.all(bitboard.unpack(words, shape[1]) == mask)
+
+
+@pytest.mark.repeat(REPEATS)
+@pytest.mark.parametrize("shape", SHAPES)
+def test_shift_and_moore_any(shape):
+    mask = np.random.choice([True, False], size=shape)
+    words = bitboard.pack(mask)
+    valid = bitboard.tail_mask(shape[1])
+
+    padded = np.pad(mask, 1)
+    nrows, ncols = shape
+
+    for drow in (-1, 0, 1):
+        for dcol in (-1, 0, 1):
+            expected = padded[1 + drow : 1 + drow + nrows, 1 + dcol : 1 + dcol + ncols]
+            observed = bitboard.unpack(bitboard.shift(words, drow, dcol, valid), ncols)
+
+            assert np.all(observed == expected), f"Offset {(drow, dcol)}"
+
+    observed = bitboard.unpack(bitboard.moore_any(words, valid), ncols)
+    assert np.all(observed == moore_any(mask))
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_bitgrid_roundtrip(shape):
+    grid = np.random.choice([EMPTY, TREE, FIRE], size=shape)
+    board = BitGrid.from_grid(grid, EMPTY, TREE, FIRE)
+
+    assert board.shape == grid.shape
+    assert np.all(board.to_grid() == grid)
+    assert board.to_grid().dtype == grid.dtype
+
+    # Planes are disjoint and cover the grid
+    empty = bitboard.unpack(board.empty, shape[1])
+    assert np.all(empty == (grid == EMPTY))
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_bitgrid_cells(shape):
+    grid = np.random.choice([EMPTY, TREE, FIRE], size=shape)
+    board = BitGrid.from_grid(grid, EMPTY, TREE, FIRE)
+
+    assert count_cells(board) == count_cells(grid)
+
+    row, col = shape[0] - 1, shape[1] - 1
+    assert board[row, col] == grid[row, col]
+
+    for value in (EMPTY, TREE, FIRE):
+        board[row, col] = grid[row, col] = value
+
+        assert board[row, col] == value
+        assert np.all(np.asarray(board) == grid)
+
+
+@pytest.mark.parametrize("p", [0.0, 0.001, 0.333, 0.5, 1.0])
+def test_random_bits(p):
+    shape = 256, 130
+    rng = np.random.default_rng(0)
+
+    words = bitboard.random_bits(rng, p, shape)
+    bits = bitboard.unpack(words, shape[1])
+
+    # No bits beyond the columns
+    assert np.all(words & ~bitboard.tail_mask(shape[1]) == 0)
+
+    # Expected count with a wide margin, 4+ standard deviations
+    ncells = shape[0] * shape[1]
+    sd = np.sqrt(ncells * p * (1 - p))
+    assert abs(np.count_nonzero(bits) - ncells * p) < 4 * sd + 1
+
+
+def test_pack_indices():
+    shape = 5, 130
+    indices = np.random.choice(shape[0] * shape[1], 200, replace=False)
+
+    mask = np.zeros(shape, dtype=bool)
+    mask.flat[indices] = True
+
+    assert np.all(bitboard.pack_indices(indices, shape) == bitboard.pack(mask))
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from gym_cellular_automata.forest_fire.operators import (
+    ForestFire,
+    Modify,
+    Move,
+    WindyForestFire,
+)
+from gym_cellular_automata.forest_fire.utils import kernels
+from gym_cellular_automata.grid_space import GridSpace
+
+REPEATS = 16
+
+ROW, COL = 5, 7
+
+EMPTY, TREE, FIRE = 0, 3, 25
+
+ACTIONS = 9
+
+
+def python(kernel):
+    """The source function of a kernel, it runs with or without numba."""
+    return getattr(kernel, "py_func", kernel)
+
+
+@pytest.fixture
+def grid():
+    return GridSpace(values=[EMPTY, TREE, FIRE], shape=(ROW, COL)).sample()
+
+
+@pytest.fixture
+def directions_sets():
+    up_left, up, up_right, left, not_move, right, down_left, down, down_right = range(
+        ACTIONS
+    )
+
+    return {
+        "up": {up_left, up, up_right},
+        "down": {down_left, down, down_right},
+        "left": {up_left, left, down_left},
+        "right": {up_right, right, down_right},
+        "not_move": {not_move},
+    }
+
+
+@pytest.mark.repeat(REPEATS)
+def test_drossel_schwabl(grid):
+    ca = ForestFire(EMPTY, TREE, FIRE)
+
+    roll = np.random.random(grid.shape)
+    p_fire, p_tree = np.random.random(2)
+
+    expected = ca._next_cells(grid, roll < p_fire, roll < p_tree)
+    observed = python(kernels.drossel_schwabl)(
+        grid,
+        roll,
+        p_fire,
+        p_tree,
+        np.ones((3, 3), dtype=bool),
+        EMPTY,
+        TREE,
+        FIRE,
+        np.empty_like(grid),
+    )
+
+    assert np.all(observed == expected)
+
+
+@pytest.mark.repeat(REPEATS)
+def test_windy(grid):
+    ca = WindyForestFire(EMPTY, TREE, FIRE)
+
+    failed = np.random.random((3, 3)) < 0.5
+
+    expected = ca._step(grid, failed, np.empty_like(grid))
+    observed = python(kernels.windy)(
+        grid, ~failed, EMPTY, TREE, FIRE, np.empty_like(grid)
+    )
+
+    assert np.all(observed == expected)
+
+
+def test_move(grid, directions_sets):
+    move = Move(directions_sets)
+    tables = move._get_direction_tables()
+
+    for row, col in np.ndindex(ROW, COL):
+        for action in range(ACTIONS):
+            expected = move._get_new_position(grid, action, (row, col))
+            observed = python(kernels.move)(row, col, ROW, COL, action, *tables)
+
+            assert observed == expected
+
+
+def test_modify(grid):
+    effects = {TREE: EMPTY, FIRE: EMPTY}
+    modify = Modify(effects)
+
+    causes = np.array(list(effects.keys()))
+    new_cells = np.array(list(effects.values()))
+
+    for row, col in np.ndindex(ROW, COL):
+        expected, __ = modify(grid.copy(), True, (row, col))
+
+        observed = grid.copy()
+        hit = python(kernels.modify)(observed, row, col, causes, new_cells)
+
+        assert np.all(observed == expected)
+        assert hit == modify.hit
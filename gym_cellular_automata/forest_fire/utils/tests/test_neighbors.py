@@ -3,7 +3,11 @@ import pytest
 from gymnasium import spaces
 
 from gym_cellular_automata._config import TYPE_INT
-from gym_cellular_automata.forest_fire.utils.neighbors import moore_n, neighborhood_at
+from gym_cellular_automata.forest_fire.utils.neighbors import (
+    moore_any,
+    moore_n,
+    neighborhood_at,
+)
 from gym_cellular_automata.grid_space import GridSpace
 
 ROW = 4
@@ -73,6 +77,27 @@ def test_moore_n(grid_space, position_space, n_space):
     assert np.all(g == expected)
 
 
+@pytest.mark.repeat(REPEATS)
+def test_moore_any(grid_space):
+    grid = grid_space.sample()
+    target = VALUES[0]
+
+    observed = moore_any(grid == target)
+
+    for row in range(ROW):
+        for col in range(COL):
+            neighbors = neighborhood_at(grid, (row, col), invariant=INVARIANT)
+            assert observed[row, col] == (target in neighbors)
+
+    # Leading axes are a batch
+    batch = np.stack([grid, grid_space.sample()])
+    observed_batch = moore_any(batch == target)
+
+    assert observed_batch.shape == batch.shape
+    assert np.all(observed_batch[0] == observed)
+    assert np.all(observed_batch[1] == moore_any(batch[1] == target))
+
+
 def test_neighborhood_at(grid_space):
     empty, tree, fire = range(3)
 
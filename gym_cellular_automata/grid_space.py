@@ -1,11 +1,17 @@
 from functools import reduce
 from operator import mul
-from typing import Optional, Sequence
+from typing import Optional, Sequence, Union
 
 import numpy as np
 from gymnasium.spaces import Space
+from numpy.typing import DTypeLike
 
+from gym_cellular_automata import out_of_core
 from gym_cellular_automata._config import TYPE_INT
+from gym_cellular_automata.tiled_grid import TiledGrid
+
+# Widest span of cell values checked by a membership table
+LOOKUP_SPAN = 2**16
 
 
 class GridSpace(Space):
@@ -18,20 +24,35 @@ class GridSpace(Space):
         >>> GridSpace(n=3, shape=(2, 2))
         >>> GridSpace(values=[-1, 0, 1], shape=(2,2))
 
+    With `tile` samples are `TiledGrid`s, their tiles are sampled on demand.
+
+        >>> GridSpace(values=[0, 3], shape=(16384, 16384), tile=256)
+
+    With `memmap_dir` samples are `numpy.memmap`s on files of that directory,
+    sampled by chunks of rows.
+
+        >>> GridSpace(values=[0, 3], shape=(131072, 131072), memmap_dir="/data")
+
     """
 
     def __init__(
         self,
         n: Optional[int] = None,
-        values: Optional[Sequence[int]] = None,
+        values: Optional[Union[Sequence[int], np.ndarray]] = None,
         shape: tuple = tuple(),
-        probs: Optional[Sequence[float]] = None,
-        dtype: np.intc = TYPE_INT,
-        seed: int = None,
+        probs: Optional[Union[Sequence[float], np.ndarray]] = None,
+        dtype: DTypeLike = TYPE_INT,
+        seed: Optional[Union[int, np.random.Generator]] = None,
+        tile: Optional[int] = None,
+        memmap_dir: Optional[str] = None,
     ):
         super().__init__(shape, dtype, seed)
 
         assert shape, "Shape must be a non-empty tuple."
+        assert memmap_dir is None or len(shape) >= 2, "Memory maps need rows."
+
+        self.tile = tile
+        self.memmap_dir = memmap_dir
 
         if values is not None:
             self._from_values = True
@@ -59,16 +80,204 @@ class GridSpace(Space):
 
         self.size = reduce(mul, self.shape)
 
-    def sample(self) -> np.ndarray:
-        return self.np_random.choice(
-            a=self.values, size=self.size, p=self.probs
-        ).reshape(self.shape)
+        # For `contains`
+        self._lookup = self._get_lookup()
+
+    def sample(
+        self, n: Optional[int] = None, out: Optional[np.ndarray] = None
+    ) -> Union[np.ndarray, TiledGrid]:
+        """
+        A grid, or a batch of `n` grids stacked on a new first axis.
+        Written on `out` if given, it must have the shape of the sample.
+        """
+        if self.tile is not None:
+            assert n is None and out is None, "Tiled samples are single and new."
+            assert self.shape is not None
+
+            return TiledGrid(
+                self.shape,
+                tile=self.tile,
+                dtype=self.dtype,
+                values=self.values,
+                probs=self.probs,
+                seed=int(self.np_random.integers(2**63)),
+            )
+
+        assert self.shape is not None and self.dtype is not None
+
+        shape = self.shape if n is None else (n,) + self.shape
+
+        if out is None:
+            out = (
+                np.empty(shape, dtype=self.dtype)
+                if self.memmap_dir is None
+                else out_of_core.empty(shape, self.dtype, self.memmap_dir)
+            )
+
+        assert out.shape == shape, "'out' must have the shape of the sample."
+
+        if len(shape) < 2:
+            self._sample_cells(out)
+
+        else:
+            # By chunks of rows, the draws stay small
+            for rows in out_of_core.row_chunks(shape):
+                self._sample_cells(out[..., rows, :])
+
+        return out
 
     def contains(self, x) -> bool:
-        if isinstance(x, list):
-            x = np.array(x, dtype=self.dtype)
+        if isinstance(x, TiledGrid):
+            return x.cell_values().issubset(set(self.values.tolist())) and (
+                self.shape == x.shape
+            )
+
+        if out_of_core.is_memmap(x):
+            return self.shape == x.shape and all(
+                self._contains_cells(x[..., rows, :].reshape(1, -1))[0]
+                for rows in out_of_core.row_chunks(x.shape)
+            )
+
+        x = np.asarray(x)
+
+        return self.shape == x.shape and bool(self._contains_cells(x.reshape(1, -1))[0])
+
+    def contains_batch(self, x) -> np.ndarray:
+        """Membership of each grid of a stack, shape `(n,) + shape`."""
+        x = np.asarray(x)
+
+        if x.shape[1:] != self.shape:
+            return np.zeros(len(x), dtype=bool)
+
+        return self._contains_cells(x.reshape(len(x), -1))
+
+    def _contains_cells(self, cells):
+        """
+        Whether all the cells of each row of `cells` are values.
+        Integer cells are checked against the bounds of the values,
+        and against a membership table when the values have gaps,
+        thus without sorting.
+        """
+        if cells.shape[1] == 0:
+            return np.ones(len(cells), dtype=bool)
+
+        if self._lookup is None or not np.issubdtype(cells.dtype, np.integer):
+            values = set(self.values.tolist())
+            return np.array([set(np.unique(row).tolist()) <= values for row in cells])
+
+        low, high, table, __ = self._lookup
+
+        contained = (cells.min(axis=1) >= low) & (cells.max(axis=1) <= high)
+
+        if table is not None and np.any(contained):
+            # Rows out of bounds are already out, "clip" keeps them within the table
+            indices = cells if low == 0 else cells.astype(np.intp) - low
+            contained &= np.take(table, indices, mode="clip").all(axis=1)
+
+        elif table is None and len(self.values) < high - low + 1:
+            # Gaps over a span too wide for a table
+            contained &= np.isin(cells, self.values).all(axis=1)
+
+        return contained
+
+    def to_indices(self, grid, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Dense encoding, the index among `values` of each cell value.
+        Grids of any shape, as batches, with cells within `values`,
+        others raise a ValueError.
+        Written on `out` if given, by default of the narrowest unsigned type.
+        """
+        grid = np.asarray(grid)
+
+        if out is None:
+            out = np.empty(grid.shape, dtype=np.min_scalar_type(self.n))
+
+        indices = None if self._lookup is None else self._lookup[3]
+
+        if indices is None or not np.issubdtype(grid.dtype, np.integer):
+            if not self._contains_cells(grid.reshape(1, -1))[0]:
+                raise ValueError(
+                    f"Cells out of the space values {self.values.tolist()}."
+                )
+
+            out[...] = np.searchsorted(self.values, grid)
+            return out
+
+        low = self._lookup[0]
+        cells = grid if low == 0 else np.subtract(grid, low, dtype=np.intp)
+
+        found = out if np.can_cast(indices.dtype, out.dtype) else None
+        found = np.take(indices, cells, out=found, mode="clip")
+
+        # Cells above the values and within gaps are indexed `n`, see `_get_lookup`,
+        # cells below them are told by the minimum
+        if found.size and (found.max() >= self.n or cells.min() < 0):
+            raise ValueError(f"Cells out of the space values {self.values.tolist()}.")
+
+        if found is not out:
+            out[...] = found
+
+        return out
+
+    def to_one_hot(
+        self, grid, out: Optional[np.ndarray] = None, dtype=np.float32
+    ) -> np.ndarray:
+        """
+        One-hot encoding, a new last axis with a channel per value.
+        Cells within `values`, as for `to_indices`. Written on `out` if given, otherwise of type `dtype`.
+        """
+        grid = np.asarray(grid)
+
+        if out is None:
+            out = np.empty(grid.shape + (self.n,), dtype=dtype)
+
+        # Rows of the identity gathered by index, a single pass over the cells
+        eye = np.eye(self.n, dtype=out.dtype)
+
+        return np.take(eye, self.to_indices(grid), axis=0, out=out)
+
+    def _get_lookup(self):
+        """
+        Bounds of integer values, their membership table when the values
+        have gaps, and the table of their indices. Gaps and a cell past
+        the highest value are indexed `n`, the latter takes clipped cells.
+        None for other values, tables are None over too wide spans.
+        """
+        if not np.issubdtype(self.values.dtype, np.integer):
+            return None
+
+        low, high = int(self.values.min()), int(self.values.max())
+        span = high - low + 1
+
+        members = indices = None
+        if span <= LOOKUP_SPAN:
+            indices = np.full(span + 1, self.n, dtype=np.min_scalar_type(self.n))
+            indices[self.values - low] = np.arange(self.n)
+
+            if len(self.values) < span:
+                members = np.zeros(span, dtype=bool)
+                members[self.values - low] = True
+
+        return low, high, members, indices
+
+    def _sample_cells(self, cells):
+        """
+        Writes values on `cells`, bucketizing a single uniform roll
+        by the cumulative probabilities.
+        """
+        roll = self.np_random.random(cells.shape, dtype=np.float32)
+        edges = np.cumsum(self.probs)[:-1].astype(np.float32)
+
+        if len(edges) < 8:
+            # Number of edges below the roll, a pass per edge
+            indices = np.zeros(cells.shape, dtype=np.uint8)
+            for edge in edges:
+                indices += roll >= edge
+
+        else:
+            indices = np.searchsorted(edges, roll, side="right")
 
-        return set(np.unique(x)).issubset(set(self.values)) and self.shape == x.shape
+        np.take(self.values, indices, out=cells, mode="clip")
 
     def __repr__(self):
         if self._from_values:
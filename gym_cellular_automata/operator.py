@@ -1,11 +1,20 @@
 from abc import ABC, abstractmethod
+from collections import Counter
 from copy import copy
-from typing import Any, Optional, Tuple
+from functools import singledispatch
+from typing import Any, Callable, Optional, Tuple
 
 import numpy as np
-from gymnasium.spaces import Space
+from gymnasium import logger
+from gymnasium.spaces import Discrete, MultiDiscrete, Space
 from gymnasium.utils import seeding
 
+from gym_cellular_automata import out_of_core
+from gym_cellular_automata._jit import JIT_AVAILABLE
+
+# Widest span of cell values counted by `bincount`, see `count_cells`
+COUNT_SPAN = 2**16
+
 
 class Operator(ABC):
     # Set these in ALL subclasses
@@ -17,6 +26,13 @@ class Operator(ABC):
 
     deterministic: Optional[bool] = None
 
+    # Available implementations of `update`
+    backends: Tuple = ("numpy",)
+
+    # Cell population changes of the last update, a `Counter` by cell value
+    # None when unknown, then the cells are counted again
+    delta: Optional[Counter] = None
+
     @abstractmethod
     def __init__(
         self,
@@ -66,9 +82,276 @@ class Operator(ABC):
 
         return new_grid, new_context
 
+    def update_batch(
+        self, grids: np.ndarray, actions: Any, contexts: Any
+    ) -> Tuple[np.ndarray, Any]:
+        """`update` of each instance of a batch.
+
+        Grids, actions and contexts are stacked on a leading axis,
+        contexts leaf by leaf, as `(winds, positions, times)`.
+        None actions stay None. Returns the grids and contexts stacked
+        the same way, grids may be updated in place as by `update`.
+        `delta` is the population change of the whole batch.
+
+        Unless overridden the instances are updated in turn,
+        thus any operator takes batches.
+        """
+
+        new_grids, new_contexts, deltas = [], [], []
+
+        if actions is None:
+            actions = [None] * len(grids)
+
+        for grid, action, context in zip(grids, actions, iter_contexts(contexts)):
+            grid, context = self.update(grid, action, context)
+
+            new_grids.append(grid)
+            new_contexts.append(context)
+            deltas.append(self.delta)
+
+        self.delta = merge_deltas(*deltas)
+
+        return np.stack(new_grids), stack_contexts(new_contexts)
+
+    def update_into(
+        self, grid: np.ndarray, action: Any, context: Any, out_grid, out_context
+    ) -> Tuple[np.ndarray, Any]:
+        """`update` written on caller-owned buffers, `out_grid` and `out_context`.
+
+        The new grid is `out_grid`, or `grid` itself when the update leaves it
+        as it is or changes it in place. Grids that the operator cannot write
+        on `out_grid` are returned as new grids, as `update` does.
+        The new context is always written on `out_context`, see `copy_into`.
+
+        `out_grid` does not alias `grid`, thus callers keep two grids
+        that take turns, see `CAEnv`. `out_context` may be `context` itself,
+        the context is read before it is written.
+        Unless overridden, `update` is called.
+        """
+
+        new_grid, new_context = self.update(grid, action, context)
+
+        return new_grid, copy_into(new_context, out_context)
+
+    def update_burst(
+        self, grid: np.ndarray, action: Any, context: Any, repeats: int
+    ) -> Tuple[np.ndarray, Any]:
+        """`repeats` successive updates under the same action.
+
+        Operators able to fuse the updates override this loop.
+        """
+
+        deltas = []
+        for __ in range(repeats):
+            grid, context = self.update(grid, action, context)
+            deltas.append(self.delta)
+
+        self.delta = merge_deltas(*deltas)
+
+        return grid, context
+
+    def update_burst_into(
+        self,
+        grid: np.ndarray,
+        action: Any,
+        context: Any,
+        repeats: int,
+        out_grid,
+        out_context,
+    ) -> Tuple[np.ndarray, Any]:
+        """`update_burst` written on caller-owned buffers, as `update_into`."""
+
+        new_grid, new_context = self.update_burst(grid, action, context, repeats)
+
+        return new_grid, copy_into(new_context, out_context)
+
+    def is_quiescent(self, grid: np.ndarray, context: Any) -> bool:
+        """Whether an update would leave the grid as it is.
+
+        Composite operators skip the updates of quiescent suboperators.
+        Unless overridden the operator is assumed to change the grid.
+        """
+
+        return False
+
+    def run_until_quiescent(
+        self, grid: np.ndarray, action: Any, context: Any, max_updates: int
+    ) -> Tuple[np.ndarray, Any, int]:
+        """Updates until quiescence, at most `max_updates` times.
+
+        Returns the grid, the context and the number of updates done.
+        """
+
+        deltas = []
+        updates = 0
+        while updates < max_updates and not self.is_quiescent(grid, context):
+            grid, context = self.update(grid, action, context)
+            deltas.append(self.delta)
+            updates += 1
+
+        self.delta = merge_deltas(*deltas)
+
+        return grid, context, updates
+
+    def close(self) -> None:
+        """Releases the resources held by the operator, as worker processes.
+
+        Suboperators are not closed, `CAEnv.close` walks them all.
+        """
+
+    def detach(self, grid: np.ndarray) -> np.ndarray:
+        """Returns `grid` off the resources of the operator, a copy if it is on them.
+
+        Grids kept on shared memory between updates are only valid until `close`.
+        """
+
+        return grid
+
     def __call__(self, *args, **kwargs):
         return self.update(*args, **kwargs)
 
     def seed(self, seed=None):
         self.np_random, seed = seeding.np_random(seed)
         return [seed]
+
+    def _set_backend(self, backend):
+        if backend not in self.backends:
+            raise ValueError(
+                f"Unknown backend '{backend}', use one of {self.backends}."
+            )
+
+        if backend == "jit" and not JIT_AVAILABLE:
+            logger.warn("numba is not installed, 'jit' backend falls back to 'numpy'.")
+            backend = "numpy"
+
+        self.backend = backend
+
+
+@singledispatch
+def compile_operator(operator: Operator) -> Callable:
+    """
+    A callable with the signature of `update`, fused from the operator
+    and its suboperators, with lookup tables in place of per step logic.
+
+    Fused updates set the `delta` of the operator, and any other attribute
+    read by the environments, as `Modify.hit`. Operators register their
+    own compilers, composites compile their suboperators,
+    operators without one are called through their `update`.
+    Compile again after changing the parameters of an operator.
+    """
+    return operator.update
+
+
+def action_table(func: Callable, action_space: Optional[Space]) -> Optional[np.ndarray]:
+    """
+    `func` at every action of a `Discrete` or `MultiDiscrete` space,
+    an array indexed by action. None for other spaces, or no space.
+    """
+    if isinstance(action_space, Discrete) and action_space.start == 0:
+        return np.array([func(action) for action in range(action_space.n)])
+
+    if (
+        isinstance(action_space, MultiDiscrete)
+        and action_space.nvec.ndim == 1
+        and not np.any(action_space.start)
+    ):
+        nvec = action_space.nvec.tolist()
+        table = [func(action) for action in np.ndindex(*nvec)]
+
+        return np.array(table).reshape(nvec)
+
+    return None
+
+
+def iter_operators(operator):
+    """The operator and its suboperators, all levels deep."""
+    operators = [operator]
+
+    while operators:
+        operator = operators.pop()
+        yield operator
+
+        operators.extend(operator.suboperators)
+
+
+def merge_deltas(*deltas):
+    """Population change of successive updates, None if any is unknown."""
+    merged = Counter()
+
+    for delta in deltas:
+        if delta is None:
+            return None
+
+        merged.update(delta)
+
+    return merged
+
+
+def copy_into(context, out):
+    """
+    Copies `context` on the arrays of `out`, a context of the same structure.
+    Tuples are walked, other leaves than arrays are immutable and returned as is.
+    """
+    if isinstance(out, tuple):
+        return tuple(copy_into(leaf, out_leaf) for leaf, out_leaf in zip(context, out))
+
+    if isinstance(out, np.ndarray):
+        np.copyto(out, context)
+        return out
+
+    return context
+
+
+def iter_contexts(contexts):
+    """Contexts of each instance of a batch, leaf by leaf."""
+    if isinstance(contexts, tuple):
+        return zip(*(iter_contexts(leaf) for leaf in contexts))
+
+    return iter(contexts)
+
+
+def stack_contexts(contexts):
+    """Batch of contexts of the same structure, leaves stacked as arrays."""
+    if isinstance(contexts[0], tuple):
+        return tuple(stack_contexts(leaves) for leaves in zip(*contexts))
+
+    return np.stack(contexts)
+
+
+def count_cells(grid):
+    """Cell counts of a grid, a `Counter` by cell value."""
+    if not isinstance(grid, np.ndarray) and hasattr(grid, "count_cells"):
+        # Grids that count themselves, as `TiledGrid`
+        return grid.count_cells()
+
+    if out_of_core.is_memmap(grid):
+        counts = Counter()
+
+        for rows in out_of_core.row_chunks(grid.shape):
+            counts.update(count_cells(np.asarray(grid[..., rows, :])))
+
+        return counts
+
+    grid = np.asarray(grid)
+
+    if grid.size == 0:
+        return Counter()
+
+    if not np.issubdtype(grid.dtype, np.integer):
+        values, counts = np.unique(grid, return_counts=True)
+        return Counter(dict(zip(values.tolist(), counts.tolist())))
+
+    # A single `bincount`, shifted when there are negative cell values
+    low, high = min(int(grid.min()), 0), int(grid.max())
+
+    # Its memory grows with the span of the values, wide spans are sorted instead
+    if high - low >= COUNT_SPAN:
+        values, counts = np.unique(grid, return_counts=True)
+        return Counter(dict(zip(values.tolist(), counts.tolist())))
+
+    # Shifted on `intp`, narrow cell types may not hold the shifted values
+    counts = np.bincount(np.subtract(grid.ravel(), low, dtype=np.intp))
+
+    values = np.flatnonzero(counts)
+
+    return Counter(dict(zip((values + low).tolist(), counts[values].tolist())))
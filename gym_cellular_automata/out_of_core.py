@@ -0,0 +1,72 @@
+"""
+Grids memory mapped to files, for grids larger than the RAM.
+
+A `numpy.memmap` grid is read and written by chunks of rows,
+thus the memory in use is bounded by the chunk instead of the grid.
+New grids are mapped to temporary files, next to the file of the grid
+they come from, and deleted once no longer referenced.
+"""
+
+import os
+from tempfile import NamedTemporaryFile
+
+import numpy as np
+
+# Cells per chunk, rows are never split
+CHUNK_CELLS = 2**22
+
+
+def is_memmap(grid):
+    return isinstance(grid, np.memmap)
+
+
+def chunk_rows(shape):
+    """Rows per chunk of a grid of `shape`, at least one."""
+    row_cells = int(np.prod(shape[:-2], dtype=np.int64)) * shape[-1]
+
+    return max(1, CHUNK_CELLS // max(row_cells, 1))
+
+
+def row_chunks(shape):
+    """Slices of the rows, last axis but one, of each chunk."""
+    nrows, rows = shape[-2], chunk_rows(shape)
+
+    return [slice(start, min(start + rows, nrows)) for start in range(0, nrows, rows)]
+
+
+def empty(shape, dtype, directory=None):
+    """
+    A grid mapped to a temporary file in `directory`, the default temporary
+    directory if None. The file is deleted along with the grid.
+    """
+    file = NamedTemporaryFile(dir=directory, prefix="grid-", suffix=".dat")
+
+    grid = np.memmap(file, dtype=dtype, mode="w+", shape=tuple(shape))
+
+    # The file lives as long as the grid
+    grid._file = file
+
+    return grid
+
+
+def empty_like(grid):
+    """A memory mapped grid next to the file of `grid`."""
+    directory = os.path.dirname(grid.filename) if grid.filename else None
+
+    return empty(grid.shape, grid.dtype, directory)
+
+
+def any_equal(grid, value):
+    """
+    Whether any cell equals `value`, per grid of a batch,
+    with the shape of `np.any(..., axis=(-2, -1), keepdims=True)`.
+    """
+    if not is_memmap(grid):
+        return np.any(grid == value, axis=(-2, -1), keepdims=True)
+
+    found = np.zeros(grid.shape[:-2] + (1, 1), dtype=bool)
+
+    for rows in row_chunks(grid.shape):
+        found |= np.any(grid[..., rows, :] == value, axis=(-2, -1), keepdims=True)
+
+    return found
@@ -0,0 +1,50 @@
+"""
+Contexts held as NumPy records.
+
+A record holds every leaf of a flat context, as `(wind, position, time)`,
+on a single contiguous buffer. `as_tuple` views the record as the tuple of
+leaves that operators and observations take, thus writing on the leaves
+updates the record in place.
+
+An array of records is a batch of contexts, its tuple view stacks
+each leaf over the batch, as `Operator.update_batch` takes them.
+"""
+
+import numpy as np
+
+from gym_cellular_automata.operator import copy_into
+
+
+def record_dtype(context, names=None):
+    """
+    Structured type with a field per leaf of `context`, of its type and shape.
+    Fields are named by `names`, by default as NumPy does, `f0`, `f1`, ...
+    """
+    assert isinstance(context, tuple), "Only tuple contexts."
+
+    leaves = [np.asarray(leaf) for leaf in context]
+    names = [f"f{k}" for k in range(len(leaves))] if names is None else names
+
+    assert len(names) == len(leaves), "A name per leaf."
+
+    return np.dtype(
+        [(name, leaf.dtype, leaf.shape) for name, leaf in zip(names, leaves)]
+    )
+
+
+def to_record(context, dtype=None, shape=()):
+    """
+    Records of `dtype` filled with `context`, `shape` records for a batch.
+    By default of the type given by `record_dtype`.
+    """
+    dtype = record_dtype(context) if dtype is None else dtype
+
+    record = np.empty(shape, dtype=dtype)
+    copy_into(tuple(context), as_tuple(record))
+
+    return record
+
+
+def as_tuple(record):
+    """The leaves of `record` as a tuple of views, the legacy context."""
+    return tuple(record[name] for name in record.dtype.names)
@@ -1,7 +1,21 @@
-from typing import Any
+import multiprocessing as mp
+from copy import deepcopy
+from ctypes import c_uint8
+from types import ModuleType
+from typing import Any, Callable, Iterable, Iterator
 
+import numpy as np
 from gymnasium.envs.registration import register
-from gymnasium.spaces import flatten
+from gymnasium.spaces import Box, flatdim, flatten, flatten_space, unflatten
+from gymnasium.vector.utils import (
+    batch_space,
+    concatenate,
+    create_empty_array,
+    create_shared_memory,
+    iterate,
+    read_from_shared_memory,
+    write_to_shared_memory,
+)
 from numpy.typing import NDArray
 
 from gym_cellular_automata.forest_fire.bulldozer import ForestFireBulldozerEnv
@@ -27,6 +41,7 @@ REGISTERED_CA_ENVS = {
     + "-v1": {
         "kwargs": {"nrows": HELR, "ncols": HELC},
         "entry_point": FFDIR + ".helicopter:ForestFireHelicopterEnv",
+        "vector_entry_point": FFDIR + ".helicopter:HelicopterVectorEnv",
     },
     "ForestFireBulldozer"
     + str(BULR)
@@ -35,6 +50,7 @@ REGISTERED_CA_ENVS = {
     + "-v3": {
         "kwargs": {"nrows": BULR, "ncols": BULC},
         "entry_point": FFDIR + ".bulldozer:ForestFireBulldozerEnv",
+        "vector_entry_point": FFDIR + ".bulldozer:BulldozerVectorEnv",
     },
 }
 
@@ -47,9 +63,105 @@ def _register_caenvs():
             ca_env,
             kwargs=REGISTERED_CA_ENVS[ca_env]["kwargs"],
             entry_point=REGISTERED_CA_ENVS[ca_env]["entry_point"],
+            vector_entry_point=REGISTERED_CA_ENVS[ca_env].get("vector_entry_point"),
         )
 
 
+# Space utilities of Gymnasium for `GridSpace`
+# Grids are reshaped as views whenever their memory layout allows it
+
+
 @flatten.register(GridSpace)
 def _flatten_grid_space(space: GridSpace, x: NDArray[Any]) -> NDArray[Any]:
-    return np.asarray(x, dtype=space.dtype).flatten()
+    return np.asarray(x, dtype=space.dtype).ravel()
+
+
+@unflatten.register(GridSpace)
+def _unflatten_grid_space(space: GridSpace, x: NDArray[Any]) -> NDArray[Any]:
+    return np.asarray(x, dtype=space.dtype).reshape(space.shape)
+
+
+@flatdim.register(GridSpace)
+def _flatdim_grid_space(space: GridSpace) -> int:
+    return space.size
+
+
+@flatten_space.register(GridSpace)
+def _flatten_space_grid_space(space: GridSpace) -> Box:
+    assert space.dtype is not None
+
+    return Box(
+        low=space.values.min(),
+        high=space.values.max(),
+        shape=(space.size,),
+        dtype=space.dtype,
+        seed=deepcopy(space.np_random),
+    )
+
+
+@batch_space.register(GridSpace)
+def _batch_space_grid_space(space: GridSpace, n: int = 1) -> GridSpace:
+    assert space.shape is not None and space.dtype is not None
+
+    return GridSpace(
+        values=space.values,
+        shape=(n,) + space.shape,
+        probs=space.probs,
+        dtype=space.dtype,
+        seed=deepcopy(space.np_random),
+    )
+
+
+@concatenate.register(GridSpace)
+def _concatenate_grid_space(
+    space: GridSpace, items: Iterable, out: NDArray[Any]
+) -> NDArray[Any]:
+    return np.stack(list(items), axis=0, out=out)
+
+
+@iterate.register(GridSpace)
+def _iterate_grid_space(space: GridSpace, items: NDArray[Any]) -> Iterator[Any]:
+    return iter(items)
+
+
+@create_empty_array.register(GridSpace)
+def _create_empty_array_grid_space(
+    space: GridSpace, n: int = 1, fn: Callable = np.zeros
+) -> NDArray[Any]:
+    assert space.shape is not None
+
+    return fn((n,) + space.shape, dtype=space.dtype)
+
+
+# Shared memory of `AsyncVectorEnv`, workers write grids straight on it
+# Raw bytes, thus any grid type fits, read as the grids of the batch
+
+
+@create_shared_memory.register(GridSpace)
+def _create_shared_memory_grid_space(
+    space: GridSpace, n: int = 1, ctx: ModuleType = mp
+) -> Any:
+    assert space.dtype is not None
+
+    return ctx.Array(c_uint8, n * space.size * space.dtype.itemsize)
+
+
+@read_from_shared_memory.register(GridSpace)
+def _read_from_shared_memory_grid_space(
+    space: GridSpace, shared_memory: Any, n: int = 1
+) -> NDArray[Any]:
+    assert space.shape is not None
+
+    return np.frombuffer(shared_memory.get_obj(), dtype=space.dtype).reshape(
+        (n,) + space.shape
+    )
+
+
+@write_to_shared_memory.register(GridSpace)
+def _write_to_shared_memory_grid_space(
+    space: GridSpace, index: int, value: NDArray[Any], shared_memory: Any
+) -> None:
+    grids = np.frombuffer(shared_memory.get_obj(), dtype=space.dtype)
+    start = index * space.size
+
+    np.copyto(grids[start : start + space.size].reshape(space.shape), value)
@@ -1,3 +1,13 @@
+import pytest
+
+from gym_cellular_automata._jit import JIT_AVAILABLE
+
 from .identity import Identity
 from .mock_caenv import MockCAEnv
 from .test_operator import assert_operator
+from .twin_envs import assert_twin_envs, step_twin_envs
+
+# Without numba the "jit" backend falls back to "numpy", nothing to compare
+JIT = pytest.param(
+    "jit", marks=pytest.mark.skipif(not JIT_AVAILABLE, reason="numba is not installed")
+)
@@ -73,3 +73,21 @@ def test_counts(env):
     assert all(
         [observed_counts[cell] == expected_counts[cell] for cell in expected_counts]
     )
+
+
+def test_counts_after_writing_the_grid(env):
+    env.reset()
+
+    grid = env.grid
+    counts = env.count_cells()
+
+    # Written in place, the cached counts are stale until invalidated
+    cell = grid.flat[0]
+    other = next(value for value in env.grid_space.values if value != cell)
+    grid.flat[0] = other
+
+    env.invalidate_counts()
+    observed_counts = env.count_cells()
+
+    assert observed_counts[cell] == counts[cell] - 1
+    assert observed_counts[other] == counts[other] + 1
@@ -2,6 +2,16 @@ from copy import copy
 
 import numpy as np
 import pytest
+from gymnasium.spaces import flatdim, flatten, flatten_space, unflatten
+from gymnasium.vector.utils import (
+    batch_space,
+    concatenate,
+    create_empty_array,
+    create_shared_memory,
+    iterate,
+    read_from_shared_memory,
+    write_to_shared_memory,
+)
 
 from gym_cellular_automata import GridSpace
 
@@ -69,3 +79,157 @@ def test_seed():
     grid2 = space2.sample()
 
     assert np.all(grid1 == grid2), f"Not equal with SEED {SEED}"
+
+
+def test_batched_sample():
+    space = GridSpace(values=[0, 3, 25], shape=(64, 32), probs=[0.2, 0.8, 0.0])
+
+    grids = space.sample(n=5)
+
+    assert grids.shape == (5, 64, 32)
+    assert all(space.contains(grid) for grid in grids)
+
+    # Null probability values never show up
+    assert not np.any(grids == 25)
+
+    # Written in place
+    out = np.empty((5, 64, 32), dtype=space.dtype)
+    assert space.sample(n=5, out=out) is out
+    assert all(space.contains(grid) for grid in out)
+
+
+@pytest.mark.parametrize("n", [3, 12])
+def test_sample_frequencies(n):
+    probs = np.random.dirichlet(np.ones(n))
+    space = GridSpace(n=n, shape=(256, 256), probs=probs, seed=0)
+
+    grid = space.sample()
+    frequencies = np.bincount(grid.ravel(), minlength=n) / grid.size
+
+    assert frequencies == pytest.approx(probs, abs=0.01)
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [0, 1, 2],  # Dense
+        [0, 3, 25],  # With gaps
+        [-4, 7],  # Negative
+        [0, 2**20],  # Too wide for a table
+    ],
+)
+def test_contains_rejects_foreign_cells(values):
+    space = GridSpace(values=values, shape=(4, 4))
+    grid = space.sample()
+
+    assert space.contains(grid)
+    assert space.contains(grid.tolist())
+
+    for foreign in (min(values) - 1, max(values) + 1, min(values) + 1):
+        if foreign in values:
+            continue
+
+        bad = grid.copy()
+        bad[2, 3] = foreign
+
+        assert not space.contains(bad)
+
+    assert not space.contains(grid[:2])
+
+
+def test_contains_batch():
+    space = GridSpace(values=[0, 3, 25], shape=(8, 8))
+
+    grids = space.sample(n=6)
+    grids[1, 0, 0] = 4
+    grids[4, 7, 7] = -1
+
+    assert space.contains_batch(grids).tolist() == [
+        True,
+        False,
+        True,
+        True,
+        False,
+        True,
+    ]
+
+    assert not np.any(space.contains_batch(grids[:, :4]))
+
+
+def test_gymnasium_space_utils():
+    space = GridSpace(values=[0, 3, 25], shape=(4, 6), seed=0)
+    grid = space.sample()
+
+    flat = flatten(space, grid)
+
+    # Views, not copies
+    assert np.shares_memory(flat, grid)
+    assert flatdim(space) == flat.size == 24
+    assert flatten_space(space).contains(flat)
+    assert np.all(unflatten(space, flat) == grid)
+
+    batched = batch_space(space, 3)
+
+    assert isinstance(batched, GridSpace)
+    assert batched.shape == (3, 4, 6)
+
+    out = create_empty_array(space, 3)
+    grids = concatenate(space, [space.sample() for __ in range(3)], out)
+
+    assert grids is out
+    assert batched.contains(grids)
+    assert all(np.all(a == b) for a, b in zip(iterate(batched, grids), grids))
+
+
+def test_encodings():
+    space = GridSpace(values=[0, 3, 25], shape=(4, 6))
+    grids = space.sample(n=2)
+
+    indices = space.to_indices(grids)
+
+    assert indices.dtype == np.uint8
+    assert np.all(space.values[indices] == grids)
+
+    one_hot = np.empty((2, 4, 6, 3), dtype=np.float32)
+    assert space.to_one_hot(grids, out=one_hot) is one_hot
+
+    assert np.all(one_hot.sum(axis=-1) == 1)
+    assert np.all(one_hot.argmax(axis=-1) == indices)
+
+    # Negative values, and values too wide for a table
+    for values in ([-4, 7], [0, 2**20]):
+        space = GridSpace(values=values, shape=(4, 6))
+        grid = space.sample()
+
+        assert np.all(space.values[space.to_indices(grid)] == grid)
+
+
+@pytest.mark.parametrize("values", [[0, 3, 25], [-4, 7], [0, 2**20]])
+def test_encodings_out_of_space(values):
+    space = GridSpace(values=values, shape=(4, 6))
+
+    # Within the bounds of the values, and out of them
+    for cell in (1, min(values) - 1, max(values) + 1):
+        grid = space.sample()
+        grid[2, 3] = cell
+
+        with pytest.raises(ValueError):
+            space.to_indices(grid)
+
+        with pytest.raises(ValueError):
+            space.to_one_hot(grid)
+
+
+def test_shared_memory():
+    space = GridSpace(values=[0, 3, 25], shape=(4, 6), dtype=np.int64, seed=0)
+
+    shared_memory = create_shared_memory(space, n=3)
+    grids = read_from_shared_memory(space, shared_memory, n=3)
+
+    assert grids.shape == (3, 4, 6) and grids.dtype == np.int64
+
+    grid = space.sample()
+    write_to_shared_memory(space, 1, grid, shared_memory)
+
+    # Reads are views of the shared memory
+    assert np.all(grids[1] == grid)
@@ -1,4 +1,15 @@
+from collections import Counter
+
+import numpy as np
+from gymnasium import spaces
+
 from gym_cellular_automata import Operator
+from gym_cellular_automata.operator import (
+    action_table,
+    compile_operator,
+    count_cells,
+    merge_deltas,
+)
 from gym_cellular_automata.tests import Identity
 
 
@@ -6,6 +17,39 @@ def test_operator():
     assert_operator(Identity(), strict=False)
 
 
+def test_count_cells():
+    grid = np.array([[0, 3, 3], [25, 3, 0]])
+    assert count_cells(grid) == Counter({0: 2, 3: 3, 25: 1})
+
+    # Negative and non integer cell values
+    assert count_cells(grid - 5) == Counter({-5: 2, -2: 3, 20: 1})
+    assert count_cells(grid / 2) == Counter({0.0: 2, 1.5: 3, 12.5: 1})
+
+    # Narrow cell types, the shifted values overflow them
+    assert count_cells(np.array([[-100, 0, 100]], dtype=np.int8)) == Counter(
+        {-100: 1, 0: 1, 100: 1}
+    )
+    assert count_cells(np.array([[-30000, 30000]], dtype=np.int16)) == Counter(
+        {-30000: 1, 30000: 1}
+    )
+    assert count_cells(np.array([[0, 7, 7]], dtype=np.uint64)) == Counter({0: 1, 7: 2})
+
+    # Spans too wide for a `bincount`
+    assert count_cells(grid + 2**40) == Counter({2**40: 2, 2**40 + 3: 3, 2**40 + 25: 1})
+    assert count_cells(grid - 2**40) == Counter(
+        {-(2**40): 2, 3 - 2**40: 3, 25 - 2**40: 1}
+    )
+
+
+def test_merge_deltas():
+    burn = Counter({3: -1, 25: 1})
+    consume = Counter({25: -1, 0: 1})
+
+    assert merge_deltas(burn, consume) == Counter({3: -1, 0: 1})
+    assert merge_deltas() == Counter()
+    assert merge_deltas(burn, None) is None
+
+
 def assert_operator(op, strict=False):
     from gymnasium.spaces import Space
 
@@ -65,3 +109,36 @@ def assert_operator(op, strict=False):
     assert callable(op.update)
 
     assert_update(op, strict)
+
+
+def test_compile_operator():
+    op = Identity()
+
+    # Operators without a compiler are called through their update
+    assert compile_operator(op) == op.update
+
+
+def test_action_table():
+    table = action_table(lambda action: 2 * action, spaces.Discrete(4))
+    assert np.all(table == [0, 2, 4, 6])
+
+    table = action_table(
+        lambda action: action[0] - action[1], spaces.MultiDiscrete([3, 2])
+    )
+    assert table.shape == (3, 2)
+    assert table[2, 1] == 1
+
+    assert action_table(lambda action: 0, spaces.Box(0, 1)) is None
+
+
+def test_update_batch_loops_over_instances():
+    op = Identity()
+
+    grids = np.arange(24).reshape(2, 3, 4)
+    contexts = np.array([1.0, 2.0]), np.array([[1, 2], [3, 4]])
+
+    new_grids, new_contexts = op.update_batch(grids, None, contexts)
+
+    assert np.all(new_grids == grids)
+    assert all(np.all(new == old) for new, old in zip(new_contexts, contexts))
+    assert new_contexts[1].shape == (2, 2)
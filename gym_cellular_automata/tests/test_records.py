@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from gym_cellular_automata.records import as_tuple, record_dtype, to_record
+
+
+@pytest.fixture
+def context():
+    wind = np.full((3, 3), 0.5, dtype=np.float32)
+    position = np.array([4, 7], dtype=np.int32)
+    time = np.array(1.5, dtype=np.float32)
+
+    return wind, position, time
+
+
+def test_record_dtype(context):
+    dtype = record_dtype(context)
+
+    assert dtype.names == ("f0", "f1", "f2")
+    assert dtype["f0"].shape == (3, 3) and dtype["f0"].base == np.float32
+    assert dtype["f1"].shape == (2,) and dtype["f1"].base == np.int32
+    assert dtype["f2"].shape == () and dtype["f2"] == np.float32
+
+    dtype = record_dtype(context, names=["wind", "position", "time"])
+    assert dtype.names == ("wind", "position", "time")
+
+    with pytest.raises(AssertionError):
+        record_dtype(context, names=["wind"])
+
+
+def test_record_round_trip(context):
+    record = to_record(context)
+
+    for leaf, record_leaf in zip(context, as_tuple(record)):
+        assert record_leaf.dtype == leaf.dtype
+        assert (record_leaf == leaf).all()
+
+    # Leaves are views, writing on them updates the record
+    wind, position, time = as_tuple(record)
+    position[...] = 0, 1
+    time[...] = 3.0
+
+    assert (record["f1"] == [0, 1]).all()
+    assert record["f2"] == 3.0
+
+
+def test_record_batch(context):
+    record = to_record(context, shape=4)
+
+    wind, position, time = as_tuple(record)
+
+    assert wind.shape == (4, 3, 3)
+    assert position.shape == (4, 2)
+    assert time.shape == (4,)
+
+    # A single context is broadcast over the batch
+    assert (position == context[1]).all()
+    assert (time == context[2]).all()
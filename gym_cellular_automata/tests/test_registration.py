@@ -1,9 +1,11 @@
 import gymnasium as gym
 import matplotlib
+import numpy as np
 import pytest
 from gymnasium.spaces import Space
 from matplotlib import pyplot as plt
 
+from gym_cellular_automata.grid_space import GridSpace
 from gym_cellular_automata.registration import GYM_MAKE, REGISTERED_CA_ENVS
 
 matplotlib.interactive(False)
@@ -79,3 +81,34 @@ def assert_gym_api(envs, resets, steps, plot_each):
                 assert isinstance(info, dict)
 
         env.close()
+
+
+def test_async_shared_memory():
+    # Helicopter, the bulldozer grids are heavy on a test
+    env_call = GYM_MAKE[0]
+
+    envs = gym.make_vec(
+        env_call,
+        num_envs=2,
+        vectorization_mode="async",
+        vector_kwargs={"shared_memory": True},
+    )
+
+    try:
+        assert isinstance(envs.single_observation_space[0], GridSpace)
+
+        obs, info = envs.reset(seed=0)
+        assert_shared_grids(envs, obs[0])
+
+        for step in range(STEPS):
+            obs, *__ = envs.step(envs.action_space.sample())
+            assert_shared_grids(envs, obs[0])
+    finally:
+        envs.close()
+
+
+def assert_shared_grids(envs, grids):
+    assert grids.shape == (2,) + envs.single_observation_space[0].shape
+
+    # Read from shared memory, as written by each worker
+    assert np.all(grids == np.stack(envs.call("grid")))
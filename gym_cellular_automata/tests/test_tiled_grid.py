@@ -0,0 +1,158 @@
+import numpy as np
+import pytest
+from gymnasium.spaces import flatten
+
+from gym_cellular_automata.forest_fire.operators import WindyForestFire
+from gym_cellular_automata.grid_space import GridSpace
+from gym_cellular_automata.operator import count_cells
+from gym_cellular_automata.tiled_grid import TiledGrid
+
+TILE = 4
+
+# Edge tiles are smaller
+ROW, COL = 10, 13
+
+VALUES = [0, 3, 25]
+
+
+@pytest.fixture
+def grid():
+    return GridSpace(values=VALUES, shape=(ROW, COL)).sample()
+
+
+@pytest.fixture
+def seeded():
+    return TiledGrid((ROW, COL), tile=TILE, values=[0, 3], probs=[0.2, 0.8], seed=3)
+
+
+def test_round_trip(grid):
+    tiled = TiledGrid.from_grid(grid, tile=TILE)
+
+    assert tiled.shape == grid.shape
+    assert np.all(tiled.to_grid() == grid)
+
+    assert tiled[7, 12] == grid[7, 12]
+    assert np.all(tiled[2:9, 3:13] == grid[2:9, 3:13])
+    assert np.all(tiled[..., 1:5, 0:2] == grid[..., 1:5, 0:2])
+
+
+def test_uniform_tiles_are_values():
+    grid = np.full((ROW, COL), 3)
+    grid[0, 0] = 25
+
+    tiled = TiledGrid.from_grid(grid, tile=TILE)
+
+    assert len(tiled.tiles) == 1
+    assert tiled.nbytes < grid.nbytes
+
+    # Writing back the uniform value compresses the tile
+    tiled[0, 0] = 3
+    assert len(tiled.tiles) == 0
+    assert np.all(tiled.to_grid() == 3)
+
+
+def test_seeded_tiles(seeded):
+    assert len(seeded.tiles) == 0
+
+    # Sampled on demand, the same cells on every read
+    expected = seeded.to_grid()
+    assert np.all(seeded.to_grid() == expected)
+
+    assert set(np.unique(expected)) <= {0, 3}
+    assert seeded.cell_values() <= {0, 3}
+
+
+def test_counting_does_not_materialize(seeded):
+    counts = seeded.count_cells()
+
+    assert len(seeded.tiles) == 0
+    assert counts == count_cells(seeded.to_grid())
+    assert count_cells(seeded) == counts
+
+
+def test_set_and_copy(seeded):
+    before = seeded.to_grid()
+
+    copied = seeded.copy()
+    copied[5, 6] = 25
+    copied[0:2, 0:2] = [[25, 25], [0, 0]]
+
+    expected = before.copy()
+    expected[5, 6] = 25
+    expected[0:2, 0:2] = [[25, 25], [0, 0]]
+
+    assert np.all(copied.to_grid() == expected)
+    assert np.all(seeded.to_grid() == before), "Copies share no writes"
+
+
+def test_box(seeded):
+    assert seeded.box(25) is None
+
+    seeded[2, 7] = 25
+    seeded[8, 5] = 25
+
+    assert seeded.box(25) == (2, 9, 5, 8)
+
+    # Seeded tiles that cannot hold the value are left unread
+    assert len(seeded.tiles) == 2
+
+
+def test_overview(seeded):
+    overview, step = seeded.overview(max_side=5)
+
+    assert step == 3
+    assert overview.shape == (4, 5)
+
+    # Unread tiles show their most likely value
+    assert np.all(overview == 3)
+
+
+def test_grid_space_tile():
+    grid_space = GridSpace(values=VALUES, shape=(ROW, COL), tile=TILE, seed=1)
+
+    tiled = grid_space.sample()
+
+    assert isinstance(tiled, TiledGrid)
+    assert grid_space.contains(tiled)
+    assert grid_space.contains(tiled.to_grid())
+
+    tiled[0, 0] = 7
+    assert not grid_space.contains(tiled)
+
+
+def test_flatten(grid):
+    space = GridSpace(values=VALUES, shape=(ROW, COL))
+    tiled = TiledGrid.from_grid(grid, tile=TILE)
+
+    assert np.all(np.asarray(tiled) == grid)
+    assert np.all(flatten(space, tiled) == grid.ravel())
+
+
+def test_windy_on_tiles_matches_arrays():
+    UPDATES = 8
+
+    grid = np.full((24, 30), 3)
+    grid[np.random.random(grid.shape) < 0.1] = 0
+    grid[12, 4] = 25
+
+    tiled = TiledGrid.from_grid(grid, tile=TILE)
+    wind = np.full((3, 3), 0.6)
+
+    dense_ca = WindyForestFire()
+    tiled_ca = WindyForestFire()
+
+    dense_ca.seed(4)
+    tiled_ca.seed(4)
+
+    counts = count_cells(tiled)
+    for __ in range(UPDATES):
+        grid, __ = dense_ca(grid, None, wind)
+        tiled, __ = tiled_ca(tiled, None, wind)
+
+        counts.update(tiled_ca.delta)
+
+        assert isinstance(tiled, TiledGrid)
+        assert np.all(tiled.to_grid() == grid)
+        assert counts == count_cells(grid)
+
+    assert tiled_ca.is_quiescent(tiled, wind) == dense_ca.is_quiescent(grid, wind)
@@ -0,0 +1,79 @@
+import numpy as np
+
+from gym_cellular_automata.forest_fire.utils.bitboard import BitGrid
+from gym_cellular_automata.operator import copy_into, iter_operators
+
+
+def step_twin_envs(reference, other, steps, seed=0):
+    """
+    Steps `other` along `reference`, envs of the same MDP under different options.
+    Both start on the state of `reference`, with the same actions and CA samples,
+    thus their steps must match. Yields the step outputs of both, once checked.
+
+        Example::
+
+            >>> single = ForestFireHelicopterEnv(5, 5)
+            >>> fused = ForestFireHelicopterEnv(5, 5, fused=True)
+            >>> for step_out, fused_out in step_twin_envs(single, fused, 8):
+            ...     ...
+
+    """
+    reference.reset(seed=seed)
+    other.reset(seed=seed)
+
+    copy_state(reference, other)
+
+    for env in (reference, other):
+        for operator in iter_operators(env.MDP):
+            operator.seed(seed)
+
+    for step in range(steps):
+        action = reference.action_space.sample()
+
+        step_out = reference.step(action)
+        other_out = other.step(action)
+
+        assert_same_step(step_out, other_out)
+
+        yield step_out, other_out
+
+
+def assert_twin_envs(reference, other, steps, seed=0):
+    """`step_twin_envs` run through, returns the last step outputs of both."""
+    step_outs = None
+
+    for step_outs in step_twin_envs(reference, other, steps, seed):
+        pass
+
+    return step_outs
+
+
+def copy_state(source, target):
+    """
+    State of `source` written on the one of `target`, in the form `target` holds it.
+    The context is written in place, as it may be a view of a record.
+    """
+    grid = np.asarray(source.grid)
+
+    if isinstance(target.grid, BitGrid):
+        target.grid = BitGrid.from_grid(grid, *target.grid.cell_values)
+    else:
+        target.grid[...] = grid
+
+    copy_into(source.context, target.context)
+
+    # Counts of the grid written in place are stale
+    target.invalidate_counts()
+
+
+def assert_same_step(step_out, other_out):
+    (grid, context), *rest = step_out
+    (other_grid, other_context), *other_rest = other_out
+
+    assert np.all(grid == other_grid)
+    assert all(np.all(a == b) for a, b in zip(context, other_context))
+    assert all(
+        np.asarray(a).dtype == np.asarray(b).dtype
+        for a, b in zip(context, other_context)
+    )
+    assert rest == other_rest
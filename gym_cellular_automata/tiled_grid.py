@@ -0,0 +1,362 @@
+"""
+Grids too large to be held as a single array.
+
+The grid is split into square tiles, each one is either:
+    + uniform, a single value for all its cells
+    + seeded, its cells are sampled from its own seed when first read
+    + dense, an array
+
+Only the tiles that are written, or read by a CA update, become dense.
+Dense tiles are never modified in place, writes replace them,
+thus copies of a grid share their tiles.
+"""
+
+from collections import Counter
+from math import ceil
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from gym_cellular_automata._config import TYPE_INT
+from gym_cellular_automata.operator import count_cells
+
+TILE = 256
+
+
+class TiledGrid:
+    ndim = 2
+
+    def __init__(
+        self,
+        shape: tuple,
+        tile: int = TILE,
+        fill: int = 0,
+        dtype=TYPE_INT,
+        values: Optional[Union[Sequence[int], np.ndarray]] = None,
+        probs: Optional[Union[Sequence[float], np.ndarray]] = None,
+        seed: Optional[int] = None,
+    ):
+        assert len(shape) == 2, "Only 2D grids."
+        assert tile > 0, "'tile' must be a positive integer."
+
+        self.shape = tuple(int(s) for s in shape)
+        self.tile = tile
+        self.dtype = np.dtype(dtype)
+
+        nrows, ncols = self.shape
+        self.ntiles = ceil(nrows / tile), ceil(ncols / tile)
+
+        self.fills = np.full(self.ntiles, fill, dtype=self.dtype)
+        self.tiles: dict[tuple[int, int], np.ndarray] = {}
+
+        # Seeded tiles, all of them if a distribution of values is given
+        self.seeded = np.full(self.ntiles, values is not None)
+
+        if values is not None:
+            self.values = np.asarray(values, dtype=self.dtype)
+            self.probs = (
+                np.repeat(1 / len(self.values), len(self.values))
+                if probs is None
+                else np.asarray(probs)
+            )
+            self.seed = np.random.SeedSequence(seed).entropy
+
+    @classmethod
+    def from_grid(cls, grid, tile=TILE):
+        grid = np.asarray(grid)
+
+        tiled = cls(grid.shape, tile=tile, dtype=grid.dtype)
+        tiled[:, :] = grid
+
+        return tiled
+
+    def to_grid(self):
+        return self[:, :]
+
+    def __array__(self, dtype=None, copy=None):
+        """Dense grid, for NumPy and Gymnasium utilities as `flatten`."""
+        grid = self.to_grid()
+        return grid if dtype is None else grid.astype(dtype, copy=False)
+
+    def copy(self):
+        new = object.__new__(TiledGrid)
+        new.__dict__.update(self.__dict__)
+
+        # Dense tiles are shared, they are never written in place
+        new.fills = self.fills.copy()
+        new.seeded = self.seeded.copy()
+        new.tiles = dict(self.tiles)
+
+        return new
+
+    @property
+    def nbytes(self):
+        """Memory of the tiles, without the bookkeeping."""
+        return sum(tile.nbytes for tile in self.tiles.values()) + self.fills.nbytes
+
+    def __getitem__(self, key):
+        rows, cols = self._parse_key(key)
+
+        if isinstance(rows, int) and isinstance(cols, int):
+            ti, tj = rows // self.tile, cols // self.tile
+            tile = self._get_tile(ti, tj)
+
+            if tile is None:
+                return self.fills[ti, tj]
+
+            return tile[rows % self.tile, cols % self.tile]
+
+        rows, cols = self._as_slice(rows, 0), self._as_slice(cols, 1)
+        out = np.empty((rows.stop - rows.start, cols.stop - cols.start), self.dtype)
+
+        for (ti, tj), target, source in self._overlaps(rows, cols):
+            tile = self._get_tile(ti, tj)
+            out[target] = self.fills[ti, tj] if tile is None else tile[source]
+
+        return out
+
+    def __setitem__(self, key, value):
+        rows, cols = self._parse_key(key)
+        rows, cols = self._as_slice(rows, 0), self._as_slice(cols, 1)
+
+        value = np.broadcast_to(
+            np.asarray(value, dtype=self.dtype),
+            (rows.stop - rows.start, cols.stop - cols.start),
+        )
+
+        for (ti, tj), target, source in self._overlaps(rows, cols):
+            tile = self._get_tile(ti, tj)
+            tile = (
+                np.full(self._tile_shape(ti, tj), self.fills[ti, tj], self.dtype)
+                if tile is None
+                else tile.copy()
+            )
+            tile[source] = value[target]
+
+            self._set_tile(ti, tj, tile)
+
+    def box(self, value):
+        """
+        Half-open bounding box, `(row_min, row_max, col_min, col_max)`,
+        of the cells equal to `value`. None if there are none.
+        """
+        row_min = col_min = np.inf
+        row_max = col_max = -np.inf
+
+        for ti, tj in np.ndindex(self.ntiles):
+            tile = self._get_tile(ti, tj, materialize=self._may_hold(ti, tj, value))
+            r0, c0 = ti * self.tile, tj * self.tile
+
+            if tile is None:
+                if self.fills[ti, tj] != value or self.seeded[ti, tj]:
+                    continue
+
+                nrows, ncols = self._tile_shape(ti, tj)
+                rows, cols = np.array([0, nrows - 1]), np.array([0, ncols - 1])
+
+            else:
+                is_value = tile == value
+                rows = np.flatnonzero(is_value.any(axis=1))
+
+                if rows.size == 0:
+                    continue
+
+                cols = np.flatnonzero(is_value.any(axis=0))
+
+            row_min, row_max = min(row_min, r0 + rows[0]), max(row_max, r0 + rows[-1])
+            col_min, col_max = min(col_min, c0 + cols[0]), max(col_max, c0 + cols[-1])
+
+        if row_min == np.inf:
+            return None
+
+        return int(row_min), int(row_max) + 1, int(col_min), int(col_max) + 1
+
+    def count_cells(self):
+        """Cell counts, seeded tiles are sampled without being kept."""
+        counts = Counter()
+
+        for ti, tj in np.ndindex(self.ntiles):
+            if (ti, tj) in self.tiles:
+                counts.update(count_cells(self.tiles[ti, tj]))
+
+            elif self.seeded[ti, tj]:
+                indices = self._sample_indices(ti, tj).ravel()
+                value_counts = np.bincount(indices, minlength=len(self.values))
+
+                held = value_counts > 0
+                counts.update(
+                    dict(zip(self.values[held].tolist(), value_counts[held].tolist()))
+                )
+
+            else:
+                nrows, ncols = self._tile_shape(ti, tj)
+                counts[self.fills[ti, tj].item()] += nrows * ncols
+
+        return counts
+
+    def cell_values(self):
+        """Values that the cells may hold."""
+        cell_values = set(self.fills[~self.seeded & ~self._dense()].tolist())
+
+        for tile in self.tiles.values():
+            cell_values.update(np.unique(tile).tolist())
+
+        if np.any(self.seeded):
+            cell_values.update(self.values[self.probs > 0].tolist())
+
+        return cell_values
+
+    def overview(self, max_side=1024):
+        """
+        Every `step` cells along each axis, `step` keeps the sides within `max_side`.
+        Seeded tiles show their most likely value, instead of being sampled.
+        Returns the overview grid and its `step`.
+        """
+        step = max(1, ceil(max(self.shape) / max_side))
+
+        rows = np.arange(0, self.shape[0], step)
+        cols = np.arange(0, self.shape[1], step)
+
+        out = np.empty((rows.size, cols.size), dtype=self.dtype)
+
+        for ti, tj in np.ndindex(self.ntiles):
+            r0, c0 = ti * self.tile, tj * self.tile
+            nrows, ncols = self._tile_shape(ti, tj)
+
+            i = np.flatnonzero((rows >= r0) & (rows < r0 + nrows))
+            j = np.flatnonzero((cols >= c0) & (cols < c0 + ncols))
+
+            if (ti, tj) in self.tiles:
+                out[np.ix_(i, j)] = self.tiles[ti, tj][
+                    np.ix_(rows[i] - r0, cols[j] - c0)
+                ]
+
+            elif self.seeded[ti, tj]:
+                out[np.ix_(i, j)] = self.values[np.argmax(self.probs)]
+
+            else:
+                out[np.ix_(i, j)] = self.fills[ti, tj]
+
+        return out, step
+
+    def __repr__(self):
+        ndense = len(self.tiles)
+        total = self.ntiles[0] * self.ntiles[1]
+
+        return (
+            f"TiledGrid(shape={self.shape}, tile={self.tile}, "
+            f"dense_tiles={ndense}/{total})"
+        )
+
+    def _parse_key(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+
+        # A leading Ellipsis, as operators index batches with `grid[..., rows, cols]`
+        if key and key[0] is Ellipsis:
+            key = key[1:]
+
+        if len(key) == 1:
+            key = key + (slice(None),)
+
+        rows, cols = key
+
+        rows = int(rows) if isinstance(rows, (int, np.integer)) else rows
+        cols = int(cols) if isinstance(cols, (int, np.integer)) else cols
+
+        return rows, cols
+
+    def _as_slice(self, index, axis):
+        size = self.shape[axis]
+
+        if isinstance(index, int):
+            index = index + size if index < 0 else index
+            return slice(index, index + 1)
+
+        start, stop, step = index.indices(size)
+        assert step == 1, "Only contiguous slices."
+
+        return slice(start, max(start, stop))
+
+    def _overlaps(self, rows, cols):
+        """
+        Tiles overlapping a region, with the slices of the region
+        and of the tile that overlap.
+        """
+        t = self.tile
+
+        for ti in range(rows.start // t, ceil(rows.stop / t)):
+            r0, r1 = max(rows.start, ti * t), min(rows.stop, (ti + 1) * t)
+
+            for tj in range(cols.start // t, ceil(cols.stop / t)):
+                c0, c1 = max(cols.start, tj * t), min(cols.stop, (tj + 1) * t)
+
+                target = (
+                    slice(r0 - rows.start, r1 - rows.start),
+                    slice(c0 - cols.start, c1 - cols.start),
+                )
+                source = slice(r0 - ti * t, r1 - ti * t), slice(
+                    c0 - tj * t, c1 - tj * t
+                )
+
+                yield (ti, tj), target, source
+
+    def _tile_shape(self, ti, tj):
+        nrows, ncols = self.shape
+        t = self.tile
+
+        return min(t, nrows - ti * t), min(t, ncols - tj * t)
+
+    def _get_tile(self, ti, tj, materialize=True):
+        """Array of a tile, None for uniform tiles and unread seeded tiles."""
+        if (ti, tj) in self.tiles:
+            return self.tiles[ti, tj]
+
+        if self.seeded[ti, tj] and materialize:
+            self.tiles[ti, tj] = self._sample_tile(ti, tj)
+            self.seeded[ti, tj] = False
+
+            return self.tiles[ti, tj]
+
+        return None
+
+    def _set_tile(self, ti, tj, tile):
+        self.seeded[ti, tj] = False
+
+        # Uniform tiles are stored as their value
+        if np.all(tile == tile.flat[0]):
+            self.fills[ti, tj] = tile.flat[0]
+            self.tiles.pop((ti, tj), None)
+
+        else:
+            self.tiles[ti, tj] = tile
+
+    def _sample_tile(self, ti, tj):
+        """Same cells on every call, drawn from the seed of the tile."""
+        return self.values[self._sample_indices(ti, tj)]
+
+    def _sample_indices(self, ti, tj):
+        """Indices into `values` of the cells of a seeded tile."""
+        rng = np.random.default_rng([self.seed, ti, tj])
+        roll = rng.random(self._tile_shape(ti, tj), dtype=np.float32)
+
+        # Number of cumulative probabilities below the roll
+        indices = np.zeros(roll.shape, dtype=np.uint8)
+        for edge in np.cumsum(self.probs)[:-1]:
+            indices += roll >= edge
+
+        return indices
+
+    def _may_hold(self, ti, tj, value):
+        if not self.seeded[ti, tj]:
+            return True
+
+        return bool(np.any(self.probs[self.values == value] > 0))
+
+    def _dense(self):
+        dense = np.zeros(self.ntiles, dtype=bool)
+
+        for ti, tj in self.tiles:
+            dense[ti, tj] = True
+
+        return dense
@@ -20,9 +20,9 @@ setup(
         "gymnasium",
         "numpy",
         "matplotlib",
-        "scipy",
         "svgpath2mpl",
     ],
-    tests_require=["pytest", "pytest-cov", "pytest-repeat", "pytest-randomly"],
+    extras_require={"jit": ["numba"]},
+    tests_require=["scipy", "pytest", "pytest-cov", "pytest-repeat", "pytest-randomly"],
     python_requires=">=3.9",
 )